@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from feedback.models import SavedCrumb
+from preferences.models import Topic, UserPreference
+from subscriptions.models import UserSubscription
+
+
+TOPICS_KEY = "accounts:topics"
+
+
+@dataclass(frozen=True)
+class UserContext:
+    """
+    What the feed views need to know about a user: their active plan and
+    preferred topics. Built once and cached per user (see
+    get_user_context()); the signals in accounts.signals drop it whenever
+    the subscription, plan or preferences change.
+    """
+    user_id: int
+    subscribed: bool
+    plan_name: Optional[str] = None
+    topic_limit: Optional[int] = None
+    topic_ids: Tuple[int, ...] = ()
+
+    @property
+    def limited(self):
+        """
+        True for the basic plan, which only sees two preferred topics.
+        """
+        return bool(self.plan_name and self.plan_name.lower() == "basic")
+
+    @property
+    def feed_topic_ids(self):
+        """
+        The preferred topic ids the user's plan lets them see.
+        """
+        if self.limited:
+            return list(self.topic_ids[:2])
+        return list(self.topic_ids)
+
+
+def context_key(user_id):
+    return f"accounts:context:{user_id}"
+
+
+def load_user_context(user):
+    """
+    Reads a user's UserContext from the database.
+    """
+    subscription = UserSubscription.objects.filter(
+        user=user, active=True
+    ).select_related('plan').first()
+    pref_obj = UserPreference.objects.filter(user=user).first()
+    topic_ids = tuple(pref_obj.topics.values_list(
+        'id', flat=True)) if pref_obj else ()
+
+    plan = subscription.plan if subscription else None
+    return UserContext(
+        user_id=user.pk,
+        subscribed=subscription is not None,
+        plan_name=plan.name if plan else None,
+        topic_limit=plan.topic_limit if plan else None,
+        topic_ids=topic_ids,
+    )
+
+
+def get_user_context(request):
+    """
+    Returns the UserContext of the logged-in user, or None for anonymous
+    requests.
+
+    The context is kept on the request, so it is loaded at most once per
+    request, and in the cache for USER_CONTEXT_TIMEOUT seconds, so most
+    requests do not query for it at all.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    context = getattr(request, '_user_context', None)
+    if context is None:
+        key = context_key(user.pk)
+        context = cache.get(key)
+        if context is None:
+            context = load_user_context(user)
+            cache.set(key, context,
+                      getattr(settings, 'USER_CONTEXT_TIMEOUT', 300))
+        request._user_context = context
+    return context
+
+
+def invalidate_user_context(user_ids):
+    """
+    Drops the cached contexts of ``user_ids``.
+    """
+    cache.delete_many([context_key(user_id) for user_id in user_ids])
+
+
+def get_topics():
+    """
+    Returns all topics, cached until a Topic is saved or deleted.
+    """
+    topics = cache.get(TOPICS_KEY)
+    if topics is None:
+        topics = list(Topic.objects.all())
+        cache.set(TOPICS_KEY, topics,
+                  getattr(settings, 'USER_CONTEXT_TIMEOUT', 300))
+    return topics
+
+
+def saved_crumb_ids(user, crumb_ids):
+    """
+    Looks up which of ``crumb_ids`` the user has saved, with one query
+    limited to those crumbs.
+
+    Returns:
+        set: The saved crumb ids.
+    """
+    if not user.is_authenticated or not crumb_ids:
+        return set()
+    return set(SavedCrumb.objects.filter(
+        user=user, crumb_id__in=crumb_ids
+    ).values_list('crumb_id', flat=True))
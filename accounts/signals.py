@@ -1,6 +1,12 @@
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete,
+)
 from django.dispatch import receiver
 
+from preferences.models import Topic, UserPreference
+from subscriptions.models import SubscriptionPlan, UserSubscription
+from .context import TOPICS_KEY, invalidate_user_context
 from .models import CustomUser, Profile
 
 
@@ -12,3 +18,49 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=CustomUser)
 def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
+
+
+@receiver(post_save, sender=CustomUser)
+def clear_new_user_context(sender, instance, created, **kwargs):
+    if created:
+        invalidate_user_context([instance.pk])
+
+
+@receiver(post_save, sender=UserSubscription)
+@receiver(post_delete, sender=UserSubscription)
+@receiver(post_save, sender=UserPreference)
+@receiver(post_delete, sender=UserPreference)
+def clear_user_context(sender, instance, **kwargs):
+    invalidate_user_context([instance.user_id])
+
+
+@receiver(m2m_changed, sender=UserPreference.topics.through)
+def clear_preference_context(sender, instance, action, pk_set, reverse,
+                             **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Changed from the Topic side; pk_set holds preference ids.
+        prefs = UserPreference.objects.all()
+        if pk_set is not None:
+            prefs = prefs.filter(pk__in=pk_set)
+        invalidate_user_context(prefs.values_list('user_id', flat=True))
+    else:
+        invalidate_user_context([instance.user_id])
+
+
+# pre_delete: by post_delete, SET_NULL has already cut the subscriptions
+# off the plan and there would be no users left to find.
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(pre_delete, sender=SubscriptionPlan)
+def clear_plan_context(sender, instance, **kwargs):
+    invalidate_user_context(
+        UserSubscription.objects.filter(plan_id=instance.pk)
+        .values_list('user_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def clear_topics(sender, **kwargs):
+    cache.delete(TOPICS_KEY)
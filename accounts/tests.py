@@ -1,5 +1,10 @@
 from urllib import response
-from django.test import TestCase, Client
+import datetime
+
+from django.db import connection
+from django.test import RequestFactory, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.db.utils import IntegrityError
@@ -8,7 +13,9 @@ from django.core.exceptions import ValidationError # Import ValidationError expl
 
 # Import models from other apps that are linked to
 # Profile for testing relationships
+from accounts.context import get_user_context, saved_crumb_ids
 from accounts.models import Profile
+from core.testing import isolated_caches
 from crumbs.models import Crumb
 from feedback.models import Comment, SavedCrumb
 from preferences.models import Topic, UserPreference
@@ -22,6 +29,7 @@ from subscriptions.models import (
 # Get the custom user model as defined in settings.AUTH_USER_MODEL
 CustomUser = get_user_model()
 
+
 class CustomUserModelTest(TestCase):
     """Test the CustomUser model and its methods."""
     def test_user_creation(self):
@@ -421,4 +429,79 @@ class AccountViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         html = response.json()['html']
         self.assertIn("You are not subscribed to any plan yet.", html)
-        self.assertNotIn(self.plan.name, html)
\ No newline at end of file
+        self.assertNotIn(self.plan.name, html)
+
+
+class UserContextTest(TestCase):
+    """Test the cached per-user context and the page-scoped saved flags."""
+    def setUp(self):
+        # Never touch the configured cache.
+        self.enterContext(
+            override_settings(CACHES=isolated_caches(self.id())))
+        self.user = CustomUser.objects.create_user(
+            username='contextuser', email='context@example.com',
+            password='password123'
+        )
+        self.topics = [Topic.objects.create(name=f'Context {i}')
+                       for i in range(3)]
+        self.plan = SubscriptionPlan.objects.create(
+            name='basic', price=10.00, topic_limit=2)
+        self.subscription = UserSubscription.objects.create(
+            user=self.user, plan=self.plan, active=True,
+            end_date=timezone.now() + datetime.timedelta(days=30)
+        )
+        self.preference = UserPreference.objects.create(user=self.user)
+        self.preference.topics.add(*self.topics)
+
+    def _context(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return get_user_context(request)
+
+    def test_context_is_cached(self):
+        context = self._context()
+        self.assertTrue(context.subscribed)
+        self.assertTrue(context.limited)
+        self.assertEqual(context.topic_limit, 2)
+        self.assertEqual(len(context.feed_topic_ids), 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._context(), context)
+        self.assertEqual(len(queries), 0)
+
+    def test_changes_invalidate_the_context(self):
+        self._context()
+        self.preference.topics.remove(self.topics[0])
+        self.assertNotIn(self.topics[0].id, self._context().topic_ids)
+
+        self.plan.name = 'premium'
+        self.plan.save()
+        self.assertFalse(self._context().limited)
+
+        self.subscription.active = False
+        self.subscription.save()
+        self.assertFalse(self._context().subscribed)
+
+    def test_deleting_the_plan_invalidates_the_context(self):
+        self.assertEqual(self._context().plan_name, 'basic')
+        self.plan.delete()
+        context = self._context()
+        self.assertIsNone(context.plan_name)
+        self.assertFalse(context.limited)
+
+    def test_saved_ids_only_cover_the_given_crumbs(self):
+        crumbs = [
+            Crumb.objects.create(
+                title=f'Flag {i}', summary='S', url=f'http://flag{i}.com',
+                source='Source', topic=self.topics[0],
+                published_at=timezone.now()
+            )
+            for i in range(3)
+        ]
+        for crumb in crumbs:
+            SavedCrumb.objects.create(user=self.user, crumb=crumb)
+
+        with CaptureQueriesContext(connection) as queries:
+            saved = saved_crumb_ids(
+                self.user, [crumbs[0].id, crumbs[1].id])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(saved, {crumbs[0].id, crumbs[1].id})
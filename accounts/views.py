@@ -51,7 +51,9 @@ def account_update(request):
 
 @login_required
 def load_saved_crumbs_partial(request):
-    saved_crumbs = SavedCrumb.objects.filter(user=request.user).select_related('crumb')
+    saved_crumbs = SavedCrumb.objects.filter(
+        user=request.user
+    ).select_related('crumb').order_by('-saved_at')
     html = render_to_string(
         "account/includes/partial_saved_crumbs.html",
         {"saved_crumbs": saved_crumbs},
@@ -62,7 +64,9 @@ def load_saved_crumbs_partial(request):
 
 @login_required
 def load_comments_partial(request):
-    comments = Comment.objects.filter(user=request.user).select_related('crumb')
+    comments = Comment.objects.filter(
+        user=request.user
+    ).select_related('crumb').order_by('-created_at')
     html = render_to_string(
         "account/includes/partial_comments.html",
         {"comments": comments},
@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import WebhookEvent
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'type', 'status', 'attempts', 'received_at',
+                    'processed_at')
+    list_filter = ('status', 'type')
+    search_fields = ('event_id',)
+    readonly_fields = ('received_at', 'attempted_at', 'processed_at')
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from checkout.webhook_handler import process_webhook_events
+
+
+class Command(BaseCommand):
+    help = ('Processes queued Stripe webhook events in batches, oldest '
+            'first.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'WEBHOOK_BATCH_SIZE', 50),
+            help='Events claimed and handled per batch.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', 5),
+            help='Mark an event failed after this many failed attempts.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help=('Keep running, checking for new events every this many '
+                  'seconds (0 to stop once the queue is empty).'),
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        processed = failed = 0
+        while True:
+            done, errors = process_webhook_events(
+                batch_size, options['max_attempts'])
+            processed += done
+            failed += errors
+            if done + errors == batch_size:
+                continue
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} webhook events ({failed} failed "
+                f"attempts)."
+            )
+        )
@@ -1,3 +1,43 @@
 from django.db import models
 
-# Create your models here.
+
+class WebhookEvent(models.Model):
+    """
+    A Stripe webhook event as received, queued for the process_webhooks
+    command.
+
+    The unique ``event_id`` makes intake idempotent: a retried delivery of
+    the same event is ignored instead of being handled twice.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSED = 'processed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSED, 'Processed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.TextField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    attempted_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Pending events, oldest first (process_webhooks).
+            models.Index(
+                fields=['status', 'received_at'],
+                name='webhookevent_status_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id} ({self.status})"
@@ -1,3 +1,116 @@
-from django.test import TestCase
+import datetime
+import json
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from subscriptions.models import (
+    SubscriptionFrequency,
+    SubscriptionPlan,
+    UserSubscription,
+)
+from .models import WebhookEvent
+from .webhook_handler import process_webhook_events
+
+
+class WebhookQueueTest(TestCase):
+    """
+    Tests for queued, idempotent Stripe webhook handling.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='payer', email='payer@example.com',
+            password='password123'
+        )
+        self.plan = SubscriptionPlan.objects.create(
+            name='premium', price=20.00, topic_limit=12)
+        self.frequency = SubscriptionFrequency.objects.create(
+            name='Monthly', duration_days=30)
+
+    def _event(self, event_id='evt_1', username='payer', plan_id=None):
+        return {
+            'id': event_id,
+            'object': 'event',
+            'type': 'payment_intent.succeeded',
+            'data': {'object': {
+                'id': f'pi_{event_id}',
+                'object': 'payment_intent',
+                'metadata': {
+                    'plan_id': str(plan_id or self.plan.id),
+                    'frequency_id': str(self.frequency.id),
+                    'username': username,
+                },
+            }},
+        }
+
+    def _post(self, event):
+        payload = json.dumps(event)
+        with patch('stripe.Webhook.construct_event',
+                   return_value=event) as construct:
+            response = self.client.post(
+                reverse('webhook'), payload,
+                content_type='application/json',
+                HTTP_STRIPE_SIGNATURE='t=1,v1=test',
+            )
+        construct.assert_called_once()
+        return response
+
+    def test_intake_queues_each_event_once(self):
+        event = self._event()
+        with self.assertNumQueries(1):
+            response = self._post(event)
+        self.assertEqual(response.status_code, 200)
+        self._post(event)
+
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        queued = WebhookEvent.objects.get()
+        self.assertEqual(queued.status, WebhookEvent.STATUS_PENDING)
+        self.assertFalse(UserSubscription.objects.exists())
+
+    def test_invalid_signature_is_rejected(self):
+        response = self.client.post(
+            reverse('webhook'), '{}', content_type='application/json',
+            HTTP_STRIPE_SIGNATURE='t=1,v1=bad',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_command_processes_pending_events(self):
+        self._post(self._event())
+        out = StringIO()
+        call_command('process_webhooks', stdout=out)
+
+        self.assertIn('Processed 1 webhook events', out.getvalue())
+        subscription = UserSubscription.objects.get(user=self.user)
+        self.assertTrue(subscription.active)
+        self.assertEqual(subscription.stripe_payment_intent_id, 'pi_evt_1')
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.STATUS_PROCESSED)
+        self.assertEqual(event.attempts, 1)
+
+    @override_settings(WEBHOOK_RETRY_DELAY=0)
+    def test_failed_events_are_retried_then_marked_failed(self):
+        self._post(self._event(username='nobody'))
+        self.assertEqual(process_webhook_events(max_attempts=2), (0, 1))
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.STATUS_PENDING)
+        self.assertIn('User not found', event.last_error)
+
+        self.assertEqual(process_webhook_events(max_attempts=2), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEvent.STATUS_FAILED)
+        self.assertEqual(process_webhook_events(max_attempts=2), (0, 0))
+
+    def test_failed_events_wait_before_a_retry(self):
+        self._post(self._event(username='nobody'))
+        process_webhook_events()
+        self.assertEqual(process_webhook_events(), (0, 0))
+        WebhookEvent.objects.update(
+            attempted_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(process_webhook_events(), (0, 1))
@@ -1,10 +1,17 @@
 # checkout/webhook_handler.py
 from django.http import HttpResponse
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.utils.timezone import now
 from datetime import timedelta
+import json
 import time
 
+import stripe
+
+from checkout.models import WebhookEvent
+
 # Import models from the subscriptions app
 from subscriptions.models import SubscriptionPlan, SubscriptionFrequency, UserSubscription
 from django.contrib.auth import get_user_model
@@ -175,3 +182,92 @@ class StripeWH_Handler:
             status=200 # Always return 200 OK for Stripe webhooks, even on failure
         )
 
+
+def handle_event(event):
+    """
+    Runs the StripeWH_Handler method for a Stripe event and returns its
+    HttpResponse.
+    """
+    # Set up a webhook handler; events are handled outside the request
+    # that delivered them.
+    handler = StripeWH_Handler(None)
+
+    # Map webhook events to relevant handler functions
+    event_map = {
+        "payment_intent.succeeded": handler.handle_payment_intent_succeeded,
+        "payment_intent.payment_failed": handler.handle_payment_intent_payment_failed,
+        # Add other events as needed, e.g., 'customer.subscription.created' for recurring payments
+    }
+
+    # If there's a handler for it, get it from the event map
+    # Use the generic one by default
+    event_handler = event_map.get(event['type'], handler.handle_event)
+    return event_handler(event)
+
+
+def process_webhook_events(batch_size=None, max_attempts=None):
+    """
+    Handles one batch of queued webhook events, oldest first.
+
+    Events are claimed with SELECT ... FOR UPDATE SKIP LOCKED where the
+    database supports it, so several workers can run at once. An event
+    whose handler answers with an error status, or raises, stays pending
+    and is retried after WEBHOOK_RETRY_DELAY seconds until it has failed
+    ``max_attempts`` times.
+
+    Args:
+        batch_size (int): Events per batch. Defaults to the
+            WEBHOOK_BATCH_SIZE setting.
+        max_attempts (int): Attempts before an event is marked failed.
+            Defaults to the WEBHOOK_MAX_ATTEMPTS setting.
+
+    Returns:
+        tuple: (events processed, events that failed this attempt).
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'WEBHOOK_BATCH_SIZE', 50)
+    if max_attempts is None:
+        max_attempts = getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', 5)
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+
+    retry_before = now() - timedelta(
+        seconds=getattr(settings, 'WEBHOOK_RETRY_DELAY', 60))
+
+    processed = failed = 0
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookEvent.STATUS_PENDING)
+            .filter(Q(attempted_at__isnull=True)
+                    | Q(attempted_at__lte=retry_before))
+            .order_by('received_at', 'id')[:batch_size]
+        )
+        for webhook_event in events:
+            webhook_event.attempts += 1
+            try:
+                with transaction.atomic():
+                    event = stripe.Event.construct_from(
+                        json.loads(webhook_event.payload), stripe.api_key)
+                    response = handle_event(event)
+                    if response.status_code >= 400:
+                        raise ValueError(response.content.decode())
+            except Exception as e:
+                print(f"Webhook Error: Event {webhook_event.event_id} "
+                      f"failed (attempt {webhook_event.attempts}): {e}")
+                webhook_event.last_error = str(e)
+                if webhook_event.attempts >= max_attempts:
+                    webhook_event.status = WebhookEvent.STATUS_FAILED
+                failed += 1
+            else:
+                webhook_event.status = WebhookEvent.STATUS_PROCESSED
+                webhook_event.last_error = ''
+                webhook_event.processed_at = now()
+                processed += 1
+            webhook_event.attempted_at = now()
+
+        WebhookEvent.objects.bulk_update(
+            events,
+            ['status', 'attempts', 'last_error', 'attempted_at',
+             'processed_at'],
+        )
+    return processed, failed
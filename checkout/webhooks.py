@@ -3,10 +3,9 @@ from django.conf import settings
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 
-from checkout.webhook_handler import StripeWH_Handler
+from checkout.models import WebhookEvent
 
 import stripe
-import json
 
 @require_POST
 @csrf_exempt
@@ -32,24 +31,17 @@ def webhook(request):
     except Exception as e:
         return HttpResponse(content=e, status=400)
 
-    # Set up a webhook handler
-    handler = StripeWH_Handler(request)
-
-    # Map webhook events to relevant handler functions
-    event_map = {
-        "payment_intent.succeeded": handler.handle_payment_intent_succeeded,
-        "payment_intent.payment_failed": handler.handle_payment_intent_payment_failed,
-        # Add other events as needed, e.g., 'customer.subscription.created' for recurring payments
-    }
-
-    # Get the webhook type from Stripe
-    event_type = event['type']
-
-    # If there's a handler for it, get it from the event map
-    # Use the generic one by default
-    event_handler = event_map.get(event_type, handler.handle_event)
-
-    # Call the event handler with the event
-    response = event_handler(event)
-    return response
+    # Queue the event and answer straight away; process_webhooks handles
+    # it. A retried delivery hits the unique event id and is ignored.
+    WebhookEvent.objects.bulk_create([
+        WebhookEvent(
+            event_id=event['id'],
+            type=event['type'],
+            payload=payload.decode('utf-8'),
+        )
+    ], ignore_conflicts=True)
 
+    return HttpResponse(
+        content=f'Webhook received: {event["type"]}',
+        status=200
+    )
@@ -0,0 +1,9 @@
+def isolated_caches(name):
+    """
+    Returns CACHES settings for an empty in-memory cache named ``name``,
+    for tests that must never touch the configured cache.
+    """
+    return {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': name,
+    }}
@@ -8,7 +8,8 @@ class CrumbAdmin(admin.ModelAdmin):
         'topic',
         'source',
         'published_at',
-        'added_on'
+        'added_on',
+        'summary_status',
         )
     search_fields = ('title', 'summary', 'source', "tags__name")
-    list_filter = ('topic', 'source', 'published_at')
+    list_filter = ('topic', 'source', 'published_at', 'summary_status')
@@ -1,16 +1,14 @@
 from django.http import JsonResponse, Http404
-from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404
 from datetime import date
 
 from .models import Crumb
+from .pagination import paginate_crumbs
 
 
 def infinite_crumbs(request):
-    crumbs = Crumb.objects.order_by('-published_at')
-    paginator = Paginator(crumbs, 10)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    crumbs = Crumb.objects.select_related('topic')
+    page_obj = paginate_crumbs(crumbs, request.GET.get('cursor'), 10)
 
     today = date.today()
     new_crumbs = []
@@ -20,7 +18,7 @@ def infinite_crumbs(request):
         crumb_data = {
             'id': crumb.id,
             'title': crumb.title,
-            'summary': crumb.summary,
+            'summary': crumb.display_summary,
             'url': crumb.url,
             'source': crumb.source,
             'topic': crumb.topic.name,
@@ -36,7 +34,7 @@ def infinite_crumbs(request):
         'new': new_crumbs,
         'old': old_crumbs,
         'has_next': page_obj.has_next(),
-        'next_page': page_obj.next_page_number() if page_obj.has_next() else None,
+        'next_cursor': page_obj.next_cursor,
     })
 
 
@@ -46,7 +44,7 @@ def crumb_detail_api(request, pk):
         return JsonResponse({
             'id': crumb.id,
             'title': crumb.title,
-            'summary': crumb.summary,
+            'summary': crumb.display_summary,
             'url': crumb.url,
             'source': crumb.source,
             'topic': crumb.topic.name,
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CrumbsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crumbs'
+
+    def ready(self):
+        import crumbs.signals
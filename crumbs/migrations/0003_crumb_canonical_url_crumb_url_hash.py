@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0002_crumb_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crumb',
+            name='canonical_url',
+            field=models.URLField(blank=True, editable=False, max_length=2048),
+        ),
+        migrations.AddField(
+            model_name='crumb',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+    ]
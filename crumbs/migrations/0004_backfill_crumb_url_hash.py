@@ -0,0 +1,39 @@
+from django.db import migrations
+
+from crumbs.utils import canonicalize_url, hash_url
+
+BATCH_SIZE = 1000
+
+
+def backfill_url_hash(apps, schema_editor):
+    """
+    Computes canonical_url and url_hash for existing crumbs. When several
+    crumbs share a canonical URL only the oldest gets the hash, so the
+    unique index added next can be built; the others keep a NULL hash.
+    """
+    Crumb = apps.get_model('crumbs', 'Crumb')
+    seen = set()
+    batch = []
+    for crumb in Crumb.objects.order_by('pk').only('pk', 'url').iterator(
+            chunk_size=BATCH_SIZE):
+        crumb.canonical_url = canonicalize_url(crumb.url)
+        digest = hash_url(crumb.url) if crumb.url else None
+        crumb.url_hash = digest if digest not in seen else None
+        seen.add(digest)
+        batch.append(crumb)
+        if len(batch) >= BATCH_SIZE:
+            Crumb.objects.bulk_update(batch, ['canonical_url', 'url_hash'])
+            batch = []
+    if batch:
+        Crumb.objects.bulk_update(batch, ['canonical_url', 'url_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0003_crumb_canonical_url_crumb_url_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_url_hash, migrations.RunPython.noop),
+    ]
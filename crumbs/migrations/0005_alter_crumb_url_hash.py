@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0004_backfill_crumb_url_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='crumb',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0005_alter_crumb_url_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crumb',
+            name='content',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='crumb',
+            name='summary_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='done', max_length=10),
+        ),
+    ]
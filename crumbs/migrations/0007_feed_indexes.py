@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0006_crumb_content_summary_status'),
+        ('preferences', '0003_alter_topic_slug'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='crumb',
+            index=models.Index(fields=['topic', '-published_at', '-id'], name='crumb_topic_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='crumb',
+            index=models.Index(fields=['-published_at', '-id'], name='crumb_published_idx'),
+        ),
+    ]
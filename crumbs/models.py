@@ -2,18 +2,73 @@ from django.db import models
 from taggit.managers import TaggableManager
 
 from preferences.models import Topic
+from .utils import canonicalize_url, hash_url
 
 
 class Crumb(models.Model):
+    SUMMARY_PENDING = 'pending'
+    SUMMARY_DONE = 'done'
+    SUMMARY_FAILED = 'failed'
+    SUMMARY_STATUS_CHOICES = [
+        (SUMMARY_PENDING, 'Pending'),
+        (SUMMARY_DONE, 'Done'),
+        (SUMMARY_FAILED, 'Failed'),
+    ]
     title = models.CharField(max_length=255)
     summary = models.TextField()
+    # Cleaned source text. Shown until the summary has been filled in by
+    # the summarize_crumbs command.
+    content = models.TextField(blank=True)
+    summary_status = models.CharField(
+        max_length=10, choices=SUMMARY_STATUS_CHOICES, default=SUMMARY_DONE,
+        db_index=True
+    )
     url = models.URLField()
+    # Normalized form of ``url`` and its SHA-256, used for deduplication.
+    canonical_url = models.URLField(max_length=2048, blank=True, editable=False)
+    url_hash = models.CharField(
+        max_length=64, unique=True, null=True, editable=False
+    )
     source = models.CharField(max_length=255)
     topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
     tags = TaggableManager(blank=True)
     published_at = models.DateTimeField()
     added_on = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Feed pages: crumbs of the user's topics, newest first, with
+            # the id tie-break used by the keyset pagination cursors.
+            models.Index(
+                fields=['topic', '-published_at', '-id'],
+                name='crumb_topic_published_idx',
+            ),
+            # The unfiltered feed (infinite API).
+            models.Index(
+                fields=['-published_at', '-id'], name='crumb_published_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.set_url_hash()
+        super().save(*args, **kwargs)
+
+    def set_url_hash(self):
+        """
+        Fills in ``canonical_url`` and ``url_hash`` from ``url``. Called by
+        save(); bulk inserts must call it themselves.
+        """
+        if self.url:
+            self.canonical_url = canonicalize_url(self.url)
+            self.url_hash = hash_url(self.url)
+
+    @property
+    def display_summary(self):
+        """
+        The summary, or the cleaned content while it is still pending.
+        """
+        return self.summary or self.content
+
     def __str__(self):
         return self.title
 
@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class CursorPage:
+    """
+    One page of a keyset-paginated crumb queryset.
+
+    Unlike Django's Paginator page there is no page number or total count;
+    ``next_cursor`` and ``previous_cursor`` are opaque tokens to pass back
+    as ``?cursor=`` to move one page in either direction.
+    """
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0], 'prev')
+
+
+def encode_cursor(crumb, direction):
+    """
+    Returns an opaque token for the position of ``crumb`` in the
+    (published_at, id) ordering.
+
+    Args:
+        crumb (Crumb): The last crumb of a page (for 'next') or the first
+            (for 'prev').
+        direction (str): 'next' or 'prev'.
+    """
+    payload = json.dumps({
+        'p': crumb.published_at.isoformat(),
+        'i': crumb.pk,
+        'd': direction,
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Returns (published_at, id, direction) for a token from encode_cursor,
+    or None if it is missing or malformed.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload['d']
+        if direction not in ('next', 'prev'):
+            return None
+        return (datetime.fromisoformat(payload['p']), int(payload['i']),
+                direction)
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def paginate_crumbs(queryset, cursor=None, per_page=10):
+    """
+    Returns one page of crumbs, newest first, using keyset pagination.
+
+    Each page is a single indexed range query on (published_at, id) that
+    reads at most ``per_page + 1`` rows, with no COUNT(*) or OFFSET, so a
+    deep page costs the same as the first one. An invalid cursor gives the
+    first page.
+
+    Args:
+        queryset (QuerySet): Crumbs to page through; any ordering is
+            replaced.
+        cursor (str): Token from a previous page's ``next_cursor`` or
+            ``previous_cursor``.
+        per_page (int): Crumbs per page.
+
+    Returns:
+        CursorPage: The requested page.
+    """
+    position = decode_cursor(cursor)
+    if position is None:
+        return _first_page(queryset, per_page)
+
+    rows = list(keyset_queryset(queryset, position)[:per_page + 1])
+    if position[2] == 'next':
+        return CursorPage(rows[:per_page], len(rows) > per_page, True)
+
+    # Walked backwards in ascending order, so flip the page around.
+    if len(rows) <= per_page:
+        # Back at the start; show a full first page.
+        return _first_page(queryset, per_page)
+    return CursorPage(rows[:per_page][::-1], True, True)
+
+
+def keyset_queryset(queryset, position):
+    """
+    Returns ``queryset`` narrowed to the crumbs after ``position`` and
+    ordered to read them from there: newest first for 'next', oldest first
+    for 'prev'.
+
+    Args:
+        queryset (QuerySet): Crumbs to page through.
+        position (tuple): (published_at, id, direction) from
+            decode_cursor().
+    """
+    published_at, pk, direction = position
+    if direction == 'next':
+        return queryset.filter(
+            Q(published_at__lt=published_at)
+            | Q(published_at=published_at, id__lt=pk)
+        ).order_by('-published_at', '-id')
+    return queryset.filter(
+        Q(published_at__gt=published_at)
+        | Q(published_at=published_at, id__gt=pk)
+    ).order_by('published_at', 'id')
+
+
+def _first_page(queryset, per_page):
+    rows = list(queryset.order_by('-published_at', '-id')[:per_page + 1])
+    return CursorPage(rows[:per_page], len(rows) > per_page, False)
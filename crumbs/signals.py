@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from preferences.models import UserPreference
+from .models import Crumb
+from . import timeline
+
+
+@receiver(post_save, sender=Crumb)
+def update_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.push([instance])
+        timeline.fan_out([instance])
+    else:
+        # The publish time or topic may have changed.
+        timeline.invalidate([instance.topic_id])
+
+
+@receiver(post_delete, sender=Crumb)
+def remove_from_timeline(sender, instance, **kwargs):
+    timeline.invalidate([instance.topic_id])
+
+
+@receiver(m2m_changed, sender=UserPreference.topics.through)
+def update_user_feed(sender, instance, action, pk_set, **kwargs):
+    # Only precomputed feeds need this; the timeline merge reads the
+    # preferences on every request.
+    if getattr(settings, 'FEED_STRATEGY', 'timeline') != 'fanout' \
+            or not isinstance(instance, UserPreference):
+        return
+    if action == 'post_add' and \
+            timeline.extend_user_feed(instance.user_id, pk_set):
+        return
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # Entries do not record which topic brought them in, so removals
+        # (and feeds not cached yet) are rebuilt in full.
+        timeline.store_user_feed(
+            instance.user_id,
+            instance.topics.values_list('id', flat=True),
+        )
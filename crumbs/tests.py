@@ -1,15 +1,51 @@
 import datetime
+import re
+import unittest
 
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 
 from accounts.models import CustomUser, Profile
+from core.testing import isolated_caches
 from preferences.models import Topic, UserPreference
 from subscriptions.models import SubscriptionPlan, UserSubscription
-from feedback.models import SavedCrumb
+from feedback.models import Comment, SavedCrumb
 from .models import Crumb
+from . import timeline
+from .pagination import decode_cursor, keyset_queryset, paginate_crumbs
+from .utils import canonicalize_url, hash_url
+
+
+class CanonicalUrlTest(SimpleTestCase):
+    """
+    Tests for URL canonicalization used in crumb deduplication.
+    """
+
+    def test_strips_tracking_params_fragment_and_trailing_slash(self):
+        """
+        utm_* params, fragments, host case and trailing slashes are removed.
+        """
+        self.assertEqual(
+            canonicalize_url(
+                "HTTPS://News.Example.com/story/?utm_source=x&id=5"
+                "&UTM_Medium=y#comments"
+            ),
+            "https://news.example.com/story?id=5",
+        )
+
+    def test_hash_is_fixed_width_and_stable(self):
+        """
+        Equivalent URLs share a 64 character hash.
+        """
+        digest = hash_url("https://example.com/a?utm_campaign=z")
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(digest, hash_url("https://EXAMPLE.com/a/"))
+        self.assertNotEqual(digest, hash_url("https://example.com/b"))
 
 
 class CrumbModelTest(TestCase):
@@ -41,6 +77,25 @@ class CrumbModelTest(TestCase):
         self.assertIsNotNone(crumb.added_on)
         self.assertLess(crumb.published_at, crumb.added_on)
 
+    def test_crumb_save_sets_url_hash(self):
+        """
+        Saving a Crumb stores its canonical URL and hash, which are unique.
+        """
+        crumb = Crumb.objects.create(
+            title='Hashed', summary='S', url='https://Example.com/x/',
+            source='Source', topic=self.topic, published_at=timezone.now()
+        )
+        self.assertEqual(crumb.canonical_url, 'https://example.com/x')
+        self.assertEqual(crumb.url_hash, hash_url('https://example.com/x'))
+
+        with self.assertRaises(IntegrityError):
+            Crumb.objects.create(
+                title='Copy', summary='S',
+                url='https://example.com/x?utm_source=feed',
+                source='Source', topic=self.topic,
+                published_at=timezone.now()
+            )
+
     def test_crumb_str_representation(self):
         """
         Test the __str__ method of the Crumb model.
@@ -65,6 +120,9 @@ class CrumbListViewTest(TestCase):
         """
         Set up common data for crumb_list view tests.
         """
+        # Never touch the configured cache.
+        self.enterContext(
+            override_settings(CACHES=isolated_caches(self.id())))
         self.client = Client()
         self.user = CustomUser.objects.create_user(
             username='testuser', email='test@example.com',
@@ -189,6 +247,29 @@ class CrumbListViewTest(TestCase):
         self.assertIn(self.crumb2_finance, response.context['page_obj'])
         self.assertIn(self.crumb4_health, response.context['page_obj'])
 
+    def test_crumb_list_warm_request_only_queries_the_page(self):
+        """
+        Ensure a repeat visit loads the user context and timelines from the
+        cache and only queries the crumbs shown and their saved flags.
+        """
+        UserSubscription.objects.create(
+            user=self.user,
+            plan=self.premium_plan,
+            active=True,
+            end_date=self.future_end_date
+        )
+        user_pref = UserPreference.objects.create(user=self.user)
+        user_pref.topics.add(self.topic1, self.topic2)
+        SavedCrumb.objects.create(user=self.user, crumb=self.crumb1_tech)
+
+        self.client.login(username='testuser', password='password123')
+        self.client.get(reverse('crumb_list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('crumb_list'))
+        # Session and user, then the page's crumbs and flags.
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(response.context['saved_ids'], {self.crumb1_tech.id})
+
     def test_crumb_list_with_selected_topic_filter(self):
         """
         Ensure crumbs are filtered by the 'topic' GET parameter.
@@ -261,9 +342,13 @@ class CrumbListViewTest(TestCase):
         self.assertEqual(len(response_page1.context['page_obj']), 10)
         self.assertTrue(response_page1.context['page_obj'].has_next())
 
-        response_page2 = self.client.get(reverse('crumb_list') + '?page=2')
+        next_cursor = response_page1.context['page_obj'].next_cursor
+        response_page2 = self.client.get(
+            reverse('crumb_list') + f'?cursor={next_cursor}'
+        )
         self.assertEqual(len(response_page2.context['page_obj']), 2)
         self.assertFalse(response_page2.context['page_obj'].has_next())
+        self.assertTrue(response_page2.context['page_obj'].has_previous())
 
 
 class CrumbDetailViewTest(TestCase):
@@ -298,6 +383,17 @@ class CrumbDetailViewTest(TestCase):
         self.assertEqual(response.context['crumb'], self.crumb)
         self.assertFalse(response.context['is_saved'])
 
+    def test_crumb_detail_view_shows_content_while_summary_pending(self):
+        """
+        Ensure a crumb still waiting for its summary shows its content.
+        """
+        self.crumb.summary = ''
+        self.crumb.content = 'Full cleaned text.'
+        self.crumb.summary_status = Crumb.SUMMARY_PENDING
+        self.crumb.save()
+        response = self.client.get(reverse('crumb_detail', args=[self.crumb.pk]))
+        self.assertContains(response, 'Full cleaned text.')
+
     def test_crumb_detail_view_404_for_non_existent_crumb(self):
         """
         Ensure crumb_detail view returns 404 for a non-existent crumb.
@@ -329,4 +425,366 @@ class CrumbDetailViewTest(TestCase):
 
         response = self.client.get(reverse('crumb_detail', args=[self.crumb.pk]))
         self.assertEqual(response.status_code, 200)
-        self.assertFalse(response.context['is_saved'])
\ No newline at end of file
+        self.assertFalse(response.context['is_saved'])
+
+class CursorPaginationTest(TestCase):
+    """
+    Tests for keyset pagination of crumbs on (published_at, id).
+    """
+
+    def setUp(self):
+        topic = Topic.objects.create(name='PagedTopic')
+        now = timezone.now()
+        # Pairs of crumbs share a timestamp to exercise the id tie-break.
+        for i in range(25):
+            Crumb.objects.create(
+                title=f'Crumb {i}', summary='S', url=f'http://c{i}.com',
+                source='Source', topic=topic,
+                published_at=now - datetime.timedelta(minutes=i // 2)
+            )
+        self.expected = list(
+            Crumb.objects.order_by('-published_at', '-id')
+            .values_list('id', flat=True)
+        )
+
+    def _ids(self, page):
+        return [crumb.id for crumb in page]
+
+    def test_walks_forward_and_back(self):
+        queryset = Crumb.objects.all()
+        pages = [paginate_crumbs(queryset, None, 10)]
+        while pages[-1].has_next():
+            pages.append(
+                paginate_crumbs(queryset, pages[-1].next_cursor, 10))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum((self._ids(page) for page in pages), []),
+                         self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginate_crumbs(queryset, pages[2].previous_cursor, 10)
+        self.assertEqual(self._ids(back), self._ids(pages[1]))
+        self.assertTrue(back.has_previous())
+        first = paginate_crumbs(queryset, back.previous_cursor, 10)
+        self.assertEqual(self._ids(first), self.expected[:10])
+        self.assertFalse(first.has_previous())
+
+    def test_invalid_cursor_gives_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = paginate_crumbs(Crumb.objects.all(), 'not-a-cursor', 10)
+        self.assertEqual(self._ids(page), self.expected[:10])
+
+    def test_deep_pages_cost_one_query_without_count(self):
+        page = paginate_crumbs(Crumb.objects.all(), None, 10)
+        with CaptureQueriesContext(connection) as queries:
+            paginate_crumbs(Crumb.objects.all(), page.next_cursor, 10)
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_infinite_api_uses_cursor(self):
+        response = self.client.get(reverse('infinite_crumbs_api'))
+        data = response.json()
+        self.assertTrue(data['has_next'])
+        self.assertNotIn('next_page', data)
+
+        response = self.client.get(
+            reverse('infinite_crumbs_api'),
+            {'cursor': data['next_cursor']},
+        )
+        data = response.json()
+        ids = [crumb['id'] for crumb in data['new'] + data['old']]
+        self.assertEqual(ids, self.expected[10:20])
+
+
+class TimelineFeedTest(TestCase):
+    """
+    Tests for feed pages merged from the cached per-topic timelines.
+    """
+
+    def setUp(self):
+        # Never touch the configured cache.
+        self.enterContext(
+            override_settings(CACHES=isolated_caches(self.id())))
+        self.topics = [Topic.objects.create(name=f'Timeline {i}')
+                       for i in range(3)]
+        now = timezone.now()
+        # Topics interleave, and some crumbs share a timestamp.
+        for i in range(30):
+            Crumb.objects.create(
+                title=f'Crumb {i}', summary='S', url=f'http://tl{i}.com',
+                source='Source', topic=self.topics[i % 3],
+                published_at=now - datetime.timedelta(minutes=i // 2)
+            )
+        self.topic_ids = [topic.id for topic in self.topics[:2]]
+        self.expected = list(
+            Crumb.objects.filter(topic__in=self.topic_ids)
+            .order_by('-published_at', '-id').values_list('id', flat=True)
+        )
+
+    def _walk(self):
+        pages = [timeline.feed_page(self.topic_ids, None, 5)]
+        while pages[-1].has_next():
+            pages.append(timeline.feed_page(
+                self.topic_ids, pages[-1].next_cursor, 5))
+        return pages
+
+    def _ids(self, pages):
+        return [crumb.id for page in pages for crumb in page]
+
+    def test_merge_matches_database_order(self):
+        pages = self._walk()
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5])
+        self.assertEqual(self._ids(pages), self.expected)
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(pages[1].has_previous())
+
+    def test_warm_read_only_loads_the_page(self):
+        first = timeline.feed_page(self.topic_ids, None, 5)
+        with CaptureQueriesContext(connection) as queries:
+            page = timeline.feed_page(self.topic_ids, first.next_cursor, 5)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('IN', queries[0]['sql'])
+        self.assertEqual([crumb.id for crumb in page], self.expected[5:10])
+
+    def test_new_crumbs_are_pushed_to_cached_timelines(self):
+        timeline.feed_page(self.topic_ids, None, 5)
+        crumb = Crumb.objects.create(
+            title='Newest', summary='S', url='http://tl-new.com',
+            source='Source', topic=self.topics[1],
+            published_at=timezone.now() + datetime.timedelta(minutes=1)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            page = timeline.feed_page(self.topic_ids, None, 5)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(page.object_list[0], crumb)
+
+    def test_truncated_timelines_fall_back_to_database(self):
+        with self.settings(FEED_TIMELINE_SIZE=4):
+            pages = self._walk()
+        self.assertEqual(self._ids(pages), self.expected)
+
+    @override_settings(FEED_TIMELINE_TIMEOUT=86400, USER_FEED_TIMEOUT=None,
+                       FEED_LOCAL_CACHE_TIMEOUT=60)
+    def test_timeouts_are_short_without_a_shared_cache(self):
+        self.assertEqual(
+            timeline.cache_timeout('FEED_TIMELINE_TIMEOUT', 86400), 60)
+        self.assertEqual(timeline.cache_timeout('USER_FEED_TIMEOUT', None),
+                         60)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://127.0.0.1:6379/1',
+        }}):
+            self.assertEqual(
+                timeline.cache_timeout('FEED_TIMELINE_TIMEOUT', 86400), 86400)
+            self.assertIsNone(
+                timeline.cache_timeout('USER_FEED_TIMEOUT', None))
+
+    def test_deleted_crumb_is_not_shown(self):
+        timeline.feed_page(self.topic_ids, None, 5)
+        Crumb.objects.filter(pk=self.expected[0]).delete()
+        page = timeline.feed_page(self.topic_ids, None, 5)
+        self.assertEqual([crumb.id for crumb in page], self.expected[1:6])
+
+
+@override_settings(FEED_STRATEGY='fanout')
+class UserFeedTest(TestCase):
+    """
+    Tests for precomputed per-user feeds (fan-out on write).
+    """
+
+    def setUp(self):
+        # Never touch the configured cache.
+        self.enterContext(
+            override_settings(CACHES=isolated_caches(self.id())))
+        self.user = CustomUser.objects.create_user(
+            username='feeduser', email='feed@example.com',
+            password='password123'
+        )
+        self.topics = [Topic.objects.create(name=f'Feed {i}')
+                       for i in range(3)]
+        now = timezone.now()
+        self.crumbs = [
+            Crumb.objects.create(
+                title=f'Crumb {i}', summary='S', url=f'http://uf{i}.com',
+                source='Source', topic=self.topics[i % 3],
+                published_at=now - datetime.timedelta(minutes=i)
+            )
+            for i in range(12)
+        ]
+        self.preference = UserPreference.objects.create(user=self.user)
+        self.preference.topics.add(self.topics[0])
+
+    def _feed_ids(self, per_page=20):
+        page = timeline.user_feed_page(
+            self.user.pk,
+            self.preference.topics.values_list('id', flat=True),
+            None, per_page)
+        return [crumb.id for crumb in page]
+
+    def _topic_ids(self, *indexes):
+        return [crumb.id for crumb in self.crumbs if crumb.topic in
+                [self.topics[i] for i in indexes]]
+
+    def test_feed_is_built_when_preferences_change(self):
+        self.assertIn(timeline.user_feed_key(self.user.pk), cache)
+        with CaptureQueriesContext(connection) as queries:
+            page = timeline.user_feed_page(
+                self.user.pk, [self.topics[0].id], None, 3)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([crumb.id for crumb in page],
+                         self._topic_ids(0)[:3])
+        self.assertTrue(page.has_next())
+
+    def test_new_crumbs_are_fanned_out(self):
+        crumb = Crumb.objects.create(
+            title='Newest', summary='S', url='http://uf-new.com',
+            source='Source', topic=self.topics[0],
+            published_at=timezone.now() + datetime.timedelta(minutes=1)
+        )
+        tagged = Crumb.objects.create(
+            title='Tagged', summary='S', url='http://uf-tagged.com',
+            source='Source', topic=self.topics[2],
+            published_at=timezone.now() + datetime.timedelta(minutes=2)
+        )
+        tagged.tags.add(self.topics[0].name)
+        timeline.fan_out([tagged], [[self.topics[0].name]])
+
+        self.assertEqual(self._feed_ids()[:2], [tagged.id, crumb.id])
+
+    def test_preference_changes_update_the_feed(self):
+        self.preference.topics.add(self.topics[1])
+        self.assertEqual(self._feed_ids(), self._topic_ids(0, 1))
+
+        self.preference.topics.remove(self.topics[0])
+        self.assertEqual(self._feed_ids(), self._topic_ids(1))
+
+    def test_truncated_feed_falls_back_to_database(self):
+        with self.settings(USER_FEED_SIZE=2):
+            timeline.invalidate_user_feed(self.user.pk)
+            first = timeline.user_feed_page(
+                self.user.pk, [self.topics[0].id], None, 2)
+            second = timeline.user_feed_page(
+                self.user.pk, [self.topics[0].id], first.next_cursor, 2)
+        shown = first.object_list + second.object_list
+        self.assertEqual([crumb.id for crumb in shown], self._topic_ids(0))
+
+    def test_crumb_list_reads_the_user_feed(self):
+        plan = SubscriptionPlan.objects.create(
+            name='Premium', price=20.00, topic_limit=12)
+        UserSubscription.objects.create(
+            user=self.user, plan=plan, active=True,
+            end_date=timezone.now() + datetime.timedelta(days=30)
+        )
+        self.client.login(username='feeduser', password='password123')
+        response = self.client.get(reverse('crumb_list'))
+        self.assertEqual([crumb.id for crumb in response.context['page_obj']],
+                         self._topic_ids(0))
+
+
+@unittest.skipUnless(connection.vendor in ('sqlite', 'postgresql'),
+                     'Query plans are only checked on SQLite and PostgreSQL.')
+class QueryPlanTest(TestCase):
+    """
+    Seeds a large dataset and checks that the hot feed, detail and profile
+    queries are served from an index rather than a full table scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        topics = Topic.objects.bulk_create([
+            Topic(name=f'Plan Topic {i}', slug=f'plan-topic-{i}')
+            for i in range(20)
+        ])
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'plan-user-{i}', email=f'p{i}@example.com')
+            for i in range(50)
+        ])
+        now = timezone.now()
+        crumbs = Crumb.objects.bulk_create([
+            Crumb(
+                title=f'Plan Crumb {i}', summary='S',
+                url=f'http://plan{i}.com', source='Plan',
+                topic=topics[i % len(topics)],
+                published_at=now - datetime.timedelta(minutes=i),
+            )
+            for i in range(5000)
+        ])
+        Comment.objects.bulk_create([
+            Comment(user=users[i % len(users)],
+                    crumb=crumbs[i % len(crumbs)], content='C')
+            for i in range(5000)
+        ])
+        SavedCrumb.objects.bulk_create([
+            SavedCrumb(user=users[i % len(users)], crumb=crumbs[i])
+            for i in range(2500)
+        ])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        cls.topics = topics
+        cls.user = users[0]
+        cls.crumb = crumbs[0]
+
+    def assertUsesIndex(self, queryset, table, ordered=True):
+        """
+        Fails if the plan for ``queryset`` scans ``table`` without an index
+        or, with ``ordered``, sorts the rows instead of reading them in
+        index order.
+        """
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            full_scan = re.compile(rf'\bSCAN {table}\b(?!.*INDEX)')
+            sort = re.compile(r'USE TEMP B-TREE FOR ORDER BY')
+        else:
+            full_scan = re.compile(rf'Seq Scan on {table}\b')
+            sort = re.compile(r'^\s*(->\s*)?Sort\b', re.MULTILINE)
+        self.assertIsNone(full_scan.search(plan),
+                          f'Full scan of {table}:\n{plan}')
+        if ordered:
+            self.assertIsNone(sort.search(plan),
+                              f'Sort instead of index order:\n{plan}')
+
+    def test_feed_for_preferred_topics(self):
+        # Several topics are merged, so only index use is required.
+        feed = Crumb.objects.filter(topic__in=self.topics[:2])
+        self.assertUsesIndex(
+            feed.order_by('-published_at', '-id')[:11], 'crumbs_crumb',
+            ordered=False,
+        )
+
+        # The query paginate_crumbs runs for the following page.
+        page = paginate_crumbs(feed, None, 10)
+        position = decode_cursor(page.next_cursor)
+        self.assertUsesIndex(
+            keyset_queryset(feed, position)[:11], 'crumbs_crumb',
+            ordered=False,
+        )
+
+    def test_feed_for_selected_topic(self):
+        self.assertUsesIndex(
+            Crumb.objects.filter(topic=self.topics[0])
+            .order_by('-published_at', '-id')[:11],
+            'crumbs_crumb',
+        )
+
+    def test_unfiltered_feed(self):
+        self.assertUsesIndex(
+            Crumb.objects.order_by('-published_at', '-id')[:11],
+            'crumbs_crumb',
+        )
+
+    def test_crumb_detail_comments(self):
+        self.assertUsesIndex(
+            self.crumb.comments.order_by('-created_at'), 'feedback_comment')
+
+    def test_profile_saved_crumbs_and_comments(self):
+        self.assertUsesIndex(
+            SavedCrumb.objects.filter(user=self.user).order_by('-saved_at'),
+            'feedback_savedcrumb',
+        )
+        self.assertUsesIndex(
+            Comment.objects.filter(user=self.user).order_by('-created_at'),
+            'feedback_comment',
+        )
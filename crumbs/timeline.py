@@ -0,0 +1,405 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from preferences.models import Topic, UserPreference
+from .models import Crumb
+from .pagination import CursorPage, decode_cursor, paginate_crumbs
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_lock = threading.Lock()
+# Returned by _merged_page() when a cached entry no longer matches a crumb.
+STALE = object()
+
+
+class Timeline:
+    """
+    The most recent crumbs of one topic, oldest first, as two parallel
+    arrays of publish times (microseconds since the epoch) and crumb ids.
+
+    ``complete`` is False once older crumbs have been dropped to keep the
+    timeline at FEED_TIMELINE_SIZE entries; entries older than the oldest
+    one kept can then only come from the database.
+    """
+
+    def __init__(self, stamps, ids, complete):
+        self.stamps = stamps
+        self.ids = ids
+        self.complete = complete
+
+    @classmethod
+    def from_entries(cls, entries, complete):
+        """
+        Builds a timeline from (stamp, id) pairs sorted oldest first.
+        """
+        return cls(array('q', [stamp for stamp, _ in entries]),
+                   array('q', [pk for _, pk in entries]), complete)
+
+    def entries(self):
+        return list(zip(self.stamps, self.ids))
+
+    def oldest(self):
+        """
+        Returns the oldest (stamp, id) entry, or None if it is empty.
+        """
+        if not self.ids:
+            return None
+        return self.stamps[0], self.ids[0]
+
+    def before(self, position=None):
+        """
+        Yields (stamp, id) entries newest first, starting just after
+        ``position`` (a (stamp, id) pair) or at the newest entry.
+        """
+        end = len(self.ids)
+        if position is not None:
+            stamp, pk = position
+            end = bisect_left(self.stamps, stamp)
+            while end < len(self.ids) and self.stamps[end] == stamp \
+                    and self.ids[end] < pk:
+                end += 1
+        for index in range(end - 1, -1, -1):
+            yield self.stamps[index], self.ids[index]
+
+
+def to_stamp(published_at):
+    """
+    Returns ``published_at`` as integer microseconds since the epoch.
+    """
+    return (published_at - EPOCH) // timedelta(microseconds=1)
+
+
+def cache_is_shared():
+    """
+    Returns False when the default cache lives in each process's own memory,
+    where crumbs pushed by the pipeline commands never reach the web server.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    return backend.rsplit('.', 1)[-1] not in ('LocMemCache', 'DummyCache')
+
+
+def cache_timeout(name, default):
+    """
+    Returns the timeout setting ``name``, cut to FEED_LOCAL_CACHE_TIMEOUT
+    seconds when the cache is not shared so that feeds pick up crumbs
+    stored by other processes from the database.
+    """
+    timeout = getattr(settings, name, default)
+    if cache_is_shared():
+        return timeout
+    local = getattr(settings, 'FEED_LOCAL_CACHE_TIMEOUT', 60)
+    return local if timeout is None else min(timeout, local)
+
+
+def timeline_key(topic_id):
+    return f"crumbs:timeline:{topic_id}"
+
+
+def build_timeline(topic_id):
+    """
+    Reads the newest FEED_TIMELINE_SIZE crumbs of a topic with one indexed
+    query.
+    """
+    size = getattr(settings, 'FEED_TIMELINE_SIZE', 500)
+    rows = list(
+        Crumb.objects.filter(topic_id=topic_id)
+        .order_by('-published_at', '-id')
+        .values_list('published_at', 'id')[:size + 1]
+    )
+    entries = [(to_stamp(published_at), pk)
+               for published_at, pk in reversed(rows[:size])]
+    return Timeline.from_entries(entries, complete=len(rows) <= size)
+
+
+def load_timelines(topic_ids):
+    """
+    Returns the timelines of ``topic_ids`` from the cache, building and
+    storing the missing ones.
+    """
+    keys = {timeline_key(topic_id): topic_id for topic_id in topic_ids}
+    found = cache.get_many(list(keys))
+    missing = {}
+    for key, topic_id in keys.items():
+        if key not in found:
+            missing[key] = build_timeline(topic_id)
+    if missing:
+        cache.set_many(missing, cache_timeout('FEED_TIMELINE_TIMEOUT', 86400))
+    return [found.get(key) or missing[key] for key in keys]
+
+
+def push(crumbs):
+    """
+    Adds newly saved crumbs to the cached timelines of their topics.
+
+    Timelines that are not cached are left alone; they are built from the
+    database the next time they are read.
+
+    Args:
+        crumbs (list): Saved Crumb objects; ones without a pk are skipped.
+    """
+    new = {}
+    for crumb in crumbs:
+        if crumb.pk is not None:
+            new.setdefault(timeline_key(crumb.topic_id), set()).add(
+                (to_stamp(crumb.published_at), crumb.pk))
+    _merge_cached(new, getattr(settings, 'FEED_TIMELINE_SIZE', 500),
+                  cache_timeout('FEED_TIMELINE_TIMEOUT', 86400))
+
+
+def _merge_cached(new, size, timeout, complete=None):
+    """
+    Merges sets of (stamp, id) entries into the timelines cached under
+    each key, keeping the newest ``size``. Keys that are not cached are
+    skipped.
+
+    Args:
+        new (dict): {cache key: set of entries}.
+        size (int): Maximum entries per timeline.
+        timeout (int): Cache timeout in seconds.
+        complete (dict): {cache key: bool}, False where ``new`` does not
+            hold every older entry that should be merged in.
+    """
+    if not new:
+        return
+    with _lock:
+        updated = {}
+        for key, cached in cache.get_many(list(new)).items():
+            entries = sorted(set(cached.entries()) | new[key])
+            is_complete = cached.complete and len(entries) <= size \
+                and (complete or {}).get(key, True)
+            updated[key] = Timeline.from_entries(entries[-size:],
+                                                 is_complete)
+        if updated:
+            cache.set_many(updated, timeout)
+
+
+def invalidate(topic_ids):
+    """
+    Drops the cached timelines of ``topic_ids``.
+    """
+    cache.delete_many([timeline_key(topic_id) for topic_id in topic_ids])
+
+
+def feed_page(topic_ids, cursor=None, per_page=10):
+    """
+    Returns one page of the feed for ``topic_ids``, newest first.
+
+    The page is picked by a k-way heap merge of the cached per-topic
+    timelines, so the only crumb query is the one that loads the crumbs
+    shown. Cursors are the same as paginate_crumbs()'s; previous-page
+    cursors, stale timelines and pages older than what the timelines hold
+    are served by paginate_crumbs() instead.
+
+    Args:
+        topic_ids (list): Ids of the topics in the feed.
+        cursor (str): Token from a previous page's ``next_cursor`` or
+            ``previous_cursor``.
+        per_page (int): Crumbs per page.
+
+    Returns:
+        CursorPage: The requested page.
+    """
+    topic_ids = list(topic_ids)
+    if not topic_ids:
+        return CursorPage([], False, False)
+    queryset = Crumb.objects.filter(topic__in=topic_ids)
+    position = decode_cursor(cursor)
+    if not getattr(settings, 'FEED_TIMELINE_CACHE', True) \
+            or (position and position[2] != 'next'):
+        return paginate_crumbs(queryset, cursor, per_page)
+
+    page = _merged_page(
+        load_timelines(topic_ids), position, per_page,
+        lambda crumb: crumb.topic_id in topic_ids,
+    )
+    if page is None:
+        return paginate_crumbs(queryset, cursor, per_page)
+    if page is STALE:
+        invalidate(topic_ids)
+        return paginate_crumbs(queryset, cursor, per_page)
+    return page
+
+
+def _merged_page(timelines, position, per_page, belongs):
+    """
+    Picks a page from the heap merge of ``timelines`` after ``position``
+    and loads its crumbs with one query.
+
+    Returns:
+        CursorPage, None if the page reaches past what a truncated timeline
+        holds, or STALE if a crumb is missing or fails ``belongs``.
+    """
+    start = (to_stamp(position[0]), position[1]) if position else None
+    # Past the oldest entry kept by a truncated timeline, that topic may
+    # have crumbs the merge cannot see.
+    floor = max((timeline.oldest() for timeline in timelines
+                 if not timeline.complete), default=None)
+
+    picked = []
+    for stamp, pk in heapq.merge(
+            *(timeline.before(start) for timeline in timelines),
+            reverse=True):
+        if floor is not None and (stamp, pk) < floor:
+            break
+        picked.append(pk)
+        if len(picked) > per_page:
+            break
+    if len(picked) <= per_page and floor is not None:
+        return None
+
+    shown = picked[:per_page]
+    crumbs = Crumb.objects.in_bulk(shown)
+    if any(pk not in crumbs or not belongs(crumbs[pk]) for pk in shown):
+        # A crumb was deleted or moved since the timeline was cached.
+        return STALE
+    return CursorPage([crumbs[pk] for pk in shown], len(picked) > per_page,
+                      position is not None)
+
+
+def user_feed_key(user_id):
+    return f"crumbs:userfeed:{user_id}"
+
+
+def user_feed_queryset(topic_ids):
+    """
+    Returns the crumbs that belong in a user feed for ``topic_ids``: those
+    filed under the topics or tagged with their names.
+    """
+    names = list(Topic.objects.filter(id__in=topic_ids).values_list(
+        'name', flat=True))
+    return Crumb.objects.filter(
+        Q(topic__in=topic_ids) | Q(tags__name__in=names)).distinct()
+
+
+def build_user_feed(topic_ids, limit=None):
+    """
+    Reads the newest USER_FEED_SIZE entries of a user feed for
+    ``topic_ids`` from the database.
+    """
+    size = limit or getattr(settings, 'USER_FEED_SIZE', 1000)
+    rows = list(
+        user_feed_queryset(topic_ids).order_by('-published_at', '-id')
+        .values_list('published_at', 'id')[:size + 1]
+    )
+    entries = [(to_stamp(published_at), pk)
+               for published_at, pk in reversed(rows[:size])]
+    return Timeline.from_entries(entries, complete=len(rows) <= size)
+
+
+def store_user_feed(user_id, topic_ids):
+    """
+    Builds a user's feed from the database and caches it.
+    """
+    feed = build_user_feed(topic_ids)
+    cache.set(user_feed_key(user_id), feed,
+              cache_timeout('USER_FEED_TIMEOUT', None))
+    return feed
+
+
+def extend_user_feed(user_id, topic_ids):
+    """
+    Merges the crumbs of newly preferred topics into a cached user feed
+    without rebuilding the rest of it.
+
+    Returns:
+        bool: False if the feed is not cached and nothing was done.
+    """
+    key = user_feed_key(user_id)
+    if key not in cache:
+        return False
+    added = build_user_feed(topic_ids)
+    _merge_cached({key: set(added.entries())},
+                  getattr(settings, 'USER_FEED_SIZE', 1000),
+                  cache_timeout('USER_FEED_TIMEOUT', None),
+                  complete={key: added.complete})
+    return True
+
+
+def invalidate_user_feed(user_id):
+    cache.delete(user_feed_key(user_id))
+
+
+def fan_out(crumbs, tag_names=None):
+    """
+    Pushes newly saved crumbs into the cached feeds of every user whose
+    preferences include the crumb's topic or one of its tags, with one
+    query for the matching users. Only runs when FEED_STRATEGY is
+    'fanout'; feeds that are not cached are built when first opened.
+
+    Args:
+        crumbs (list): Saved Crumb objects; ones without a pk are skipped.
+        tag_names (list): Topic names each crumb was tagged with.
+    """
+    if getattr(settings, 'FEED_STRATEGY', 'timeline') != 'fanout':
+        return
+    if tag_names is None:
+        tag_names = [[] for _ in crumbs]
+    names = {name for crumb_names in tag_names for name in crumb_names}
+    topic_ids = dict(Topic.objects.filter(name__in=names).values_list(
+        'name', 'id')) if names else {}
+
+    by_topic = {}
+    for crumb, crumb_names in zip(crumbs, tag_names):
+        if crumb.pk is None:
+            continue
+        entry = (to_stamp(crumb.published_at), crumb.pk)
+        for topic_id in {crumb.topic_id} | {
+                topic_ids[name] for name in crumb_names if name in topic_ids}:
+            by_topic.setdefault(topic_id, set()).add(entry)
+    if not by_topic:
+        return
+
+    new = {}
+    for user_id, topic_id in UserPreference.topics.through.objects.filter(
+            topic_id__in=list(by_topic)
+    ).values_list('userpreference__user_id', 'topic_id'):
+        new.setdefault(user_feed_key(user_id), set()).update(
+            by_topic[topic_id])
+    _merge_cached(new, getattr(settings, 'USER_FEED_SIZE', 1000),
+                  cache_timeout('USER_FEED_TIMEOUT', None))
+
+
+def user_feed_page(user_id, topic_ids, cursor=None, per_page=10):
+    """
+    Returns one page of a user's precomputed feed (FEED_STRATEGY
+    'fanout'), newest first.
+
+    The feed is one cached list of crumb ids kept current by fan_out(), so
+    a page costs one cache lookup and one query for the crumbs shown.
+    Previous-page cursors, stale feeds and pages older than the feed holds
+    are served from the database.
+
+    Args:
+        user_id (int): Owner of the feed.
+        topic_ids (list): The user's preferred topic ids.
+        cursor (str): Token from a previous page.
+        per_page (int): Crumbs per page.
+
+    Returns:
+        CursorPage: The requested page.
+    """
+    topic_ids = list(topic_ids)
+    if not topic_ids:
+        return CursorPage([], False, False)
+    position = decode_cursor(cursor)
+    if position and position[2] != 'next':
+        return paginate_crumbs(user_feed_queryset(topic_ids), cursor,
+                               per_page)
+
+    feed = cache.get(user_feed_key(user_id))
+    if feed is None:
+        feed = store_user_feed(user_id, topic_ids)
+    page = _merged_page([feed], position, per_page, lambda crumb: True)
+    if page is STALE:
+        invalidate_user_feed(user_id)
+    if page is None or page is STALE:
+        return paginate_crumbs(user_feed_queryset(topic_ids), cursor,
+                               per_page)
+    return page
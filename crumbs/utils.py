@@ -0,0 +1,36 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def canonicalize_url(url):
+    """
+    Normalizes a URL so trivially different links to the same page compare
+    equal.
+
+    Lowercases the scheme and host, drops the fragment, removes ``utm_*``
+    tracking parameters and strips a trailing slash from the path. Other
+    query parameters are kept in their original order.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = urlencode([
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    ])
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        query,
+        "",
+    ))
+
+
+def hash_url(url):
+    """
+    Returns the fixed-width (64 hex characters) SHA-256 digest of the
+    canonical form of ``url``.
+    """
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
@@ -1,11 +1,10 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
 
-from preferences.models import UserPreference, Topic
-from subscriptions.models import UserSubscription
+from accounts.context import get_topics, get_user_context, saved_crumb_ids
 from feedback.forms import CommentForm
-from feedback.models import Comment, SavedCrumb
 from .models import Crumb
+from .timeline import feed_page, user_feed_page
 
 
 def crumb_list(request):
@@ -16,56 +15,42 @@ def crumb_list(request):
     """
     user = request.user
     selected_topic = request.GET.get('topic')
-    crumbs = Crumb.objects.none()
-    saved_crumbs = []
-    topics = Topic.objects.all()
 
     # Enforce login
     if not user.is_authenticated:
         return redirect('account_login')
 
-    # Enforce active subscription
-    subscription = UserSubscription.objects.filter(
-        user=user, active=True
-    ).first()
-    if not subscription:
+    # Enforce active subscription; plan and preferences come from the
+    # cached user context
+    context = get_user_context(request)
+    if not context.subscribed:
         return redirect('choose_plan')
 
-    # Get user preferences
-    pref_obj = UserPreference.objects.filter(user=user).first()
-    preferred_topics = pref_obj.topics.values_list(
-        'id', flat=True
-    ) if pref_obj else []
-
-    # Limit topics for basic plan
-    if subscription.plan and subscription.plan.name.lower() == "basic":
-        preferred_topics = list(preferred_topics)[:2]
-
-    # Get saved crumbs
-    saved_ids = []
-    if request.user.is_authenticated:
-        saved_ids = SavedCrumb.objects.filter(
-            user=request.user
-            ).values_list(
-                'crumb_id', flat=True
-                )
-
-    # Filter crumbs by preferred topics
-    crumbs = Crumb.objects.filter(topic__in=preferred_topics)
-
-    # Filter by selected topic if provided
+    # Preferred topics, limited for the basic plan, and filtered by the
+    # selected topic if provided
+    feed_topics = context.feed_topic_ids
     if selected_topic:
-        crumbs = crumbs.filter(topic_id=selected_topic)
-
-    # Paginate results
-    paginator = Paginator(crumbs.order_by('-published_at'), 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        feed_topics = [
+            topic_id for topic_id in feed_topics
+            if str(topic_id) == selected_topic
+        ]
+
+    # Read the user's precomputed feed, or merge the cached timelines of
+    # the feed's topics, with a cursor on (published_at, id)
+    cursor = request.GET.get('cursor')
+    if getattr(settings, 'FEED_STRATEGY', 'timeline') == 'fanout' \
+            and not selected_topic and not context.limited:
+        page_obj = user_feed_page(user.pk, feed_topics, cursor, 10)
+    else:
+        page_obj = feed_page(feed_topics, cursor, 10)
+
+    # Saved flags for the crumbs on this page only
+    saved_ids = saved_crumb_ids(user, [crumb.id for crumb in page_obj])
 
     return render(request, 'crumbs/crumbs_list.html', {
         'page_obj': page_obj,
         'saved_ids': saved_ids,
-        'topics': topics,
+        'topics': get_topics(),
         'selected_topic': int(selected_topic) if selected_topic else None,
     })
 
@@ -76,18 +61,15 @@ def crumb_detail(request, pk):
     If the user is authenticated, check if the crumb is saved by the user.
     """
 
-    crumb = get_object_or_404(Crumb, pk=pk)
+    crumb = get_object_or_404(Crumb.objects.select_related('topic'), pk=pk)
     comment_form = CommentForm()
     comments = crumb.comments.select_related('user').order_by('-created_at')
-    is_saved = False
-
-    if request.user.is_authenticated:
-        is_saved = SavedCrumb.objects.filter(user=request.user, crumb=crumb).exists()
+    saved_ids = saved_crumb_ids(request.user, [crumb.id])
 
     context = {
         "crumb": crumb,
         "comment_form": comment_form,
         "comments": comments,
-        'is_saved': is_saved,
+        'is_saved': crumb.id in saved_ids,
     }
     return render(request, "crumbs/crumb_detail.html", context)
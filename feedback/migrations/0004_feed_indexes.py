@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 07:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0007_feed_indexes'),
+        ('feedback', '0003_comment_updated_at_alter_likedcrumb_crumb_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['crumb', '-created_at'], name='comment_crumb_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['user', '-created_at'], name='comment_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedcrumb',
+            index=models.Index(fields=['user', '-saved_at'], name='savedcrumb_user_saved_idx'),
+        ),
+    ]
@@ -24,6 +24,12 @@ class SavedCrumb(models.Model):
                 fields=['user', 'crumb'], name='unique_saved_crumb'
             )
         ]
+        indexes = [
+            # A user's saved crumbs, most recent first (profile page).
+            models.Index(
+                fields=['user', '-saved_at'], name='savedcrumb_user_saved_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} saved {self.crumb.title}"
@@ -69,5 +75,19 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Comments under a crumb (detail page), newest first.
+            models.Index(
+                fields=['crumb', '-created_at'],
+                name='comment_crumb_created_idx',
+            ),
+            # A user's comment history (profile page), newest first.
+            models.Index(
+                fields=['user', '-created_at'],
+                name='comment_user_created_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user.username} on {self.crumb.title}"
@@ -175,6 +175,12 @@ STRIPE_CURRENCY = 'gbp'
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY', '')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WH_SECRET', '')
+# Webhook events are queued on receipt and handled by
+# `manage.py process_webhooks` (events per batch, attempts before an event
+# is marked failed, seconds before a failed event is retried).
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', 50))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', 5))
+WEBHOOK_RETRY_DELAY = int(os.getenv('WEBHOOK_RETRY_DELAY', 60))
 
 # Stripe price lookup table
 STRIPE_PRICE_LOOKUP = {
@@ -190,7 +196,22 @@ STRIPE_PRICE_LOOKUP = {
 
 # Hugging Face API
 HF_API_URL = os.environ.get('HF_API_URL')
+# Summarizer engine: 'huggingface' (remote model) or 'extractive' (local
+# TextRank, no network). The fallback is used when the remote call fails;
+# set it to an empty string to leave those summaries empty.
+SUMMARIZER_ENGINE = os.environ.get('SUMMARIZER_ENGINE', 'huggingface')
+SUMMARIZER_FALLBACK = os.environ.get('SUMMARIZER_FALLBACK', 'extractive')
 HF_API_TOKEN = os.environ.get('HF_API_TOKEN')
+# Number of texts sent in one multi-input summarization request.
+HF_BATCH_SIZE = int(os.environ.get('HF_BATCH_SIZE', 8))
+# Summarization requests in flight at once, and retries with exponential
+# backoff while the model is loading (503).
+HF_MAX_CONCURRENCY = int(os.environ.get('HF_MAX_CONCURRENCY', 4))
+HF_MAX_RETRIES = int(os.environ.get('HF_MAX_RETRIES', 3))
+HF_BACKOFF_BASE = float(os.environ.get('HF_BACKOFF_BASE', 1))
+HF_BACKOFF_MAX = float(os.environ.get('HF_BACKOFF_MAX', 30))
+# Total seconds fetch_crumbs may spend summarizing in one run.
+HF_RUN_DEADLINE = float(os.environ.get('HF_RUN_DEADLINE', 300))
 
 # Environment News
 NEWSDATA_API_KEY = os.environ.get('NEWSDATA_API_KEY')
@@ -216,6 +237,10 @@ NEWSDATA_WORLD_NEWS_URL = (
 # Music
 LASTFM_API_KEY = os.getenv('LASTFM_API_KEY')
 LASTFM_BASE_URL = "http://ws.audioscrobbler.com/2.0/"
+# Artist bios are cached for LASTFM_BIO_TTL seconds and the missing ones are
+# looked up on LASTFM_WORKERS threads (within the 'lastfm' rate limit).
+LASTFM_BIO_TTL = int(os.environ.get('LASTFM_BIO_TTL', 7 * 24 * 3600))
+LASTFM_WORKERS = int(os.environ.get('LASTFM_WORKERS', 5))
 NEWSDATA_MUSIC_NEWS_URL = (
     'https://newsdata.io/api/1/news?'
     f'apikey={NEWSDATA_API_KEY}'  # Reusing the existing NewsData.io key
@@ -305,6 +330,156 @@ NEWSAPI_DIY_URL = (
     f'apiKey={NEWS_API_KEY}'
 )
 
+# Provider-level queries: sources of the same provider are fetched together
+# (up to NEWSDATA_MAX_CATEGORIES categories and a NEWSDATA_MAX_QUERY_LENGTH
+# character query, or a NewsAPI.org query of up to NEWSAPI_MAX_QUERY_LENGTH
+# characters, per request, reading no more pages than the sources would on
+# their own) and each article is routed to its source by category and
+# keywords. PIPELINE_MERGE_QUERIES=False fetches every source
+# with its own URL above.
+NEWSDATA_LATEST_URL = (
+    'https://newsdata.io/api/1/latest?'
+    f'apikey={NEWSDATA_API_KEY}'
+    '&language=en'
+)
+NEWSAPI_EVERYTHING_URL = (
+    'https://newsapi.org/v2/everything?'
+    'language=en&'
+    'sortBy=publishedAt&'
+    'pageSize=100&'
+    f'apiKey={NEWS_API_KEY}'
+)
+NEWSDATA_MAX_CATEGORIES = int(os.environ.get('NEWSDATA_MAX_CATEGORIES', 5))
+NEWSDATA_MAX_QUERY_LENGTH = int(
+    os.environ.get('NEWSDATA_MAX_QUERY_LENGTH', 512))
+NEWSAPI_MAX_QUERY_LENGTH = int(
+    os.environ.get('NEWSAPI_MAX_QUERY_LENGTH', 500))
+# Most results NewsAPI.org serves for one query (100 on the developer plan);
+# paging stops there instead of spending a request on an error.
+NEWSAPI_MAX_RESULTS = int(os.environ.get('NEWSAPI_MAX_RESULTS', 100))
+PIPELINE_MERGE_QUERIES = os.environ.get(
+    'PIPELINE_MERGE_QUERIES', 'True') == 'True'
+
+# Pipeline
+# Number of sources fetch_crumbs fetches in parallel, and how long (seconds)
+# a single source may take before it is skipped for the run.
+PIPELINE_FETCH_WORKERS = int(os.environ.get('PIPELINE_FETCH_WORKERS', 8))
+PIPELINE_SOURCE_TIMEOUT = float(os.environ.get('PIPELINE_SOURCE_TIMEOUT', 60))
+# Pooled keep-alive HTTP sessions shared by all fetchers (one per host).
+PIPELINE_HTTP_POOL_CONNECTIONS = int(
+    os.environ.get('PIPELINE_HTTP_POOL_CONNECTIONS', 4))
+PIPELINE_HTTP_POOL_MAXSIZE = int(
+    os.environ.get('PIPELINE_HTTP_POOL_MAXSIZE', 10))
+PIPELINE_HTTP_TIMEOUT = float(os.environ.get('PIPELINE_HTTP_TIMEOUT', 15))
+# Each source remembers how far it has been fetched. Incremental sources ask
+# their API for items from PIPELINE_WATERMARK_OVERLAP minutes before the
+# newest one seen, and the last PIPELINE_WATERMARK_SEEN item URLs are
+# dropped before they reach a handler.
+PIPELINE_WATERMARK_OVERLAP = int(
+    os.environ.get('PIPELINE_WATERMARK_OVERLAP', 60))
+PIPELINE_WATERMARK_SEEN = int(os.environ.get('PIPELINE_WATERMARK_SEEN', 500))
+# Paged providers (NewsData.io, NewsAPI.org) are followed page by page up to
+# these budgets per source, and fetch_crumbs hands fetched items to the
+# handlers in chunks of PIPELINE_STREAM_CHUNK while later pages download.
+PIPELINE_PAGE_MAX_ITEMS = int(os.environ.get('PIPELINE_PAGE_MAX_ITEMS', 200))
+PIPELINE_PAGE_MAX_BYTES = int(
+    os.environ.get('PIPELINE_PAGE_MAX_BYTES', 5 * 1024 * 1024))
+PIPELINE_PAGE_MAX_PAGES = int(os.environ.get('PIPELINE_PAGE_MAX_PAGES', 10))
+PIPELINE_STREAM_CHUNK = int(os.environ.get('PIPELINE_STREAM_CHUNK', 50))
+# Rate limit (requests per second and burst) and daily quota of each API
+# provider (see pipeline.quota). fetch_crumbs shares what is left of a daily
+# quota evenly over the day's remaining runs and skips sources whose quota
+# is used up; a request that would wait more than PIPELINE_RATE_MAX_WAIT
+# seconds for the rate limit is not sent.
+PIPELINE_PROVIDER_LIMITS = {
+    'newsdata': {'rate': 30 / 900, 'burst': 30, 'daily': int(
+        os.environ.get('NEWSDATA_DAILY_QUOTA', 200))},
+    'newsapi': {'rate': 1, 'burst': 5, 'daily': int(
+        os.environ.get('NEWS_API_DAILY_QUOTA', 100))},
+    'thenewsapi': {'rate': 1, 'burst': 5, 'daily': int(
+        os.environ.get('THENEWSAPI_DAILY_QUOTA', 100))},
+    'mediastack': {'rate': 1, 'burst': 5, 'daily': int(
+        os.environ.get('MEDIASTACK_DAILY_QUOTA', 3))},
+    'spoonacular': {'rate': 1, 'burst': 5, 'daily': int(
+        os.environ.get('SPOONACULAR_DAILY_QUOTA', 150))},
+    'perenual': {'rate': 1, 'burst': 5, 'daily': int(
+        os.environ.get('PERENUAL_DAILY_QUOTA', 100))},
+    'finnhub': {'rate': 1, 'burst': 30},
+    'lastfm': {'rate': 5, 'burst': 5},
+    'trefle': {'rate': 2, 'burst': 10},
+    'permapeople': {'rate': 1, 'burst': 5},
+    'opentdb': {'rate': 0.2, 'burst': 1},
+}
+PIPELINE_RATE_MAX_WAIT = float(os.environ.get('PIPELINE_RATE_MAX_WAIT', 10))
+# Save crumbs straight away with a pending summary and fill summaries in
+# with `manage.py summarize_crumbs` (batch size, crumbs per minute).
+PIPELINE_DEFER_SUMMARIES = os.environ.get(
+    'PIPELINE_DEFER_SUMMARIES', 'True') == 'True'
+SUMMARIZE_BATCH_SIZE = int(os.environ.get('SUMMARIZE_BATCH_SIZE', 32))
+SUMMARIZE_RATE = float(os.environ.get('SUMMARIZE_RATE', 0))
+# Hugging Face summaries are cached by content hash (see pipeline.SummaryCache).
+SUMMARY_CACHE_LRU_SIZE = int(os.environ.get('SUMMARY_CACHE_LRU_SIZE', 1024))
+SUMMARY_CACHE_MAX_AGE_DAYS = int(
+    os.environ.get('SUMMARY_CACHE_MAX_AGE_DAYS', 30))
+SUMMARY_CACHE_MAX_ENTRIES = int(
+    os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', 50000))
+
+# Near-duplicate detection: stories whose text overlaps a crumb from the
+# last NEAR_DUP_WINDOW_DAYS by NEAR_DUP_THRESHOLD (estimated Jaccard) are
+# merged into it instead of being stored again.
+PIPELINE_NEAR_DUP_DETECTION = os.environ.get(
+    'PIPELINE_NEAR_DUP_DETECTION', 'True') == 'True'
+NEAR_DUP_THRESHOLD = float(os.environ.get('NEAR_DUP_THRESHOLD', 0.8))
+NEAR_DUP_WINDOW_DAYS = int(os.environ.get('NEAR_DUP_WINDOW_DAYS', 3))
+
+# Topic classifier trained by `manage.py train_topic_classifier`, and the
+# minimum score for its prediction to be used as a tag. The model is kept in
+# the untracked data/ directory so a trained file is never committed.
+TOPIC_CLASSIFIER_PATH = os.environ.get(
+    'TOPIC_CLASSIFIER_PATH',
+    os.path.join(BASE_DIR, 'data', 'topic_classifier.npz'))
+TOPIC_CLASSIFIER_THRESHOLD = float(
+    os.environ.get('TOPIC_CLASSIFIER_THRESHOLD', 0.2))
+
+# Feed timelines: the newest FEED_TIMELINE_SIZE crumb ids of each topic are
+# kept in the cache and merged per user, so the crumb list only queries the
+# crumbs it shows. The pipeline commands update the timelines as crumbs are
+# saved, which only reaches the web workers through a shared cache; with a
+# per-process cache, timelines and user feeds are instead rebuilt from the
+# database after FEED_LOCAL_CACHE_TIMEOUT seconds.
+FEED_TIMELINE_CACHE = os.environ.get('FEED_TIMELINE_CACHE', 'True') == 'True'
+FEED_TIMELINE_SIZE = int(os.environ.get('FEED_TIMELINE_SIZE', 500))
+FEED_TIMELINE_TIMEOUT = int(os.environ.get('FEED_TIMELINE_TIMEOUT', 86400))
+# 'fanout' instead keeps a precomputed feed of the newest USER_FEED_SIZE
+# crumbs per user, written as crumbs are stored and when preferences
+# change, so opening the feed is one cache lookup.
+FEED_STRATEGY = os.environ.get('FEED_STRATEGY', 'timeline')
+USER_FEED_SIZE = int(os.environ.get('USER_FEED_SIZE', 1000))
+USER_FEED_TIMEOUT = None  # Kept until rebuilt or invalidated.
+FEED_LOCAL_CACHE_TIMEOUT = int(
+    os.environ.get('FEED_LOCAL_CACHE_TIMEOUT', 60))
+
+# Seconds a user's plan and preferred topics stay cached (accounts.context);
+# changes to them clear it straight away.
+USER_CONTEXT_TIMEOUT = int(os.environ.get('USER_CONTEXT_TIMEOUT', 300))
+
+# Seconds the subscription price matrix stays cached; plan and frequency
+# changes rebuild it straight away.
+PRICE_MATRIX_TIMEOUT = int(os.environ.get('PRICE_MATRIX_TIMEOUT', 86400))
+
+# Process-local memory by default. Deployments with several processes
+# (web workers plus the pipeline commands) should share one cache, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://127.0.0.1:6379/1.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'infocrumbs'),
+    }
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
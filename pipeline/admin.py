@@ -1,3 +1,38 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import (
+    ArtistBioCache, CrumbSignature, ProviderQuota, SourceWatermark,
+    SummaryCache,
+)
+
+
+@admin.register(SummaryCache)
+class SummaryCacheAdmin(admin.ModelAdmin):
+    list_display = ('key', 'model', 'hits', 'created_at', 'last_used_at')
+    search_fields = ('summary',)
+    list_filter = ('model',)
+
+
+@admin.register(CrumbSignature)
+class CrumbSignatureAdmin(admin.ModelAdmin):
+    list_display = ('crumb', 'created_at')
+    raw_id_fields = ('crumb',)
+
+
+@admin.register(SourceWatermark)
+class SourceWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('source', 'last_published_at', 'last_item_id',
+                    'updated_at')
+    search_fields = ('source',)
+
+
+@admin.register(ProviderQuota)
+class ProviderQuotaAdmin(admin.ModelAdmin):
+    list_display = ('provider', 'day', 'used', 'updated_at')
+    list_filter = ('provider',)
+
+
+@admin.register(ArtistBioCache)
+class ArtistBioCacheAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'fetched_at')
+    search_fields = ('name', 'key')
@@ -0,0 +1,216 @@
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from pipeline.extractive import STOPWORDS, WORD_RE
+
+
+class TopicClassifier:
+    """
+    Nearest-centroid topic classifier over TF-IDF features.
+
+    Texts are turned into sparse, L2-normalized TF-IDF rows (kept as CSR
+    style ``data``/``indices``/row arrays rather than dense matrices) and
+    compared with one centroid per topic, so a whole batch is scored in a
+    single vectorized operation. Trained by the train_topic_classifier
+    command and stored as a compressed ``.npz`` file.
+    """
+
+    def __init__(self, vocabulary, idf, centroids, slugs):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.centroids = centroids
+        self.slugs = slugs
+
+    @classmethod
+    def fit(cls, texts, slugs, min_df=2, max_features=20000):
+        """
+        Trains a classifier from labelled texts.
+
+        Args:
+            texts (list): Crumb texts.
+            slugs (list): Topic slug of each text.
+            min_df (int): Ignore words found in fewer texts than this.
+            max_features (int): Keep at most this many of the most common
+                words.
+
+        Returns:
+            TopicClassifier: The trained classifier.
+        """
+        tokenized = [_tokens(text) for text in texts]
+
+        document_counts = {}
+        for tokens in tokenized:
+            for word in set(tokens):
+                document_counts[word] = document_counts.get(word, 0) + 1
+        words = sorted(
+            (word for word, count in document_counts.items()
+             if count >= min_df),
+            key=lambda word: (-document_counts[word], word),
+        )[:max_features]
+        vocabulary = {word: index for index, word in enumerate(words)}
+
+        counts = np.array([document_counts[word] for word in words],
+                          dtype=np.float64)
+        idf = np.log((1 + len(texts)) / (1 + counts)) + 1
+
+        topic_slugs = sorted(set(slugs))
+        classifier = cls(vocabulary, idf,
+                         np.zeros((len(topic_slugs), len(words))),
+                         topic_slugs)
+        rows, cols, data = classifier._features(tokenized)
+
+        # Sum the rows of each topic, then normalize to unit length.
+        topic_index = {slug: index for index, slug in enumerate(topic_slugs)}
+        labels = np.array([topic_index[slug] for slug in slugs],
+                          dtype=np.int64)
+        np.add.at(classifier.centroids, (labels[rows], cols), data)
+        norms = np.linalg.norm(classifier.centroids, axis=1, keepdims=True)
+        classifier.centroids /= np.where(norms == 0, 1.0, norms)
+        return classifier
+
+    def scores(self, texts):
+        """
+        Returns a (len(texts), number of topics) array of cosine
+        similarities between each text and each topic centroid.
+        """
+        rows, cols, data = self._features([_tokens(text) for text in texts])
+        scores = np.zeros((len(texts), len(self.slugs)))
+        # Each non-zero feature adds its weight times the matching centroid
+        # column to its row.
+        np.add.at(scores, rows, data[:, None] * self.centroids[:, cols].T)
+        return scores
+
+    def predict(self, texts, threshold=0.0):
+        """
+        Picks the best topic for every text in one pass.
+
+        Args:
+            texts (list): Texts to classify.
+            threshold (float): Minimum score for a prediction.
+
+        Returns:
+            list: (slug, score) for each text, or None where no topic
+            scores above ``threshold``.
+        """
+        if not texts or not self.slugs:
+            return [None for _ in texts]
+        scores = self.scores(texts)
+        best = scores.argmax(axis=1)
+        return [
+            (self.slugs[index], float(scores[row, index]))
+            if scores[row, index] > threshold else None
+            for row, index in enumerate(best)
+        ]
+
+    def save(self, path):
+        """
+        Writes the model to ``path`` as a compressed ``.npz`` file, creating
+        its directory if needed.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        words = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path, "wb") as model_file:
+            np.savez_compressed(
+                model_file,
+                words=np.array(words, dtype=str),
+                idf=self.idf,
+                centroids=self.centroids,
+                slugs=np.array(self.slugs, dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a model written by save().
+        """
+        with np.load(path) as model:
+            words = model["words"].tolist()
+            return cls(
+                {word: index for index, word in enumerate(words)},
+                model["idf"],
+                model["centroids"],
+                model["slugs"].tolist(),
+            )
+
+    def _features(self, tokenized):
+        """
+        Returns (rows, cols, data) arrays of L2-normalized TF-IDF weights
+        for tokenized texts, skipping words outside the vocabulary.
+        """
+        rows, cols = [], []
+        for row, tokens in enumerate(tokenized):
+            for word in tokens:
+                index = self.vocabulary.get(word)
+                if index is not None:
+                    rows.append(row)
+                    cols.append(index)
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        if not len(rows):
+            return rows, cols, np.zeros(0)
+
+        # Merge repeated (row, word) pairs into term counts.
+        pairs, counts = np.unique(
+            np.stack([rows, cols], axis=1), axis=0, return_counts=True)
+        rows, cols = pairs[:, 0], pairs[:, 1]
+        data = counts * self.idf[cols]
+
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2,
+                                    minlength=len(tokenized)))
+        data = data / norms[rows]
+        return rows, cols, data
+
+
+def _tokens(text):
+    return [
+        word for word in WORD_RE.findall((text or "").lower())
+        if word not in STOPWORDS
+    ]
+
+
+_classifier = None
+_classifier_mtime = None
+_lock = threading.Lock()
+
+
+def get_classifier():
+    """
+    Returns the classifier saved at TOPIC_CLASSIFIER_PATH, or None if no
+    model has been trained. The model is loaded once per process and
+    reloaded when the file changes.
+    """
+    global _classifier, _classifier_mtime
+    path = getattr(settings, 'TOPIC_CLASSIFIER_PATH', None)
+    if not path or not os.path.exists(path):
+        return None
+
+    mtime = os.path.getmtime(path)
+    with _lock:
+        if _classifier is None or mtime != _classifier_mtime:
+            try:
+                _classifier = TopicClassifier.load(path)
+                _classifier_mtime = mtime
+            except Exception as e:
+                print(f"Could not load topic classifier from {path}: {e}")
+                return None
+        return _classifier
+
+
+def classify_texts(texts):
+    """
+    Predicts a topic slug for each text with the trained classifier.
+
+    Returns:
+        list: (slug, score) or None for each text. All None when no model
+        has been trained yet.
+    """
+    classifier = get_classifier()
+    if classifier is None:
+        return [None for _ in texts]
+    threshold = getattr(settings, 'TOPIC_CLASSIFIER_THRESHOLD', 0.2)
+    return classifier.predict(texts, threshold)
@@ -0,0 +1,198 @@
+import hashlib
+import re
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from pipeline.models import CrumbBand, CrumbSignature
+
+
+# 128 hash functions split into 32 bands of 4 rows: stories whose shingle
+# sets overlap by roughly 40% or more share at least one band and are
+# compared; the match itself needs NEAR_DUP_THRESHOLD.
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Character shingle length, and the shortest text worth comparing. Very
+# short texts (a bare title) do not carry enough signal.
+SHINGLE_SIZE = 5
+MIN_TEXT_LENGTH = 60
+
+# Largest prime below 2**32. With 32-bit shingle hashes and a, b < p,
+# a * h + b stays below 2**64, so uint64 never wraps before the modulo.
+_PRIME = np.uint64(4294967291)
+# Fixed seed so signatures stored by earlier runs stay comparable.
+_random = np.random.RandomState(1)
+_A = _random.randint(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_B = _random.randint(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_MASK = np.uint64(0xFFFFFFFF)
+
+WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text):
+    """
+    Returns the set of character shingles of ``text`` after lowercasing
+    and collapsing punctuation and whitespace, or None if the text is too
+    short to compare reliably.
+    """
+    normalized = " ".join(WORD_RE.findall((text or "").lower()))
+    if len(normalized) < MIN_TEXT_LENGTH:
+        return None
+    return {
+        normalized[i:i + SHINGLE_SIZE]
+        for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(text):
+    """
+    Returns the MinHash signature (NUM_PERM uint32 values) of the
+    character shingles of ``text``, or None if the text is too short to
+    compare reliably.
+    """
+    found = shingles(text)
+    if found is None:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in found),
+        dtype=np.uint64, count=len(found),
+    ) & _MASK
+    # One row per hash function: (a * h + b) mod p, minimum per row.
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(first, second):
+    """
+    Estimates the Jaccard similarity of two texts from their signatures.
+    """
+    return float(np.mean(first == second))
+
+
+def band_keys(sig):
+    """
+    Returns the LSH bucket key of each band of a signature, as signed
+    64-bit integers that fit a BigIntegerField.
+    """
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(
+            sig[band * ROWS:(band + 1) * ROWS].tobytes(),
+            digest_size=8, person=band.to_bytes(2, "big"),
+        ).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def find_near_duplicates(signatures, threshold=None):
+    """
+    Matches a batch of signatures against the persisted LSH index of
+    recent crumbs and against each other.
+
+    Bucket keys for the whole batch are looked up with one query, and the
+    signatures of the candidates are loaded with a second one.
+
+    Args:
+        signatures (list): Signatures from signature(); None entries are
+            never matched.
+        threshold (float): Minimum estimated similarity. Defaults to the
+            NEAR_DUP_THRESHOLD setting.
+
+    Returns:
+        list: For each signature, None if it is new, ``("crumb", crumb_id,
+        topic_id)`` if it matches a stored crumb, or ``("item", index)`` if
+        it matches an earlier signature in the same batch.
+    """
+    if threshold is None:
+        threshold = getattr(settings, 'NEAR_DUP_THRESHOLD', 0.8)
+
+    keys = [band_keys(sig) if sig is not None else [] for sig in signatures]
+    all_keys = {key for item_keys in keys for key in item_keys}
+    if not all_keys:
+        return [None for _ in signatures]
+
+    cutoff = timezone.now() - timedelta(
+        days=getattr(settings, 'NEAR_DUP_WINDOW_DAYS', 3))
+    buckets = {}
+    for key, crumb_id in CrumbBand.objects.filter(
+            key__in=all_keys, signature__created_at__gte=cutoff
+    ).values_list('key', 'signature_id'):
+        buckets.setdefault(key, set()).add(crumb_id)
+
+    candidate_ids = set().union(*buckets.values()) if buckets else set()
+    stored = {
+        crumb_id: (np.frombuffer(bytes(sig), dtype=np.uint32), topic_id)
+        for crumb_id, sig, topic_id in CrumbSignature.objects.filter(
+            crumb_id__in=candidate_ids
+        ).values_list('crumb_id', 'signature', 'crumb__topic_id')
+    } if candidate_ids else {}
+
+    results = []
+    batch_buckets = {}
+    for index, (sig, item_keys) in enumerate(zip(signatures, keys)):
+        match = None
+        if sig is not None:
+            best = threshold
+            for crumb_id in {cid for key in item_keys
+                             for cid in buckets.get(key, ())}:
+                stored_sig, topic_id = stored[crumb_id]
+                score = similarity(sig, stored_sig)
+                if score >= best:
+                    best, match = score, ("crumb", crumb_id, topic_id)
+            if match is None:
+                for other in {i for key in item_keys
+                              for i in batch_buckets.get(key, ())}:
+                    if similarity(sig, signatures[other]) >= threshold:
+                        match = ("item", other)
+                        break
+            if match is None:
+                for key in item_keys:
+                    batch_buckets.setdefault(key, []).append(index)
+        results.append(match)
+    return results
+
+
+def index_signatures(crumb_ids, signatures):
+    """
+    Adds saved crumbs and their signatures to the LSH index.
+
+    Args:
+        crumb_ids (list): Crumb primary keys.
+        signatures (list): The matching signatures; None entries and
+            crumbs without a pk are skipped.
+    """
+    pairs = [
+        (crumb_id, sig) for crumb_id, sig in zip(crumb_ids, signatures)
+        if crumb_id is not None and sig is not None
+    ]
+    if not pairs:
+        return
+    CrumbSignature.objects.bulk_create([
+        CrumbSignature(crumb_id=crumb_id, signature=sig.tobytes())
+        for crumb_id, sig in pairs
+    ], ignore_conflicts=True)
+    CrumbBand.objects.bulk_create([
+        CrumbBand(signature_id=crumb_id, key=key)
+        for crumb_id, sig in pairs
+        for key in band_keys(sig)
+    ], ignore_conflicts=True)
+
+
+def prune(window_days=None):
+    """
+    Removes index entries older than the NEAR_DUP_WINDOW_DAYS window.
+
+    Returns:
+        int: Number of signatures removed.
+    """
+    if window_days is None:
+        window_days = getattr(settings, 'NEAR_DUP_WINDOW_DAYS', 3)
+    cutoff = timezone.now() - timedelta(days=window_days)
+    CrumbBand.objects.filter(signature__created_at__lt=cutoff).delete()
+    deleted, _ = CrumbSignature.objects.filter(
+        created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,144 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+
+
+class SourceTimeout(Exception):
+    """
+    Raised (as a result value, not thrown) when a fetcher runs for longer
+    than its allotted per-source timeout.
+    """
+
+
+def stream_fetchers(jobs, workers=8, timeout=None, chunk_size=50):
+    """
+    Runs fetch jobs on a thread pool and hands back each source's items in
+    chunks while its fetch is still running.
+
+    Fetchers only do network I/O, so threads are enough to overlap them.
+    Items are yielded in the calling thread, which keeps all database work
+    (the handlers) out of the worker threads.
+
+    A fetcher may return a list or yield its items one at a time (see
+    pipeline.paging). The worker thread collects them into chunks of
+    ``chunk_size`` and passes each one to the calling thread as soon as it
+    is full, so a handler can store the first page of a source while later
+    pages are still being downloaded, and no more than a few chunks of
+    items are held in memory at once.
+
+    Args:
+        jobs (list): (key, fetch_callable) pairs, or (key, fetch_callable,
+            timeout) triples to override the timeout for one job. The key
+            is yielded back untouched so the caller can match items to its
+            own jobs.
+        workers (int): Maximum number of fetchers running at once.
+        timeout (float): Seconds a single fetcher may run before it is
+            abandoned. None disables the per-source timeout.
+        chunk_size (int): Items per chunk.
+
+    Yields:
+        tuple: (key, items, error, done). Every source yields any number
+        of (key, chunk, None, False) followed by one (key, [], error,
+        True), where ``error`` is None, the exception raised by the
+        fetcher, or a SourceTimeout instance.
+    """
+    chunk_size = max(1, chunk_size)
+    # Bounded, so a fast provider waits for the handlers instead of piling
+    # up pages in memory.
+    events = queue.Queue(maxsize=2 * max(1, workers))
+    started = {}
+    limits = {}
+    abandoned = set()
+
+    def _put(key, event):
+        while key not in abandoned:
+            try:
+                events.put(event, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(key, fetch):
+        started[key] = time.monotonic()
+        chunk = []
+        try:
+            for item in fetch():
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    if not _put(key, (key, chunk, None, False)):
+                        return
+                    chunk = []
+        except Exception as e:
+            if chunk:
+                _put(key, (key, chunk, None, False))
+            _put(key, (key, [], e, True))
+            return
+        finally:
+            # Fetchers that read a cache table (e.g. Last.fm bios) open a
+            # connection in this thread; don't leave it behind.
+            connections.close_all()
+        if chunk:
+            _put(key, (key, chunk, None, False))
+        _put(key, (key, [], None, True))
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="fetch"
+    )
+    try:
+        running = {}
+        for key, fetch, *job_timeout in jobs:
+            limits[key] = job_timeout[0] if job_timeout and \
+                job_timeout[0] is not None else timeout
+            executor.submit(_run, key, fetch)
+            running[key] = key
+
+        while running:
+            try:
+                event = events.get(
+                    timeout=_next_deadline(running, started, limits))
+            except queue.Empty:
+                event = None
+            if event is not None and event[0] in running:
+                if event[3]:
+                    running.pop(event[0])
+                yield event
+
+            now = time.monotonic()
+            for key in list(running):
+                limit = limits[key]
+                if limit is not None and key in started and \
+                        now - started[key] >= limit:
+                    # The worker stops at its next full chunk; anything
+                    # it still sends is dropped.
+                    running.pop(key)
+                    abandoned.add(key)
+                    yield key, [], SourceTimeout(
+                        f"no response after {limit:g}s"
+                    ), True
+    finally:
+        abandoned.update(running)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _next_deadline(pending, started, limits):
+    """
+    Returns how long to block before the earliest running job times out,
+    or None when no pending job has a timeout.
+    """
+    now = time.monotonic()
+    remaining = []
+    for key in pending.values():
+        if limits[key] is None:
+            continue
+        if key in started:
+            remaining.append(limits[key] - (now - started[key]))
+        else:
+            # Still queued, so it has no start time yet; poll until it
+            # begins.
+            remaining.append(0.5)
+    if not remaining:
+        return None
+    return max(0, min(remaining))
@@ -0,0 +1,106 @@
+import re
+
+import numpy as np
+
+from pipeline.utils import split_sentences
+
+
+# Default number of sentences kept in an extractive summary.
+EXTRACTIVE_SENTENCES = 3
+# TextRank damping factor and power iteration limits.
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-4
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset("""
+    a an and are as at be been but by for from has have he her his i in is
+    it its of on or our she that the their them they this to was we were
+    will with you your
+""".split())
+
+
+def summarize_extractive(text, max_sentences=EXTRACTIVE_SENTENCES):
+    """
+    Builds a summary from the most central sentences of ``text``.
+
+    Sentences are split the same way as ``clean_text`` and ranked with
+    TextRank: each sentence is a bag of words, sentences are linked by the
+    cosine similarity of those vectors, and PageRank over that graph gives
+    each sentence a score. The best ``max_sentences`` are returned in their
+    original order. Runs locally with no network access.
+
+    Args:
+        text (str): Cleaned text to summarize.
+        max_sentences (int): Maximum number of sentences to keep.
+
+    Returns:
+        str: The summary, or an empty string for empty input.
+    """
+    sentences = list(dict.fromkeys(split_sentences(text)))
+    if len(sentences) <= max_sentences:
+        return _join(sentences)
+
+    scores = _rank(sentences)
+    # Highest score first; ties go to the earlier sentence.
+    best = np.argsort(-scores, kind="stable")[:max_sentences]
+    return _join([sentences[i] for i in sorted(best)])
+
+
+def summarize_extractive_many(texts, max_sentences=EXTRACTIVE_SENTENCES):
+    """
+    Summarizes several texts. Returns one summary per text, in order.
+    """
+    return [summarize_extractive(text, max_sentences) for text in texts]
+
+
+def _rank(sentences):
+    """
+    Returns the TextRank score of each sentence as a NumPy array.
+    """
+    vocabulary = {}
+    rows, cols = [], []
+    for row, sentence in enumerate(sentences):
+        for word in WORD_RE.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    count = len(sentences)
+    if not vocabulary:
+        return np.zeros(count)
+
+    # Term counts per sentence, scaled to unit length so the dot products
+    # below are cosine similarities.
+    vectors = np.zeros((count, len(vocabulary)))
+    np.add.at(vectors, (rows, cols), 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1.0, norms)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+
+    # Row-normalize into a transition matrix; isolated sentences link to
+    # every sentence equally.
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(totals > 0, similarity / np.where(
+        totals == 0, 1.0, totals), 1.0 / count)
+
+    scores = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / count + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def _join(sentences):
+    """
+    Joins sentences back together the way ``clean_text`` does, making sure
+    the result ends with punctuation.
+    """
+    summary = ". ".join(sentences).strip()
+    if summary and summary[-1] not in ".!?\"'":
+        summary += "."
+    return summary
@@ -1,14 +1,7 @@
-from django.utils import timezone
-from django.utils.dateparse import parse_datetime
-from django.utils.text import slugify
-from django.utils.timezone import now as timezone_now
+from pipeline.ingest import ingest_crumbs
 
-from crumbs.models import Crumb
-from preferences.models import Topic
-from pipeline.utils import clean_text, summarize_text, tag_crumb_text
 
-
-def handle_cars_transport_crumbs(crumb_data_list):
+def handle_cars_transport_crumbs(crumb_data_list, summarizer=None):
     """
     Handles cars and transport related crumbs by creating or updating
     Crumb objects. Each crumb is primarily associated with the
@@ -17,79 +10,17 @@ def handle_cars_transport_crumbs(crumb_data_list):
 
     Args:
         crumb_data_list (list): List of dictionaries containing crumb data.
+        summarizer (str): Summarizer engine for this source; None uses
+            the SUMMARIZER_ENGINE setting.
 
     Returns:
         int: Number of Crumb objects created.
     """
-    cars_transport_slug = "cars-transport"
-    try:
-        cars_transport_topic = Topic.objects.get(slug=cars_transport_slug)
-    except Topic.DoesNotExist:
-        # Create the topic if it doesn't exist
-        cars_transport_topic = Topic.objects.create(
-            name="cars & transport",
-            slug=cars_transport_slug
-        )
-
-    created_count = 0
-    for item in crumb_data_list:
-        title = item.get("title", "")[:255]
-        url = item.get("url")
-        raw_summary = item.get("summary", "")
-
-        if not title or not url:
-            print(f"Skipping cars and transport crumb due to missing title "
-                  f"or URL: {item}")
-            continue
-
-        if Crumb.objects.filter(title=title, url=url).exists():
-            continue
-
-        try:
-            # 1. Clean the raw summary text
-            cleaned_content = clean_text(raw_summary)
-
-            # 2. Summarize the cleaned text
-            final_summary = summarize_text(cleaned_content) if \
-                cleaned_content else ""
-
-            # 3. Handle published_at: parse if string, make timezone-aware,
-            # else use now()
-            published_at = None
-            pub_date_str = item.get("published_at")
-            if pub_date_str:
-                parsed_dt = parse_datetime(pub_date_str)
-                if parsed_dt:
-                    if timezone.is_naive(parsed_dt):
-                        published_at = timezone.make_aware(
-                            parsed_dt, timezone.get_current_timezone())
-                    else:
-                        published_at = parsed_dt
-
-            if published_at is None:
-                published_at = timezone_now()
-
-            crumb = Crumb.objects.create(
-                title=title,
-                summary=final_summary,
-                url=url,
-                source=item.get("source", "APITube Automotive News"),
-                topic=cars_transport_topic,  # Assign the primary topic
-                published_at=published_at,
-            )
-            created_count += 1
-
-            # 4. Use tag_crumb_text to find additional tags
-            text_for_tagging = f"{title} {cleaned_content}"
-            matched_topic_for_tag = tag_crumb_text(text_for_tagging)
-
-            if matched_topic_for_tag and \
-               matched_topic_for_tag != cars_transport_topic:
-                crumb.tags.add(matched_topic_for_tag.name)
-
-        except Exception as e:
-            print(f"Error saving cars and transport crumb (Title: "
-                  f"{title[:50]}...): {e}")
-            continue
-
-    return created_count
\ No newline at end of file
+    return ingest_crumbs(
+        crumb_data_list,
+        topic_slug="cars-transport",
+        topic_name="cars & transport",
+        default_source="APITube Automotive News",
+        kind="cars and transport",
+        summarizer=summarizer,
+    )
@@ -0,0 +1,91 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from pipeline import quota
+
+
+# One keep-alive session per scheme://host, shared by every fetcher so that
+# repeated calls to the same provider reuse an open TCP/TLS connection.
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_session(url):
+    """
+    Returns the pooled session for the host of ``url``, creating it on first
+    use.
+
+    Args:
+        url (str): Any URL on the host the session will talk to.
+
+    Returns:
+        requests.Session: A session with a connection pool mounted for
+        both http and https.
+    """
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc.lower()}"
+
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=_setting('PIPELINE_HTTP_POOL_CONNECTIONS', 4),
+                pool_maxsize=_setting('PIPELINE_HTTP_POOL_MAXSIZE', 10),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+    return session
+
+
+def request(method, url, **kwargs):
+    """
+    Sends a request through the host's pooled session, applying the
+    pipeline's default timeout when the caller does not pass one and the
+    provider's rate limit and quota (see pipeline.quota).
+    """
+    kwargs.setdefault("timeout", _setting('PIPELINE_HTTP_TIMEOUT', 15))
+    # Waits for the provider's rate limit, or raises QuotaExhausted.
+    quota.acquire(url)
+    response = get_session(url).request(method, url, **kwargs)
+    if response.status_code == 429:
+        quota.backoff(url, response.headers.get("Retry-After"))
+    return response
+
+
+def get(url, **kwargs):
+    """
+    Pooled equivalent of ``requests.get``.
+    """
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """
+    Pooled equivalent of ``requests.post``.
+    """
+    return request("POST", url, **kwargs)
+
+
+def close_all():
+    """
+    Closes every pooled session. Call at the end of a run to release
+    keep-alive connections.
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,268 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from taggit.models import Tag, TaggedItem
+
+from crumbs import timeline
+from crumbs.models import Crumb
+from crumbs.utils import hash_url
+from preferences.models import Topic
+from pipeline import dedup
+from pipeline.classifier import classify_texts
+from pipeline.tagging import get_tagger
+from pipeline.utils import clean_text, get_engine, summarize_texts
+
+
+def get_topic(slug, name):
+    """
+    Returns the Topic with the given slug, creating it if it doesn't exist.
+    """
+    try:
+        return Topic.objects.get(slug=slug)
+    except Topic.DoesNotExist:
+        return Topic.objects.create(name=name, slug=slug)
+
+
+def parse_published_at(value):
+    """
+    Parses a provider timestamp into a timezone-aware datetime.
+
+    Naive values are assumed to be in the current timezone. Falls back to
+    now() when the value is missing or cannot be parsed.
+    """
+    published_at = parse_datetime(value) if value else None
+    if published_at is None:
+        return timezone.now()
+    if timezone.is_naive(published_at):
+        return timezone.make_aware(
+            published_at, timezone.get_current_timezone())
+    return published_at
+
+
+def defer_summaries(summarizer=None):
+    """
+    Returns True if crumbs should be saved with a pending summary instead
+    of being summarized during ingest (PIPELINE_DEFER_SUMMARIES). Local
+    engines are fast enough to run inline, so only remote ones are
+    deferred.
+    """
+    engine = get_engine(summarizer)
+    return getattr(settings, 'PIPELINE_DEFER_SUMMARIES', False) and \
+        engine != 'extractive'
+
+
+def summary_status(content, summary):
+    """
+    Returns the Crumb.summary_status for ``content`` given its summary:
+    pending when ``summary`` is None (not attempted yet), failed when it is
+    empty, and done otherwise. Crumbs without content have nothing to
+    summarize and are always done.
+    """
+    if not content:
+        return Crumb.SUMMARY_DONE
+    if summary is None:
+        return Crumb.SUMMARY_PENDING
+    return Crumb.SUMMARY_DONE if summary else Crumb.SUMMARY_FAILED
+
+
+def ingest_crumbs(items, topic_slug, topic_name, default_source, kind,
+                  summarizer=None):
+    """
+    Stores a batch of normalized items as Crumbs under one primary topic.
+
+    The whole batch is deduplicated against the database with a single
+    query on the unique ``url_hash`` index and against recent stories with
+    the near-duplicate index (see ``pipeline.dedup``), summarized with
+    batched requests (or saved as pending, see defer_summaries), written
+    with one insert-or-ignore bulk insert inside a transaction, and tagged
+    in bulk afterwards, so the number of queries does not grow with the
+    size of the batch.
+
+    Args:
+        items (list): Dictionaries with ``title``, ``url``, ``summary`` (or
+            ``description``), ``source`` and ``published_at`` keys, as
+            returned by the fetchers in ``pipeline.tasks``.
+        topic_slug (str): Slug of the primary Topic for these crumbs.
+        topic_name (str): Name used if the Topic has to be created.
+        default_source (str): Source name used when an item has none.
+        kind (str): Short description of the content, used in log output.
+        summarizer (str): Summarizer engine, e.g. ``"extractive"``; None
+            uses the SUMMARIZER_ENGINE setting.
+
+    Returns:
+        int: Number of Crumb objects created.
+
+    Raises:
+        DatabaseError: The batch could not be saved. Nothing of it was
+            stored, so the caller must not count it as handed on (see
+            fetch_crumbs, which then leaves the source's watermark alone).
+    """
+    topic = get_topic(topic_slug, topic_name)
+
+    # Validate and drop duplicates within the batch itself, keyed on the
+    # hash of the canonical URL.
+    rows = {}
+    for item in items:
+        title = (item.get("title") or "")[:255]
+        url = item.get("url")
+        if not title or not url:
+            print(f"Skipping {kind} crumb due to missing title or URL: "
+                  f"{item}")
+            continue
+        rows.setdefault(hash_url(url), (title, url, item))
+
+    if not rows:
+        return 0
+
+    # One indexed query to find which URLs are already stored.
+    existing = set(
+        Crumb.objects.filter(url_hash__in=list(rows)).values_list(
+            "url_hash", flat=True)
+    )
+
+    pending = []
+    for digest, (title, url, item) in rows.items():
+        if digest in existing:
+            continue
+        raw_summary = item.get("summary") or item.get("description") or ""
+        pending.append((title, url, item, clean_text(raw_summary)))
+
+    # Drop stories already stored (or repeated in this batch) under a
+    # slightly different title or URL before spending summaries on them.
+    # Stored matches from another topic are tagged with this one instead.
+    signatures = [None for _ in pending]
+    linked = []
+    if getattr(settings, 'PIPELINE_NEAR_DUP_DETECTION', False):
+        signatures = [
+            dedup.signature(f"{title} {cleaned}")
+            for title, _, _, cleaned in pending
+        ]
+        matches = dedup.find_near_duplicates(signatures)
+        keep = [index for index, match in enumerate(matches) if not match]
+        if len(keep) < len(pending):
+            print(f"{len(pending) - len(keep)} near-duplicate {kind} "
+                  f"crumbs merged into existing stories.")
+        linked = [
+            Crumb(pk=match[1]) for match in matches
+            if match and match[0] == "crumb" and match[2] != topic.pk
+        ]
+        pending = [pending[index] for index in keep]
+        signatures = [signatures[index] for index in keep]
+
+    contents = [cleaned for *_, cleaned in pending]
+    if defer_summaries(summarizer):
+        # Save now and let summarize_crumbs fill the summaries in later.
+        summaries = [None for _ in contents]
+    else:
+        # Summaries for the whole batch go out in a handful of requests.
+        summaries = summarize_texts(contents, engine=summarizer)
+
+    # One classifier pass for the whole batch.
+    predictions = classify_texts(
+        [f"{title} {cleaned}" for title, _, _, cleaned in pending])
+
+    tagger = get_tagger()
+    topics = tagger.topics() if any(predictions) else {}
+    new_crumbs = []
+    new_signatures = []
+    tag_names = []
+    for (title, url, item, cleaned_content), final_summary, predicted, \
+            sig in zip(pending, summaries, predictions, signatures):
+        try:
+            crumb = Crumb(
+                title=title,
+                summary=final_summary or "",
+                content=cleaned_content,
+                summary_status=summary_status(cleaned_content, final_summary),
+                url=url,
+                source=item.get("source") or default_source,
+                topic=topic,
+                published_at=parse_published_at(item.get("published_at")),
+            )
+            # bulk_create() bypasses save(), so hash here.
+            crumb.set_url_hash()
+
+            # Additional tags from keywords in the content and from the
+            # classifier, for topics other than the primary one.
+            matches = tagger.match(f"{title} {cleaned_content}")
+        except Exception as e:
+            print(f"Error preparing {kind} crumb (Title: {title[:50]}...): "
+                  f"{e}")
+            continue
+
+        matched_topics = [matched for matched, score in matches]
+        if predicted and predicted[0] in topics:
+            matched_topics.append(topics[predicted[0]])
+
+        new_crumbs.append(crumb)
+        new_signatures.append(sig)
+        tag_names.append(list(dict.fromkeys(
+            matched.name for matched in matched_topics if matched != topic
+        )))
+
+    if not new_crumbs and not linked:
+        return 0
+
+    with transaction.atomic():
+        hashes = [crumb.url_hash for crumb in new_crumbs]
+        # Rows a concurrent run has stored since the check above are
+        # skipped by the unique index on url_hash; they are not ours,
+        # so they must not be counted, tagged or pushed again.
+        existing |= set(
+            Crumb.objects.filter(url_hash__in=hashes).values_list(
+                "url_hash", flat=True)
+        )
+        Crumb.objects.bulk_create(new_crumbs, ignore_conflicts=True)
+        ids = dict(
+            Crumb.objects.filter(
+                url_hash__in=[digest for digest in hashes
+                              if digest not in existing]
+            ).values_list("url_hash", "pk")
+        )
+        kept = [
+            index for index, crumb in enumerate(new_crumbs)
+            if crumb.url_hash in ids
+        ]
+        new_crumbs = [new_crumbs[index] for index in kept]
+        new_signatures = [new_signatures[index] for index in kept]
+        tag_names = [tag_names[index] for index in kept]
+        for crumb in new_crumbs:
+            crumb.pk = ids[crumb.url_hash]
+        dedup.index_signatures(
+            [crumb.pk for crumb in new_crumbs], new_signatures)
+        _apply_tags(new_crumbs + linked,
+                    tag_names + [[topic.name] for _ in linked])
+
+    # bulk_create() sends no post_save signals, so add the new crumbs to
+    # the cached feed timelines (and precomputed user feeds) here.
+    timeline.push(new_crumbs)
+    timeline.fan_out(new_crumbs, tag_names)
+    return len(ids)
+
+
+def _apply_tags(crumbs, tag_names):
+    """
+    Tags each crumb with the matching list of names in ``tag_names`` using
+    one lookup for existing tags and one bulk insert.
+    """
+    wanted = {name for names in tag_names for name in names}
+    if not wanted:
+        return
+
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=wanted)}
+    for name in wanted - tags.keys():
+        # Tag.save() builds a unique slug, so new tags go in one by one.
+        # This only happens the first time a tag name is seen.
+        tags[name] = Tag.objects.create(name=name)
+
+    content_type = ContentType.objects.get_for_model(Crumb)
+    TaggedItem.objects.bulk_create([
+        TaggedItem(
+            tag=tags[name], content_type=content_type, object_id=crumb.pk
+        )
+        for crumb, names in zip(crumbs, tag_names)
+        if crumb.pk is not None
+        for name in names
+    ], ignore_conflicts=True)
@@ -1,262 +1,272 @@
-from django.core.management.base import BaseCommand
+import time
+from functools import partial
 
-from pipeline.tasks import (
-    plants,
-    environment,
-    sports,
-    finance,
-    news,
-    music,
-    technology,
-    food,
-    trivia,
-    fashion,
-    cars_transport,
-    diy,
-    )
-from pipeline.handlers import (
-    plants_handler,
-    environment_handler,
-    sports_handler,
-    finance_handler,
-    news_handler,
-    music_handler,
-    technology_handler,
-    food_handler,
-    trivia_handler,
-    fashion_handler,
-    cars_transport_handler,
-    diy_handler,
-    )
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
-class Command(BaseCommand):
-    help = 'Fetches crumbs from various sources and adds them to the database.'
-
-    def handle(self, *args, **options):
-        self.stdout.write("Starting crumb fetching process...")
-        total_created = 0
-
-        # Fetches and handles plnats and gardening crumbs from 3 APIs
-        self.stdout.write("Fetching plant-related info...")
-
-        perenual_data = plants.fetch_perenual_guides()
-        created_perenual = plants_handler.handle_plant_data(
-            "Perenual", perenual_data)
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_perenual} plant crumbs saved from "
-                               "Perenual.")
-        )
+from crumbs.models import Crumb
+from pipeline import (
+    dedup, http_client, providers, quota, summarization, summary_cache,
+    watermarks,
+)
+from pipeline.executor import stream_fetchers
+from pipeline.sources import SOURCES, select_sources
 
-        trefle_data = plants.fetch_trefle_plants()
-        created_trefle = plants_handler.handle_plant_data(
-            "Trefle", trefle_data)
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_trefle} plant crumbs saved from "
-                                "Trefle.")
-        )
 
-        permapeople_data = plants.fetch_permapeople_plants()
-        created_permapeople = plants_handler.handle_plant_data(
-            "PermaPeople", permapeople_data)
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"{created_permapeople} plant crumbs saved from PermaPeople."
-            )
-        )
+class Command(BaseCommand):
+    help = 'Fetches crumbs from various sources and adds them to the database.'
 
-        # Fetches and handles environment news
-        self.stdout.write("Fetching environment news from NewsData.io...")
-        environment_articles = environment.fetch_environment_news()
-        created_environment = environment_handler.handle_environment_articles(
-            environment_articles
-            )
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_environment} environment crumbs "
-                               "saved.")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            action='append',
+            dest='sources',
+            metavar='NAME',
+            help='Only fetch this source (repeatable).',
         )
-
-        total_created = sum([
-            created_environment,
-        ])
-
-        # Fetches and handles TheNewsAPI Sports news (general sports headlines)
-        self.stdout.write("Fetching general sports news from TheNewsAPI...")
-        thenewsapi_sports_data = sports.fetch_thenewsapi_sports()
-        created_thenewsapi = sports_handler.handle_sports_crumbs(
-            thenewsapi_sports_data)
-        total_created += created_thenewsapi
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_thenewsapi} general sports crumbs "
-                               "saved from TheNewsAPI.")
+        parser.add_argument(
+            '--topic',
+            action='append',
+            dest='topics',
+            metavar='SLUG',
+            help='Only fetch sources filed under this topic slug '
+                 '(repeatable).',
         )
-
-        # Fetches and handles NewsData.io Fitness news
-        # (fitness trends, guides, gym news)
-        self.stdout.write("Fetching fitness news from NewsData.io...")
-        newsdata_fitness_data = sports.fetch_newsdata_fitness()
-        created_newsdata_fitness = sports_handler.handle_sports_crumbs(
-            newsdata_fitness_data)
-        total_created += created_newsdata_fitness
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_newsdata_fitness} fitness crumbs "
-                               "saved from NewsData.io.")
+        parser.add_argument(
+            '--exclude',
+            action='append',
+            metavar='NAME',
+            help='Skip this source (repeatable).',
         )
-
-        # Fetches and handles Finnhub General News
-        self.stdout.write("Fetching general finance news from Finnhub...")
-        finnhub_data = finance.fetch_finnhub_general_news()
-        created_finance = finance_handler.handle_finance_crumbs(finnhub_data)
-        total_created += created_finance
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_finance} finance crumbs saved from "
-                               "Finnhub.")
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the registered sources and exit.',
         )
-
-        # Fetches and handles NewsData.io World News
-        self.stdout.write("Fetching general world news from NewsData.io...")
-        newsdata_world_news_data = news.fetch_newsdata_world_news()
-        created_newsdata_world_news = news_handler.handle_world_news_crumbs(
-            newsdata_world_news_data)
-        total_created += created_newsdata_world_news
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_newsdata_world_news} world news "
-                               "crumbs saved from NewsData.io.")
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'PIPELINE_FETCH_WORKERS', 8),
+            help='Number of sources fetched in parallel (1 runs them '
+                 'one after another).',
         )
-
-        # Fetches and handles NewsAPI.org World News
-        self.stdout.write(
-            "Fetching world news from NewsAPI.org (UK headlines)...")
-        newsapi_world_news_data = news.fetch_newsapi_world_news()
-        created_newsapi_world_news = news_handler.handle_world_news_crumbs(
-            newsapi_world_news_data)
-        total_created += created_newsapi_world_news
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_newsapi_world_news} world news "
-                               "crumbs saved from NewsAPI.org.")
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=getattr(settings, 'PIPELINE_SOURCE_TIMEOUT', 60),
+            help='Seconds a source may take before it is skipped, unless '
+                 'the source sets its own timeout.',
         )
-
-        # Fetches and handles Last.fm Artist Bios
-        self.stdout.write("Fetching artist bios from Last.fm...")
-        lastfm_artist_data = music.fetch_lastfm_top_artists_bios()
-        created_lastfm_artists = music_handler.handle_music_crumbs(
-            lastfm_artist_data)
-        total_created += created_lastfm_artists
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_lastfm_artists} music (artist bio) "
-                               "crumbs saved from Last.fm.")
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignore the saved watermarks and fetch every source from '
+                 'scratch.',
         )
-
-        # Fetches and handles NewsData.io Music News
-        self.stdout.write("Fetching music news from NewsData.io...")
-        newsdata_music_data = music.fetch_newsdata_music_news()
-        created_newsdata_music = music_handler.handle_music_crumbs(
-            newsdata_music_data)
-        total_created += created_newsdata_music
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_newsdata_music} music news crumbs "
-                               "saved from NewsData.io.")
+        parser.add_argument(
+            '--summary-deadline',
+            type=float,
+            default=getattr(settings, 'HF_RUN_DEADLINE', 300),
+            help='Seconds the whole run may spend on summaries; crumbs '
+                 'still waiting after that are saved without one.',
         )
 
-        # Fetches and handles Mediastack Technology News
-        self.stdout.write("Fetching technology news from Mediastack...")
-        mediastack_tech_data = technology.fetch_mediastack_technology_news()
-        created_tech = technology_handler.handle_technology_crumbs(
-            mediastack_tech_data)
-        total_created += created_tech
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_tech} technology crumbs saved from "
-                               "Mediastack.")
-        )
+    def handle(self, *args, **options):
+        if options['list']:
+            for source in SOURCES:
+                self.stdout.write(
+                    f"{source.name:<24} {source.topic:<22} "
+                    f"every {source.interval} min, "
+                    f"priority {source.priority}"
+                )
+            return
 
-        # Fetches and handles Spoonacular random recipes
-        self.stdout.write("Fetching random recipes from Spoonacular...")
-        spoonacular_data = food.fetch_spoonacular_random_recipes()
-        created_spoonacular = food_handler.handle_food_drink_crumbs(
-            spoonacular_data
+        try:
+            sources = select_sources(
+                names=options['sources'],
+                topics=options['topics'],
+                exclude=options['exclude'],
             )
-        total_created += created_spoonacular
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_spoonacular} food & drink (recipe) "
-                               "crumbs saved from Spoonacular.")
-        )
+        except ValueError as e:
+            raise CommandError(e)
 
-        # Fetches and handles NewsData.io Food & Drink News
-        self.stdout.write("Fetching food & drink news from NewsData.io...")
-        newsdata_food_drink_data = food.fetch_newsdata_food_drink_news()
-        created_newsdata_food_drink = food_handler.handle_food_drink_crumbs(
-            newsdata_food_drink_data)
-        total_created += created_newsdata_food_drink
+        workers = options['workers']
         self.stdout.write(
-            self.style.SUCCESS(f"{created_newsdata_food_drink} food & drink "
-                               "news crumbs saved from NewsData.io.")
+            f"Starting crumb fetching process ({len(sources)} sources, "
+            f"{workers} workers)..."
         )
+        # Providers whose daily quota is used up are skipped until tomorrow.
+        exhausted = quota.start_run(sources)
+        # Whatever happens, the requests sent go into the quota ledger.
+        try:
+            for source in sources:
+                if source.provider in exhausted:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"Skipping {source.label} ({source.name}): "
+                            f"the {source.provider} quota for today is "
+                            f"used up.")
+                    )
+            sources = [source for source in sources
+                       if source.provider not in exhausted]
+            by_name = {source.name: source for source in sources}
+            # Where each source stopped last time.
+            marks = watermarks.load(list(by_name), reset=options['full'])
+            # Sources of the same provider share one client and as few
+            # requests as the API allows; their items are split back up below.
+            groups = {}
+            if getattr(settings, 'PIPELINE_MERGE_QUERIES', True):
+                groups = providers.group_sources(sources)
+            grouped = {source.name for members in groups.values()
+                       for source in members}
+            jobs = []
+            for source in sources:
+                if source.name not in grouped:
+                    jobs.append((
+                        source.name,
+                        partial(source.fetcher, watermark=marks[source.name])
+                        if source.incremental else source.fetcher,
+                        source.timeout,
+                    ))
+                    continue
+                for key, members in groups.items():
+                    if members[0] is source:
+                        timeouts = [member.timeout for member in members]
+                        jobs.append((
+                            key,
+                            partial(providers.PROVIDERS[source.provider],
+                                    members,
+                                    watermark=watermarks.combine(
+                                        [marks[member.name]
+                                         for member in members])),
+                            None if None in timeouts else max(timeouts),
+                        ))
 
-        # Fetches and handles Useless Facts
-        self.stdout.write("Fetching useless facts...")
-        useless_facts_data = trivia.fetch_useless_facts()
-        created_useless_facts = trivia_handler.handle_trivia_fun_crumbs(
-            useless_facts_data)
-        total_created += created_useless_facts
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_useless_facts} useless fact crumbs "
-                               "saved.")
-        )
+            started = time.monotonic()
+            summary_cache.reset_stats()
+            summarization.set_run_deadline(options['summary_deadline'])
+            total_created = 0
+            chunk_size = getattr(settings, 'PIPELINE_STREAM_CHUNK', 50)
+            # Per source: [crumbs created, items fetched, items handled], or
+            # None once its handler has failed.
+            counts = {name: [0, 0, 0] for name in by_name}
+            # What each source had handed on before this run. Every chunk is
+            # checked against this snapshot and the watermarks only move once
+            # a source is done, so a later chunk is never judged by the times
+            # of an earlier one.
+            before = {
+                name: (set(marks[name].seen),
+                       watermarks.since(marks[name])
+                       if by_name[name].time_ordered else None)
+                for name in by_name
+            }
+            handled = {name: [] for name in by_name}
+            # Whether a source got back to items its last run handed on; until
+            # it does, moving its publish time could skip the items between.
+            reached = {name: marks[name].last_published_at is None
+                       for name in by_name}
+            # Handlers run here, in the main thread, on each chunk of items as
+            # it arrives, so a paged source is stored while it is still being
+            # fetched.
+            for key, data, error, done in stream_fetchers(
+                    jobs, workers, options['timeout'], chunk_size):
+                members = groups.get(key) or [by_name[key]]
+                if done:
+                    for source in members:
+                        if handled[source.name]:
+                            watermarks.advance(
+                                marks[source.name], handled[source.name],
+                                move_time=reached[source.name]
+                                and counts[source.name] is not None)
+                        if counts[source.name] is not None:
+                            self._report(source, counts[source.name], error)
+                    continue
 
-        # Fetches and handles Chuck Norris Jokes
-        self.stdout.write("Fetching Chuck Norris jokes...")
-        chuck_norris_data = trivia.fetch_chuck_norris_jokes()
-        created_chuck_norris = trivia_handler.handle_trivia_fun_crumbs(
-            chuck_norris_data)
-        total_created += created_chuck_norris
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_chuck_norris} Chuck Norris joke "
-                               "crumbs saved.")
-        )
+                if key in groups:
+                    routed = providers.split(data, members)
+                else:
+                    routed = {key: data}
+                for name, items in routed.items():
+                    if counts[name] is None or not items:
+                        continue
+                    source = by_name[name]
+                    # Drop what earlier runs already handed on.
+                    seen, cutoff = before[name]
+                    fresh = [item for item in items
+                             if watermarks.is_new(item, seen, cutoff)]
+                    if len(fresh) < len(items):
+                        reached[name] = True
+                    try:
+                        if source.summarizer:
+                            created = source.handler(
+                                fresh, summarizer=source.summarizer)
+                        else:
+                            created = source.handler(fresh)
+                        handled[name].extend(fresh)
+                    except Exception as e:
+                        self.stdout.write(
+                            self.style.ERROR(f"{source.label} ({name}) "
+                                             f"handler failed: {e}")
+                        )
+                        counts[name] = None
+                        continue
 
-        # Fetches and handles Open Trivia questions
-        self.stdout.write("Fetching trivia questions from Open Trivia DB...")
-        open_trivia_data = trivia.fetch_open_trivia()
-        created_open_trivia = trivia_handler.handle_trivia_fun_crumbs(
-            open_trivia_data)
-        total_created += created_open_trivia
-        self.stdout.write(
-            self.style.SUCCESS(f"{created_open_trivia} Open Trivia question "
-                               "crumbs saved.")
-        )
+                    total_created += created
+                    counts[name][0] += created
+                    counts[name][1] += len(items)
+                    counts[name][2] += len(fresh)
+        finally:
+            summarization.set_run_deadline(None)
+            http_client.close_all()
+            sent = quota.finish_run()
+        if sent:
+            self.stdout.write("API requests: " + ", ".join(
+                f"{provider} {count}"
+                for provider, count in sorted(sent.items())
+            ) + ".")
 
-        # Fetches and handles NewsAPI.org Fashion News
-        self.stdout.write("Fetching fashion news from NewsAPI.org...")
-        fashion_data = fashion.fetch_newsapi_fashion_news()
-        created_fashion = fashion_handler.handle_fashion_crumbs(fashion_data)
-        total_created += created_fashion
+        dedup.prune()
+        pruned = summary_cache.prune()
+        stats = summary_cache.stats
         self.stdout.write(
-            self.style.SUCCESS(f"{created_fashion} fashion crumbs saved from "
-                               "NewsAPI.org.")
+            f"Summary cache: {stats['memory_hits']} memory hits, "
+            f"{stats['db_hits']} database hits, {stats['misses']} misses, "
+            f"{pruned} entries pruned."
         )
 
-        # Fetches and handles NewsAPI.org Cars & Transport News
-        self.stdout.write("Fetching cars and transport news "
-                          "from NewsAPI.org...")
-        cars_transport_data = cars_transport.fetch_newsapi_cars_transport_news()
-        created_cars_transport = cars_transport_handler.handle_cars_transport_crumbs(
-            cars_transport_data)
-        total_created += created_cars_transport
+        # Print the total number of crumbs added
         self.stdout.write(
-            self.style.SUCCESS(f"{created_cars_transport} cars & transport "
-                               "crumbs saved from NewsAPI.org.")
+            self.style.SUCCESS(
+                f" Total crumbs added: {total_created} "
+                f"({time.monotonic() - started:.1f}s)"
+            )
         )
+        pending = Crumb.objects.filter(
+            summary_status=Crumb.SUMMARY_PENDING).count()
+        if pending:
+            self.stdout.write(
+                f"{pending} crumbs are waiting for a summary; run "
+                f"summarize_crumbs to fill them in."
+            )
 
-        # Fetches and handles NewsAPI.org DIY News
-        self.stdout.write("Fetching DIY news from NewsAPI.org...")
-        diy_data = diy.fetch_newsapi_diy_news()
-        created_diy = diy_handler.handle_diy_crumbs(diy_data)
-        total_created += created_diy
+    def _report(self, source, counts, error):
+        """
+        Writes the outcome of one source once its last chunk is handled.
+        """
+        created, fetched, handled = counts
+        if error is not None:
+            self.stdout.write(
+                self.style.ERROR(f"{source.label} ({source.name}) fetch "
+                                 f"failed: {error}")
+            )
+            if not created:
+                return
         self.stdout.write(
-            self.style.SUCCESS(f"{created_diy} DIY crumbs saved from "
-                               "NewsAPI.org.")
+            self.style.SUCCESS(f"{created} {source.kind} crumbs saved "
+                               f"from {source.label}.")
         )
-
-        # Print the total number of crumbs added
-        self.stdout.write(
-            self.style.SUCCESS(f" Total crumbs added: {total_created}")
-        )
\ No newline at end of file
+        if handled < fetched:
+            self.stdout.write(
+                f"{fetched - handled} {source.kind} items from "
+                f"{source.label} were already fetched before."
+            )
@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from crumbs.models import Crumb
+from pipeline.ingest import summary_status
+from pipeline.utils import summarize_texts
+
+
+class Command(BaseCommand):
+    help = ('Fills in summaries for crumbs saved with a pending summary, '
+            'newest first.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'SUMMARIZE_BATCH_SIZE', 32),
+            help='Crumbs loaded and saved per batch.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'HF_MAX_CONCURRENCY', 4),
+            help='Summarization requests in flight at once.',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=getattr(settings, 'SUMMARIZE_RATE', 0),
+            help='Maximum crumbs summarized per minute (0 for no limit).',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Stop after this many crumbs.',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Queue crumbs whose summary failed before for another try.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        rate = options['rate']
+        limit = options['limit']
+
+        if options['retry_failed']:
+            requeued = Crumb.objects.filter(
+                summary_status=Crumb.SUMMARY_FAILED
+            ).update(summary_status=Crumb.SUMMARY_PENDING)
+            self.stdout.write(f"{requeued} failed crumbs queued again.")
+
+        started = time.monotonic()
+        done = failed = 0
+        while limit is None or done + failed < limit:
+            size = batch_size if limit is None else \
+                min(batch_size, limit - done - failed)
+            crumbs = list(
+                Crumb.objects.filter(summary_status=Crumb.SUMMARY_PENDING)
+                .order_by('-published_at', '-id')
+                .only('id', 'content', 'summary', 'summary_status')[:size]
+            )
+            if not crumbs:
+                break
+
+            batch_started = time.monotonic()
+            summaries = summarize_texts(
+                [crumb.content for crumb in crumbs],
+                concurrency=options['concurrency'],
+            )
+            for crumb, summary in zip(crumbs, summaries):
+                crumb.summary = summary
+                crumb.summary_status = summary_status(crumb.content, summary)
+                if crumb.summary_status == Crumb.SUMMARY_FAILED:
+                    failed += 1
+                else:
+                    done += 1
+            Crumb.objects.bulk_update(crumbs, ['summary', 'summary_status'])
+            self.stdout.write(f"Summarized {len(crumbs)} crumbs...")
+
+            if rate > 0:
+                # Stay under the rate by spacing out the batches.
+                wait = len(crumbs) * 60 / rate - \
+                    (time.monotonic() - batch_started)
+                if wait > 0:
+                    time.sleep(wait)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{done} summaries saved, {failed} failed "
+                f"({time.monotonic() - started:.1f}s)."
+            )
+        )
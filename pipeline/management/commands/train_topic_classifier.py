@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from crumbs.models import Crumb
+from pipeline.classifier import TopicClassifier
+
+
+class Command(BaseCommand):
+    help = ('Trains the topic classifier from the topics of stored crumbs '
+            'and saves it to disk.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=getattr(settings, 'TOPIC_CLASSIFIER_PATH', None),
+            help='Where to save the model (.npz).',
+        )
+        parser.add_argument(
+            '--min-df',
+            type=int,
+            default=2,
+            help='Ignore words found in fewer crumbs than this.',
+        )
+        parser.add_argument(
+            '--max-features',
+            type=int,
+            default=20000,
+            help='Keep at most this many of the most common words.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError(
+                "No output path; set TOPIC_CLASSIFIER_PATH or use --output.")
+
+        started = time.monotonic()
+        rows = Crumb.objects.values_list(
+            'title', 'content', 'summary', 'topic__slug').iterator()
+        texts, slugs = [], []
+        for title, content, summary, slug in rows:
+            texts.append(f"{title} {content or summary}")
+            slugs.append(slug)
+        if not texts:
+            raise CommandError("There are no crumbs to train on.")
+
+        classifier = TopicClassifier.fit(
+            texts, slugs, min_df=options['min_df'],
+            max_features=options['max_features'],
+        )
+        classifier.save(options['output'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Trained on {len(texts)} crumbs across "
+                f"{len(classifier.slugs)} topics with "
+                f"{len(classifier.vocabulary)} words; saved to "
+                f"{options['output']} "
+                f"({time.monotonic() - started:.1f}s)."
+            )
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 07:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crumbs', '0006_crumb_content_summary_status'),
+        ('pipeline', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrumbSignature',
+            fields=[
+                ('crumb', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='crumbs.crumb')),
+                ('signature', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CrumbBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='pipeline.crumbsignature')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipeline', '0002_crumb_signature_bands'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64, unique=True)),
+                ('last_published_at', models.DateTimeField(blank=True, null=True)),
+                ('last_item_id', models.BigIntegerField(blank=True, null=True)),
+                ('page_token', models.CharField(blank=True, max_length=255)),
+                ('seen', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipeline', '0003_source_watermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('used', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('provider', 'day'), name='providerquota_provider_day')],
+            },
+        ),
+    ]
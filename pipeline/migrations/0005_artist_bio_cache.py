@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipeline', '0004_provider_quota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtistBioCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('summary', models.TextField(blank=True)),
+                ('url', models.URLField(blank=True, max_length=500)),
+                ('fetched_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
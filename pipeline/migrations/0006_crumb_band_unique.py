@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+def clear_index(apps, schema_editor):
+    # Signatures from before the overflow fix hash differently and can never
+    # match new ones, and re-indexing may have stored duplicate bands.
+    apps.get_model('pipeline', 'CrumbSignature').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipeline', '0005_artist_bio_cache'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_index, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='crumbband',
+            constraint=models.UniqueConstraint(fields=('signature', 'key'), name='crumbband_signature_key'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def clear_index(apps, schema_editor):
+    # Signatures are now hashed modulo a 32-bit prime; ones stored before
+    # cannot match new ones.
+    apps.get_model('pipeline', 'CrumbSignature').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pipeline', '0006_crumb_band_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_index, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,109 @@
 from django.db import models
 
-# Create your models here.
+
+class SummaryCache(models.Model):
+    """
+    A summary returned by the remote summarization model, keyed by a hash
+    of the cleaned input text and the model id so identical content is
+    never summarized twice.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=255)
+    summary = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model}: {self.summary[:50]}"
+
+
+class CrumbSignature(models.Model):
+    """
+    MinHash signature of a recent crumb's text, used to spot the same story
+    arriving again from another provider (see pipeline.dedup).
+    """
+    crumb = models.OneToOneField(
+        'crumbs.Crumb', on_delete=models.CASCADE, primary_key=True,
+        related_name='signature'
+    )
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Signature for crumb {self.crumb_id}"
+
+
+class CrumbBand(models.Model):
+    """
+    One LSH band of a CrumbSignature. Crumbs sharing a band key are
+    candidate near-duplicates.
+    """
+    signature = models.ForeignKey(
+        CrumbSignature, on_delete=models.CASCADE, related_name='bands'
+    )
+    key = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['signature', 'key'],
+                                    name='crumbband_signature_key'),
+        ]
+
+    def __str__(self):
+        return f"Band {self.key} of crumb {self.signature_id}"
+
+
+class SourceWatermark(models.Model):
+    """
+    How far a source has been fetched, so the next run only asks for (and
+    only hands on) what is new (see pipeline.watermarks).
+    """
+    source = models.CharField(max_length=64, unique=True)
+    last_published_at = models.DateTimeField(null=True, blank=True)
+    # Highest provider item id seen, for APIs with increasing ids.
+    last_item_id = models.BigIntegerField(null=True, blank=True)
+    # Provider cursor for the next page, for APIs that page with one.
+    page_token = models.CharField(max_length=255, blank=True)
+    # URL hashes of the most recent items, newest first.
+    seen = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} up to {self.last_published_at}"
+
+
+class ProviderQuota(models.Model):
+    """
+    Requests sent to an API provider on one day, so fetch_crumbs can spread
+    the provider's daily quota over the day's runs (see pipeline.quota).
+    """
+    provider = models.CharField(max_length=64)
+    day = models.DateField()
+    used = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'day'],
+                                    name='providerquota_provider_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} on {self.day}: {self.used}"
+
+
+class ArtistBioCache(models.Model):
+    """
+    A Last.fm artist bio, keyed by the artist's MusicBrainz id (or name), so
+    artists still on the chart are not looked up again until the entry is
+    LASTFM_BIO_TTL seconds old.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
+    summary = models.TextField(blank=True)
+    url = models.URLField(max_length=500, blank=True)
+    fetched_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.fetched_at:%Y-%m-%d})"
@@ -0,0 +1,263 @@
+from functools import partial
+
+import requests
+from django.conf import settings
+
+from pipeline import paging, watermarks
+from pipeline.tagging import KeywordTagger
+
+
+def pack(sources, size, limit):
+    """
+    Splits ``sources`` into as few consecutive groups as possible whose
+    total ``size`` stays within ``limit``. A source bigger than the limit
+    gets a group of its own.
+
+    Args:
+        sources (list): Sources in the order to pack them.
+        size (callable): Returns what a source takes up in a request.
+        limit (int): Most a single request may hold.
+    """
+    groups, current, used = [], [], 0
+    for source in sources:
+        cost = size(source)
+        if current and used + cost > limit:
+            groups.append(current)
+            current, used = [], 0
+        current.append(source)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def newsdata_route(article, sources, tagger=None):
+    """
+    Returns the name of the first of ``sources`` sharing a category with
+    a NewsData.io article and, for sources with keywords, whose keywords
+    occur in its title or description; or None.
+    """
+    categories = set(article.get("category") or [])
+    matched = tagger.scores(
+        f"{article.get('title') or ''} {article.get('description') or ''}"
+    ) if tagger is not None else {}
+    for source in sources:
+        if categories.intersection(source.categories) and \
+                (not source.keywords or source.name in matched):
+            return source.name
+    return None
+
+
+def _newsdata_item(sources, tagger, fetched, article):
+    name = newsdata_route(article, sources, tagger)
+    if name is None:
+        return None
+    item = paging.newsdata_item(article, default_source="NewsData.io")
+    if item is None or item["url"] in fetched:
+        return None
+    fetched.add(item["url"])
+    item["route"] = name
+    return item
+
+
+def fetch_newsdata(sources, watermark=None):
+    """
+    Fetches the latest NewsData.io articles for several sources at once,
+    asking for up to NEWSDATA_MAX_CATEGORIES categories and a ``q`` of up
+    to NEWSDATA_MAX_QUERY_LENGTH characters per request instead of sending
+    one request per source. Each request reads at most one page per source
+    it covers, so the group never costs more requests than fetching the
+    sources one by one.
+
+    Each article is routed by its own ``category`` field to the source
+    with the fewest categories that shares one with it and, if the source
+    has keywords, matches one of them, so an article in both "top" and
+    "environment" goes to the environment source.
+
+    Args:
+        sources (list): Sources with ``categories`` set, either all with
+            ``keywords`` or all without (see group_sources()).
+        watermark (SourceWatermark): Combined watermark of the sources
+            (see watermarks.combine()); paging stops at the first page with
+            nothing new.
+
+    Yields:
+        dict: Article details with the source name under ``route``.
+    """
+    try:
+        url = getattr(settings, 'NEWSDATA_LATEST_URL', None)
+        if not url:
+            raise ValueError(
+                "NEWSDATA_LATEST_URL is not set in Django settings.")
+
+        category_limit = getattr(settings, 'NEWSDATA_MAX_CATEGORIES', 5)
+        query_limit = getattr(settings, 'NEWSDATA_MAX_QUERY_LENGTH', 512)
+        ordered = sorted(sources, key=lambda source: len(source.categories))
+        tagger = KeywordTagger({
+            source.name: list(source.keywords) for source in ordered
+            if source.keywords
+        })
+        fetched = set()
+
+        def size(source):
+            # Share of both limits the source takes, on a common scale; a
+            # group within the scale keeps each of them.
+            return max(len(source.categories) * (query_limit + 4),
+                       (len(query_terms(source)) + 4) * category_limit)
+
+        for group in pack(ordered, size, category_limit * (query_limit + 4)):
+            params = {"category": ",".join(
+                category for source in group
+                for category in source.categories
+            )}
+            query = " OR ".join(
+                query_terms(source) for source in group if source.keywords)
+            if query:
+                params["q"] = query
+            yield from paging.iter_pages(
+                url, "results", paging.newsdata_next,
+                partial(_newsdata_item, ordered, tagger, fetched),
+                params=params,
+                watermark=watermark,
+                max_pages=len(group),
+            )
+    except requests.exceptions.RequestException as req_err:
+        print(f"NewsData.io fetch error: {req_err}")
+    except ValueError as val_err:
+        print(f"Configuration error for NewsData.io: {val_err}")
+    except Exception as e:
+        print(f"NewsData.io unexpected error: {e}")
+
+
+def query_terms(source):
+    """
+    Returns a source's keywords as a ``q`` expression, with phrases quoted
+    (the syntax NewsData.io and NewsAPI.org share).
+    """
+    return " OR ".join(
+        f'"{keyword}"' if " " in keyword else keyword
+        for keyword in source.keywords
+    )
+
+
+def newsapi_route(article, tagger):
+    """
+    Returns the name of the source whose keywords occur most often in a
+    NewsAPI.org article's title and description, or None.
+    """
+    scores = tagger.scores(
+        f"{article.get('title') or ''} {article.get('description') or ''}")
+    if not scores:
+        return None
+    return min(scores, key=lambda name: (-scores[name], tagger.order[name]))
+
+
+def _newsapi_item(tagger, fetched, article):
+    name = newsapi_route(article, tagger)
+    if name is None:
+        return None
+    item = paging.newsapi_item(article, default_source="NewsAPI.org")
+    if item is None or item["url"] in fetched:
+        return None
+    fetched.add(item["url"])
+    item["route"] = name
+    return item
+
+
+def fetch_newsapi(sources, watermark=None):
+    """
+    Fetches NewsAPI.org /everything articles for several sources at once by
+    joining their keywords into one ``q``, split over more requests only
+    where the query would pass NEWSAPI_MAX_QUERY_LENGTH.
+
+    NewsAPI.org articles have no category, so each one is routed to the
+    source whose keywords it matches most often; articles matching none
+    are dropped.
+
+    Args:
+        sources (list): Sources with ``keywords`` set.
+        watermark (SourceWatermark): Combined watermark of the sources;
+            only newer items are requested when given.
+
+    Yields:
+        dict: Article details with the source name under ``route``.
+    """
+    try:
+        url = getattr(settings, 'NEWSAPI_EVERYTHING_URL', None)
+        if not url:
+            raise ValueError(
+                "NEWSAPI_EVERYTHING_URL is not set in Django settings.")
+
+        # NewsAPI.org 'from' takes an ISO 8601 time
+        params = {}
+        start = watermarks.since(watermark)
+        if start:
+            params["from"] = start.strftime("%Y-%m-%dT%H:%M:%S")
+
+        limit = getattr(settings, 'NEWSAPI_MAX_QUERY_LENGTH', 500)
+        tagger = KeywordTagger(
+            {source.name: list(source.keywords) for source in sources})
+        fetched = set()
+        for group in pack(sources,
+                          lambda source: len(query_terms(source)) + 4,
+                          limit + 4):
+            query = " OR ".join(query_terms(source) for source in group)
+            # No more requests than fetching the sources one by one.
+            yield from paging.iter_pages(
+                url, "articles", paging.newsapi_next,
+                partial(_newsapi_item, tagger, fetched),
+                params=dict(params, q=query),
+                watermark=watermark,
+                max_pages=len(group),
+            )
+    except requests.exceptions.RequestException as req_err:
+        print(f"NewsAPI.org fetch error: {req_err}")
+    except ValueError as val_err:
+        print(f"Configuration error for NewsAPI.org: {val_err}")
+    except Exception as e:
+        print(f"NewsAPI.org unexpected error: {e}")
+
+
+PROVIDERS = {
+    "newsdata": fetch_newsdata,
+    "newsapi": fetch_newsapi,
+}
+
+
+def group_sources(sources):
+    """
+    Returns {group name: [sources]} for the sources of a provider in
+    PROVIDERS that can share a merged query, wherever there are at least
+    two; the rest are better fetched on their own.
+
+    Sources need categories or keywords to route by. Sources with
+    keywords are only merged with other sources with keywords: a merged
+    ``q`` would narrow down what a source without one asks for.
+    """
+    groups = {}
+    for source in sources:
+        if source.provider in PROVIDERS and \
+                (source.categories or source.keywords):
+            name = f"{source.provider} (merged)" if source.keywords \
+                else f"{source.provider} (merged by category)"
+            groups.setdefault(name, []).append(source)
+    return {
+        name: members for name, members in groups.items()
+        if len(members) > 1
+    }
+
+
+def split(items, sources):
+    """
+    Splits a chunk of routed items by source, removing the ``route`` key.
+
+    Returns:
+        dict: {source name: items} for the names in ``sources``, in the
+        order of ``sources``.
+    """
+    routed = {source.name: [] for source in sources}
+    for item in items:
+        name = item.pop("route", None)
+        if name in routed:
+            routed[name].append(item)
+    return routed
@@ -0,0 +1,251 @@
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from pipeline.models import ProviderQuota
+
+
+# API provider of each host the fetchers talk to.
+PROVIDER_HOSTS = {
+    "newsdata.io": "newsdata",
+    "newsapi.org": "newsapi",
+    "api.thenewsapi.com": "thenewsapi",
+    "finnhub.io": "finnhub",
+    "api.mediastack.com": "mediastack",
+    "api.spoonacular.com": "spoonacular",
+    "ws.audioscrobbler.com": "lastfm",
+    "perenual.com": "perenual",
+    "trefle.io": "trefle",
+    "permapeople.org": "permapeople",
+    "opentdb.com": "opentdb",
+}
+
+
+class QuotaExhausted(requests.exceptions.RequestException):
+    """
+    Raised instead of sending a request when the provider's allowance for
+    this run is used up, or when its rate limit would make the request wait
+    longer than PIPELINE_RATE_MAX_WAIT. Fetchers already handle
+    RequestException, so they stop and keep what they have.
+    """
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    """
+    A provider's limits, from the PIPELINE_PROVIDER_LIMITS setting.
+
+    Attributes:
+        rate: Requests per second the provider accepts over time.
+        burst: Requests that may be sent back to back.
+        daily: Requests allowed per day; None for no daily quota.
+    """
+    rate: float
+    burst: int = 1
+    daily: Optional[int] = None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: holds up to ``capacity`` tokens and refills
+    at ``rate`` tokens per second. A request that finds the bucket empty
+    reserves the next token and sleeps until it is due, so concurrent
+    callers are spaced out rather than all retrying at once.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """
+        Takes a token and returns how many seconds the caller must wait
+        before using it, or None (taking nothing) if that would be longer
+        than ``max_wait``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def drain(self, seconds):
+        """
+        Empties the bucket so the next token is only due in ``seconds``.
+        """
+        with self._lock:
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+            self.updated = time.monotonic()
+
+
+_buckets = {}
+_allowances = {}
+_used = Counter()
+_lock = threading.Lock()
+
+
+def get_limits():
+    """
+    Returns {provider: ProviderLimit} from PIPELINE_PROVIDER_LIMITS.
+    """
+    return {
+        provider: ProviderLimit(**limit)
+        for provider, limit in getattr(
+            settings, 'PIPELINE_PROVIDER_LIMITS', {}).items()
+    }
+
+
+def provider_for(url):
+    """
+    Returns the provider of ``url`` by its host, or None.
+    """
+    host = urlsplit(url).netloc.lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    return PROVIDER_HOSTS.get(host)
+
+
+def _bucket(provider, limit):
+    bucket = _buckets.get(provider)
+    if bucket is None:
+        with _lock:
+            bucket = _buckets.setdefault(
+                provider, TokenBucket(limit.rate, limit.burst))
+    return bucket
+
+
+def acquire(url):
+    """
+    Asks for permission to send one request to ``url``, waiting for the
+    provider's rate limit if needed. Called by http_client for every
+    request; hosts without a known provider are let through at once.
+
+    Raises:
+        QuotaExhausted: The run's allowance for the provider is used up, or
+            the wait would be longer than PIPELINE_RATE_MAX_WAIT seconds.
+    """
+    provider = provider_for(url)
+    limit = get_limits().get(provider)
+    if limit is None:
+        return
+
+    with _lock:
+        if _allowances.get(provider) == 0:
+            raise QuotaExhausted(
+                f"{provider} request allowance for this run is used up")
+        if provider in _allowances:
+            _allowances[provider] -= 1
+    wait = _bucket(provider, limit).reserve(
+        getattr(settings, 'PIPELINE_RATE_MAX_WAIT', 10))
+    with _lock:
+        if wait is None:
+            if provider in _allowances:
+                _allowances[provider] += 1
+            raise QuotaExhausted(f"{provider} rate limit reached")
+        _used[provider] += 1
+    if wait:
+        time.sleep(wait)
+
+
+def backoff(url, retry_after=None):
+    """
+    Holds back further requests to ``url``'s provider after a 429 response,
+    for ``retry_after`` seconds (the Retry-After header) or one minute.
+    """
+    provider = provider_for(url)
+    limit = get_limits().get(provider)
+    if limit is None:
+        return
+    try:
+        seconds = float(retry_after)
+    except (TypeError, ValueError):
+        seconds = 60
+    _bucket(provider, limit).drain(seconds)
+
+
+def start_run(sources):
+    """
+    Works out how many requests each provider with a daily quota may get in
+    this run, and returns the providers that have none left today.
+
+    The quota still left today (from the ProviderQuota ledger) is shared
+    evenly by the runs still to come before midnight, judging by the
+    shortest interval of the provider's sources, so early runs cannot use
+    up what later runs need and leftovers roll forward.
+
+    Args:
+        sources (list): The sources about to be fetched.
+
+    Returns:
+        set: Names of the providers whose quota is used up.
+    """
+    limits = get_limits()
+    intervals = {}
+    for source in sources:
+        limit = limits.get(source.provider)
+        if limit is not None and limit.daily is not None:
+            intervals[source.provider] = min(
+                intervals.get(source.provider, source.interval),
+                source.interval)
+
+    today = timezone.localdate()
+    used = dict(ProviderQuota.objects.filter(
+        provider__in=intervals, day=today
+    ).values_list('provider', 'used'))
+    now = timezone.localtime()
+    midnight = timezone.make_aware(
+        datetime.combine(today + timedelta(days=1), datetime.min.time()))
+    minutes_left = (midnight - now).total_seconds() / 60
+
+    with _lock:
+        _allowances.clear()
+        _used.clear()
+        for provider, interval in intervals.items():
+            remaining = max(0, limits[provider].daily - used.get(provider, 0))
+            runs_left = max(1, math.ceil(minutes_left / max(1, interval)))
+            _allowances[provider] = math.ceil(remaining / runs_left)
+        return {
+            provider for provider, allowance in _allowances.items()
+            if allowance == 0
+        }
+
+
+def finish_run():
+    """
+    Adds the requests sent during the run to today's ledger and drops the
+    run's allowances.
+
+    Returns:
+        dict: {provider: requests sent}.
+    """
+    with _lock:
+        used = {provider: count for provider, count in _used.items()
+                if count}
+        _allowances.clear()
+        _used.clear()
+
+    today = timezone.localdate()
+    for provider, count in used.items():
+        ProviderQuota.objects.get_or_create(provider=provider, day=today)
+        ProviderQuota.objects.filter(provider=provider, day=today).update(
+            used=F('used') + count)
+    return used
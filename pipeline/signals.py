@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from preferences.models import Topic
+from .tagging import get_tagger
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def clear_tagger_topics(sender, **kwargs):
+    get_tagger().clear_topics()
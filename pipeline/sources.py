@@ -0,0 +1,387 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Optional, Tuple
+
+from pipeline.tasks import (
+    plants,
+    environment,
+    sports,
+    finance,
+    news,
+    music,
+    technology,
+    food,
+    trivia,
+    fashion,
+    cars_transport,
+    diy,
+    )
+from pipeline.handlers import (
+    plants_handler,
+    environment_handler,
+    sports_handler,
+    finance_handler,
+    news_handler,
+    music_handler,
+    technology_handler,
+    food_handler,
+    trivia_handler,
+    fashion_handler,
+    cars_transport_handler,
+    diy_handler,
+    )
+
+
+@dataclass(frozen=True)
+class Source:
+    """
+    A single content source: how to fetch it, how to store what it returns,
+    and how it should be scheduled.
+
+    Attributes:
+        name: Stable key used on the command line (``--source``).
+        label: Human-readable provider name used in output.
+        fetcher: Callable from ``pipeline.tasks`` returning a list of items
+            or yielding them one at a time.
+        handler: Callable from ``pipeline.handlers`` taking a list of those
+            items and returning the number of crumbs created; it may be
+            called once per chunk of a source's items.
+        topic: Slug of the primary Topic the handler files crumbs under.
+        kind: Short description of the content, used in output.
+        interval: Minutes between fetches a scheduler should aim for.
+        timeout: Seconds the fetch may take; None uses the run default.
+        priority: Higher priorities are started first.
+        summarizer: Summarizer engine for this source's crumbs; None uses
+            the SUMMARIZER_ENGINE setting.
+        incremental: The fetcher takes a ``watermark`` keyword and asks its
+            API only for items newer than it, or stops paging once it
+            reaches them (see pipeline.watermarks).
+        time_ordered: The API filters or sorts the source's items by
+            publish time, so items older than the watermark can be dropped
+            as seen. Otherwise only URLs seen before are dropped.
+        provider: The API provider, whose rate limit and daily quota the
+            source shares (see pipeline.quota). Providers in
+            ``pipeline.providers.PROVIDERS`` can also fetch several of
+            their sources in fewer requests.
+        categories: Provider categories routed to this source (NewsData.io).
+        keywords: Keywords that route an article to this source; the same
+            terms as its own URL's ``q``, so a merged query asks for them
+            too.
+    """
+    name: str
+    label: str
+    fetcher: Callable
+    handler: Callable
+    topic: str
+    kind: str
+    interval: int = 60
+    timeout: Optional[float] = None
+    priority: int = 0
+    summarizer: Optional[str] = None
+    incremental: bool = False
+    time_ordered: bool = False
+    provider: Optional[str] = None
+    categories: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+
+
+SOURCES = [
+    Source(
+        name="perenual",
+        label="Perenual",
+        fetcher=plants.fetch_perenual_guides,
+        handler=partial(plants_handler.handle_plant_data, "Perenual"),
+        topic="plants-and-gardening",
+        kind="plant",
+        interval=24 * 60,
+        provider="perenual",
+    ),
+    Source(
+        name="trefle",
+        label="Trefle",
+        fetcher=plants.fetch_trefle_plants,
+        handler=partial(plants_handler.handle_plant_data, "Trefle"),
+        topic="plants-and-gardening",
+        kind="plant",
+        interval=24 * 60,
+        provider="trefle",
+    ),
+    Source(
+        name="permapeople",
+        label="PermaPeople",
+        fetcher=plants.fetch_permapeople_plants,
+        handler=partial(plants_handler.handle_plant_data, "PermaPeople"),
+        topic="plants-and-gardening",
+        kind="plant",
+        interval=24 * 60,
+        provider="permapeople",
+    ),
+    Source(
+        name="newsdata-environment",
+        label="NewsData.io",
+        fetcher=environment.fetch_environment_news,
+        handler=environment_handler.handle_environment_articles,
+        topic="environment",
+        kind="environment",
+        interval=3 * 60,
+        priority=5,
+        incremental=True,
+        time_ordered=True,
+        provider="newsdata",
+        categories=("environment",),
+    ),
+    Source(
+        name="thenewsapi-sports",
+        label="TheNewsAPI",
+        fetcher=sports.fetch_thenewsapi_sports,
+        handler=sports_handler.handle_sports_crumbs,
+        topic="sports-and-fitness",
+        kind="general sports",
+        priority=5,
+        incremental=True,
+        time_ordered=True,
+        provider="thenewsapi",
+    ),
+    Source(
+        name="newsdata-fitness",
+        label="NewsData.io",
+        fetcher=sports.fetch_newsdata_fitness,
+        handler=sports_handler.handle_sports_crumbs,
+        topic="sports-and-fitness",
+        kind="fitness",
+        interval=3 * 60,
+        priority=5,
+        incremental=True,
+        time_ordered=True,
+        provider="newsdata",
+        categories=("health", "sports"),
+        keywords=("fitness", "gym", "workout", "health", "nutrition"),
+    ),
+    Source(
+        name="finnhub",
+        label="Finnhub",
+        fetcher=finance.fetch_finnhub_general_news,
+        handler=finance_handler.handle_finance_crumbs,
+        topic="stock-crypto-finance",
+        kind="finance",
+        interval=30,
+        priority=10,
+        incremental=True,
+        time_ordered=True,
+        provider="finnhub",
+    ),
+    Source(
+        name="newsdata-world",
+        label="NewsData.io",
+        fetcher=news.fetch_newsdata_world_news,
+        handler=news_handler.handle_world_news_crumbs,
+        topic="world-news",
+        kind="world news",
+        interval=30,
+        priority=10,
+        incremental=True,
+        time_ordered=True,
+        provider="newsdata",
+        categories=("top", "politics", "world"),
+        keywords=(
+            "world news", "global events", "international affairs",
+            "breaking news",
+        ),
+    ),
+    Source(
+        name="newsapi-world",
+        label="NewsAPI.org",
+        fetcher=news.fetch_newsapi_world_news,
+        handler=news_handler.handle_world_news_crumbs,
+        topic="world-news",
+        kind="world news",
+        interval=30,
+        priority=10,
+        provider="newsapi",
+    ),
+    Source(
+        name="lastfm",
+        label="Last.fm",
+        fetcher=music.fetch_lastfm_top_artists_bios,
+        handler=music_handler.handle_music_crumbs,
+        topic="music",
+        kind="music (artist bio)",
+        interval=24 * 60,
+        # One request per chart artist not in the bio cache, so a cold
+        # cache needs longer than the rest.
+        timeout=120,
+        provider="lastfm",
+    ),
+    Source(
+        name="newsdata-music",
+        label="NewsData.io",
+        fetcher=music.fetch_newsdata_music_news,
+        handler=music_handler.handle_music_crumbs,
+        topic="music",
+        kind="music news",
+        interval=3 * 60,
+        priority=5,
+        incremental=True,
+        time_ordered=True,
+        provider="newsdata",
+        categories=("music",),
+        keywords=(
+            "music", "album", "artist", "band", "song", "concert",
+            "festival", "tour", "genre",
+        ),
+    ),
+    Source(
+        name="mediastack-technology",
+        label="Mediastack",
+        fetcher=technology.fetch_mediastack_technology_news,
+        handler=technology_handler.handle_technology_crumbs,
+        topic="technology",
+        kind="technology",
+        interval=3 * 60,
+        priority=5,
+        incremental=True,
+        time_ordered=True,
+        provider="mediastack",
+    ),
+    Source(
+        name="spoonacular",
+        label="Spoonacular",
+        fetcher=food.fetch_spoonacular_random_recipes,
+        handler=food_handler.handle_food_drink_crumbs,
+        topic="food-and-drink",
+        kind="food & drink (recipe)",
+        interval=24 * 60,
+        provider="spoonacular",
+    ),
+    Source(
+        name="newsdata-food",
+        label="NewsData.io",
+        fetcher=food.fetch_newsdata_food_drink_news,
+        handler=food_handler.handle_food_drink_crumbs,
+        topic="food-and-drink",
+        kind="food & drink news",
+        interval=3 * 60,
+        priority=5,
+        incremental=True,
+        time_ordered=True,
+        provider="newsdata",
+        categories=("food",),
+        keywords=(
+            "food", "drink", "recipe", "nutrition", "diet", "cooking",
+            "restaurant", "trends",
+        ),
+    ),
+    Source(
+        name="useless-facts",
+        label="Useless Facts",
+        fetcher=trivia.fetch_useless_facts,
+        handler=trivia_handler.handle_trivia_fun_crumbs,
+        topic="trivia-and-fun",
+        kind="useless fact",
+        # Short, high-volume items: summarize locally, no network call.
+        summarizer="extractive",
+    ),
+    Source(
+        name="chuck-norris",
+        label="Chuck Norris Jokes",
+        fetcher=trivia.fetch_chuck_norris_jokes,
+        handler=trivia_handler.handle_trivia_fun_crumbs,
+        topic="trivia-and-fun",
+        kind="Chuck Norris joke",
+        summarizer="extractive",
+    ),
+    Source(
+        name="open-trivia",
+        label="Open Trivia DB",
+        fetcher=trivia.fetch_open_trivia,
+        handler=trivia_handler.handle_trivia_fun_crumbs,
+        topic="trivia-and-fun",
+        kind="Open Trivia question",
+        summarizer="extractive",
+        provider="opentdb",
+    ),
+    Source(
+        name="newsapi-fashion",
+        label="NewsAPI.org",
+        fetcher=fashion.fetch_newsapi_fashion_news,
+        handler=fashion_handler.handle_fashion_crumbs,
+        topic="fashion",
+        kind="fashion",
+        interval=6 * 60,
+        incremental=True,
+        provider="newsapi",
+        keywords=(
+            "fashion", "style", "trend", "designer", "runway", "apparel",
+            "luxury fashion", "haute couture",
+        ),
+    ),
+    Source(
+        name="newsapi-cars-transport",
+        label="NewsAPI.org",
+        fetcher=cars_transport.fetch_newsapi_cars_transport_news,
+        handler=cars_transport_handler.handle_cars_transport_crumbs,
+        topic="cars-transport",
+        kind="cars & transport",
+        interval=6 * 60,
+        incremental=True,
+        provider="newsapi",
+        keywords=(
+            "cars", "automobile", "automotive", "transport",
+            "transportation", "electric vehicle", "EV", "self-driving",
+            "public transport", "train", "bus", "plane", "truck",
+            "shipping", "vehicle", "traffic",
+        ),
+    ),
+    Source(
+        name="newsapi-diy",
+        label="NewsAPI.org",
+        fetcher=diy.fetch_newsapi_diy_news,
+        handler=diy_handler.handle_diy_crumbs,
+        topic="diy",
+        kind="DIY",
+        interval=6 * 60,
+        incremental=True,
+        provider="newsapi",
+        keywords=(
+            "DIY", "do it yourself", "home improvement", "craft",
+            "building", "remodel", "renovate", "fix", "repair",
+            "woodworking", "gardening", "hacks", "tips", "guide",
+            "tutorial",
+        ),
+    ),
+]
+
+SOURCES_BY_NAME = {source.name: source for source in SOURCES}
+
+
+def select_sources(names=None, topics=None, exclude=None):
+    """
+    Picks sources from the registry, highest priority first.
+
+    Args:
+        names (list): Only include these source names.
+        topics (list): Only include sources whose primary topic slug is
+            one of these.
+        exclude (list): Source names to leave out.
+
+    Returns:
+        list: Matching Source objects ordered by descending priority,
+        keeping registry order between equal priorities.
+
+    Raises:
+        ValueError: If any name in ``names`` or ``exclude`` is unknown.
+    """
+    unknown = [
+        name for name in (names or []) + (exclude or [])
+        if name not in SOURCES_BY_NAME
+    ]
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(unknown)}")
+
+    selected = [
+        source for source in SOURCES
+        if (not names or source.name in names)
+        and (not topics or source.topic in topics)
+        and source.name not in (exclude or [])
+    ]
+    return sorted(selected, key=lambda source: -source.priority)
@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+
+class Deadline:
+    """
+    A point in time after which no new summarization work is started.
+    ``seconds=None`` never expires.
+    """
+
+    def __init__(self, seconds=None):
+        self.expires_at = None if seconds is None else \
+            time.monotonic() + seconds
+
+    def remaining(self):
+        """
+        Returns the seconds left (never negative), or None if unlimited.
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.expires_at is not None and self.remaining() == 0
+
+
+# Deadline shared by every summarize_texts() call in the current
+# fetch_crumbs run; see set_run_deadline().
+_run_deadline = None
+
+
+def set_run_deadline(seconds):
+    """
+    Starts (or, with None, clears) the overall summarization deadline for
+    this run. Summaries still missing when it passes are left empty.
+    """
+    global _run_deadline
+    _run_deadline = None if seconds is None else Deadline(seconds)
+
+
+def run_deadline():
+    """
+    Returns the current run's Deadline, or an unlimited one.
+    """
+    return _run_deadline or Deadline()
+
+
+def backoff_delay(attempt, estimated_time=None):
+    """
+    Returns how long to wait before retry number ``attempt`` (starting at
+    0). Grows exponentially from HF_BACKOFF_BASE, is never shorter than the
+    model's ``estimated_time`` to finish loading, and is capped at
+    HF_BACKOFF_MAX seconds.
+    """
+    base = getattr(settings, 'HF_BACKOFF_BASE', 1.0)
+    cap = getattr(settings, 'HF_BACKOFF_MAX', 30.0)
+    delay = base * (2 ** attempt)
+    if estimated_time:
+        delay = max(delay, float(estimated_time))
+    return min(delay, cap)
+
+
+def sleep_before_retry(attempt, deadline, estimated_time=None):
+    """
+    Sleeps for the backoff delay unless that would run past ``deadline``.
+
+    Returns:
+        bool: True if the caller should retry, False if it should give up.
+    """
+    if attempt >= getattr(settings, 'HF_MAX_RETRIES', 3):
+        return False
+    delay = backoff_delay(attempt, estimated_time)
+    remaining = deadline.remaining()
+    if remaining is not None and remaining < delay:
+        return False
+    time.sleep(delay)
+    return True
+
+
+def run_batches(request, batches, concurrency=None, deadline=None):
+    """
+    Sends summarization batches on a bounded pool of threads.
+
+    The workers only make HTTP calls; cache reads and writes stay with the
+    caller. Batches that have not finished when the deadline passes are
+    abandoned and reported as None.
+
+    Args:
+        request (callable): Called as ``request(batch, deadline)`` and
+            returning a list of summaries, or None on failure.
+        batches (list): Lists of texts, one per request.
+        concurrency (int): Maximum requests in flight. Defaults to the
+            HF_MAX_CONCURRENCY setting.
+        deadline (Deadline): When to stop waiting. Defaults to the run
+            deadline.
+
+    Returns:
+        list: The result of ``request`` for each batch, in order, or None
+        for batches that failed or missed the deadline.
+    """
+    if not batches:
+        return []
+    if concurrency is None:
+        concurrency = getattr(settings, 'HF_MAX_CONCURRENCY', 4)
+    if deadline is None:
+        deadline = run_deadline()
+
+    results = [None] * len(batches)
+    if deadline.expired():
+        print(f"Summarization deadline reached; {len(batches)} "
+              f"batch(es) skipped.")
+        return results
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(concurrency, len(batches))),
+        thread_name_prefix="summarize",
+    )
+    try:
+        futures = {
+            executor.submit(request, batch, deadline): index
+            for index, batch in enumerate(batches)
+        }
+        done, not_done = wait(futures, timeout=deadline.remaining())
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Unexpected HuggingFace summarization error: {e}")
+        if not_done:
+            print(f"Summarization deadline reached; {len(not_done)} "
+                  f"batch(es) skipped.")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from pipeline.models import SummaryCache
+
+
+# Small in-process LRU in front of the SummaryCache table, plus counters
+# that fetch_crumbs reports at the end of a run.
+_lru = OrderedDict()
+_lock = threading.Lock()
+stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def make_key(text, model):
+    """
+    Returns the cache key for ``text`` summarized by ``model``.
+    """
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _lru_size():
+    return getattr(settings, 'SUMMARY_CACHE_LRU_SIZE', 1024)
+
+
+def _remember(key, summary):
+    size = _lru_size()
+    if size <= 0:
+        return
+    with _lock:
+        _lru[key] = summary
+        _lru.move_to_end(key)
+        while len(_lru) > size:
+            _lru.popitem(last=False)
+
+
+def get_many(texts, model):
+    """
+    Looks up cached summaries for several texts with at most one query.
+
+    Args:
+        texts (list): Cleaned input texts.
+        model (str): Id of the summarization model.
+
+    Returns:
+        dict: Maps each text that was cached to its summary.
+    """
+    keys = {make_key(text, model): text for text in texts}
+    found = {}
+
+    with _lock:
+        for key, text in keys.items():
+            if key in _lru:
+                _lru.move_to_end(key)
+                found[text] = _lru[key]
+    stats["memory_hits"] += len(found)
+
+    missing = [key for key, text in keys.items() if text not in found]
+    if missing:
+        rows = dict(
+            SummaryCache.objects.filter(key__in=missing).values_list(
+                "key", "summary")
+        )
+        if rows:
+            SummaryCache.objects.filter(key__in=list(rows)).update(
+                hits=F("hits") + 1, last_used_at=timezone.now()
+            )
+        for key, summary in rows.items():
+            found[keys[key]] = summary
+            _remember(key, summary)
+        stats["db_hits"] += len(rows)
+        stats["misses"] += len(missing) - len(rows)
+
+    return found
+
+
+def get(text, model):
+    """
+    Returns the cached summary for ``text``, or None.
+    """
+    return get_many([text], model).get(text)
+
+
+def put_many(summaries, model):
+    """
+    Stores summaries for several texts. Empty summaries (failed calls) are
+    not cached so they are retried next time.
+
+    Args:
+        summaries (dict): Maps input text to its summary.
+        model (str): Id of the summarization model.
+    """
+    rows = [
+        SummaryCache(key=make_key(text, model), model=model, summary=summary)
+        for text, summary in summaries.items() if summary
+    ]
+    if not rows:
+        return
+    SummaryCache.objects.bulk_create(rows, ignore_conflicts=True)
+    for row in rows:
+        _remember(row.key, row.summary)
+
+
+def put(text, model, summary):
+    """
+    Stores the summary for a single text.
+    """
+    put_many({text: summary}, model)
+
+
+def prune(max_age_days=None, max_entries=None):
+    """
+    Evicts entries unused for longer than ``max_age_days`` and then the
+    least recently used entries beyond ``max_entries``. Defaults come from
+    the SUMMARY_CACHE_MAX_AGE_DAYS and SUMMARY_CACHE_MAX_ENTRIES settings.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    if max_age_days is None:
+        max_age_days = getattr(settings, 'SUMMARY_CACHE_MAX_AGE_DAYS', 30)
+    if max_entries is None:
+        max_entries = getattr(settings, 'SUMMARY_CACHE_MAX_ENTRIES', 50000)
+
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    deleted, _ = SummaryCache.objects.filter(
+        last_used_at__lt=cutoff).delete()
+
+    overflow = SummaryCache.objects.order_by("-last_used_at", "-pk")[
+        max_entries:max_entries + 1].values_list("last_used_at", "pk")
+    if overflow:
+        last_used_at, pk = overflow[0]
+        extra, _ = SummaryCache.objects.filter(
+            last_used_at__lte=last_used_at).exclude(
+            last_used_at=last_used_at, pk__gt=pk).delete()
+        deleted += extra
+
+    clear_memory()
+    return deleted
+
+
+def clear_memory():
+    """
+    Empties the in-process LRU (the database table is untouched).
+    """
+    with _lock:
+        _lru.clear()
+
+
+def reset_stats():
+    for name in stats:
+        stats[name] = 0
@@ -0,0 +1,164 @@
+import re
+import threading
+from collections import Counter
+
+from preferences.models import Topic
+
+
+# Keywords that suggest a crumb also belongs to a topic, by topic slug.
+KEYWORDS_MAP = {
+    "world-news": [
+        "breaking", "headline", "report", "journalist"
+        ],
+    "music": [
+        "song", "album", "artist", "track"
+        ],
+    "sports-and-fitness": [
+        "game", "match", "team", "fitness", "athlete"
+        ],
+    "stock-crypto-finance": [
+        "market", "stock", "crypto", "investment", "economy"
+        ],
+    "food-and-drink": [
+        "recipe", "meal", "ingredient", "cooking"
+        ],
+    "technology": [
+        "AI", "tech", "gadget", "software", "hardware"
+        ],
+    "plants-and-gardening": [
+        "plant", "soil", "water", "grow", "harvest"
+        ],
+    "environment": [
+        "climate", "recycle", "sustainability", "biodiversity"
+        ],
+    "trivia-and-fun": [
+        "fact", "joke", "trivia", "laugh", "weird"
+        ],
+    "fashion": [
+        "fashion", "style", "trend", "designer", "runway",
+        "apparel", "luxury fashion", "haute couture"
+        ],
+    "cars-transport": [
+        "car", "vehicle", "transport", "automotive", "driving",
+        "traffic", "road", "engine", "fuel"
+        ],
+}
+
+
+def plural(word):
+    """
+    Returns the regular English plural of ``word`` (of its last word for
+    a phrase): "es" after s, x, z, ch and sh, otherwise "s".
+    """
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return word + "es"
+    return word + "s"
+
+
+class KeywordTagger:
+    """
+    Matches text against topic keywords in a single regex pass.
+
+    All keywords are compiled into one case-insensitive alternation with
+    word boundaries, so "car" matches "car" and "cars" but not "scar", and
+    each topic is scored by how many of its keywords occur. Topics are
+    resolved from an in-memory cache of Topic objects, so tagging does not
+    query the database once the cache is warm. Build one per process with
+    get_tagger().
+    """
+
+    def __init__(self, keywords_map=KEYWORDS_MAP):
+        self.slugs = list(keywords_map)
+        self.order = {slug: index for index, slug in enumerate(self.slugs)}
+        # Each keyword and its plural ("cars", "buses") map to its topics.
+        self.keyword_slugs = {}
+        for slug, keywords in keywords_map.items():
+            for keyword in keywords:
+                for form in (keyword.lower(), plural(keyword.lower())):
+                    slugs = self.keyword_slugs.setdefault(form, [])
+                    if slug not in slugs:
+                        slugs.append(slug)
+
+        # Longest first so multi-word keywords win over their parts.
+        alternation = "|".join(
+            re.escape(keyword)
+            for keyword in sorted(self.keyword_slugs, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+        self._topics = None
+        self._lock = threading.Lock()
+
+    def scores(self, text):
+        """
+        Returns a Counter of keyword hits per topic slug.
+        """
+        counts = Counter()
+        if not text:
+            return counts
+        for match in self.pattern.finditer(text):
+            for slug in self.keyword_slugs[match.group(0).lower()]:
+                counts[slug] += 1
+        return counts
+
+    def match(self, text):
+        """
+        Returns every matching topic with its score.
+
+        Args:
+            text (str): Text to tag.
+
+        Returns:
+            list: (Topic, score) pairs, highest score first; equal scores
+            keep the order of KEYWORDS_MAP. Slugs with no Topic in the
+            database are left out.
+        """
+        counts = self.scores(text)
+        if not counts:
+            return []
+        topics = self.topics()
+        ranked = sorted(counts, key=lambda slug: (-counts[slug],
+                                                  self.order[slug]))
+        return [
+            (topics[slug], counts[slug]) for slug in ranked if slug in topics
+        ]
+
+    def best(self, text):
+        """
+        Returns the highest scoring Topic for ``text``, or None.
+        """
+        matches = self.match(text)
+        return matches[0][0] if matches else None
+
+    def topics(self):
+        """
+        Returns the cached {slug: Topic} map of all topics, loading it with
+        one query the first time.
+        """
+        topics = self._topics
+        if topics is None:
+            with self._lock:
+                if self._topics is None:
+                    self._topics = {
+                        topic.slug: topic for topic in Topic.objects.all()
+                    }
+                topics = self._topics
+        return topics
+
+    def clear_topics(self):
+        """
+        Drops the Topic cache; it is reloaded on the next match.
+        """
+        self._topics = None
+
+
+_tagger = None
+
+
+def get_tagger():
+    """
+    Returns the process-wide KeywordTagger, building it on first use.
+    """
+    global _tagger
+    if _tagger is None:
+        _tagger = KeywordTagger()
+    return _tagger
@@ -1,54 +1,45 @@
 import requests
+from functools import partial
 from django.conf import settings
 from datetime import datetime, timezone
 
+from pipeline import paging
 
-def fetch_newsapi_cars_transport_news():
+
+def fetch_newsapi_cars_transport_news(watermark=None):
     """
     Fetches cars and transport news articles from NewsAPI.org API
     using the /v2/everything endpoint.
 
-    Returns:
-        list: A list of dictionaries containing article details.
+    Follows the ``page`` numbers up to the paging budget (see
+    pipeline.paging).
+
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; paging
+            stops at the first page with nothing new. Results are sorted by
+            relevancy, so only URLs seen before count as old.
+
+    Yields:
+        dict: Article details, one at a time.
     """
-    crumbs = []
     try:
         url = getattr(settings, 'NEWSAPI_CARS_TRANSPORT_URL', None)
         if not url:
             raise ValueError(
                 "NEWSAPI_CARS_TRANSPORT_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
         # NewsAPI.org returns results under the 'articles' key
-        for article in data.get("articles", []):
-            title = article.get("title")
-            url = article.get("url")
-            summary = article.get("description")
-            source_name = article.get("source", {}).get("name")
-            published_at_str = article.get("publishedAt")
-
-            if not title or not url:
-                continue
-
-            crumbs.append({
-                "title": title,
-                "summary": summary,
-                "url": url,
-                "source": source_name if source_name else
-                          "NewsAPI.org Cars & Transport",
-                "published_at": published_at_str,
-            })
-        return crumbs
+        yield from paging.iter_pages(
+            url, "articles", paging.newsapi_next,
+            partial(paging.newsapi_item,
+                    default_source="NewsAPI.org Cars & Transport"),
+            watermark=watermark,
+            by_time=False,
+        )
     except requests.exceptions.RequestException as req_err:
         print(f"NewsAPI.org Cars & Transport News fetch error: {req_err}")
-        return []
     except ValueError as val_err:
         print(f"Configuration error for NewsAPI.org Cars & Transport News: "
               f"{val_err}")
-        return []
     except Exception as e:
         print(f"NewsAPI.org Cars & Transport News unexpected error: {e}")
-        return []
\ No newline at end of file
@@ -1,27 +1,39 @@
 import requests
+from functools import partial
 from django.conf import settings
 
+from pipeline import paging
 
-def fetch_environment_news():
+
+def fetch_environment_news(watermark=None):
     """
     Fetches environment-related news articles from NewsData.io API.
+
+    Follows the ``nextPage`` tokens up to the paging budget (see
+    pipeline.paging).
+
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; paging
+            stops at the first page with nothing new.
+
+    Yields:
+        dict: Article details, one at a time.
     """
     try:
         url = getattr(settings, 'NEWSDATA_API_URL', None)
         if not url:
-            raise ValueError("NEWSDATA_API_URL is not set in Django settings.")
-
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+            raise ValueError(
+                "NEWSDATA_API_URL is not set in Django settings.")
 
-        return data.get("results", [])
+        yield from paging.iter_pages(
+            url, "results", paging.newsdata_next,
+            partial(paging.newsdata_item,
+                    default_source="NewsData.io"),
+            watermark=watermark,
+        )
     except requests.exceptions.RequestException as req_err:
-        print(f"NewsData.io API request error: {req_err}")
-        return []
+        print(f"NewsData.io fetch error: {req_err}")
     except ValueError as val_err:
-        print(f"Configuration error for NewsData.io fetch: {val_err}")
-        return []
+        print(f"Configuration error for NewsData.io: {val_err}")
     except Exception as e:
         print(f"NewsData.io unexpected error: {e}")
-        return []
\ No newline at end of file
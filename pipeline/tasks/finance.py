@@ -2,11 +2,17 @@ import requests
 from django.conf import settings
 from datetime import datetime, timezone
 
+from pipeline import http_client
 
-def fetch_finnhub_general_news():
+
+def fetch_finnhub_general_news(watermark=None):
     """
     Fetches general market news articles from Finnhub API.
 
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; only
+            newer items are requested when given.
+
     Returns:
         list: A list of dictionaries containing article details.
     """
@@ -15,7 +21,12 @@ def fetch_finnhub_general_news():
         if not url:
             raise ValueError("FINNHUB_API_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
+        # Finnhub only returns news newer than 'minId'
+        params = {}
+        if watermark is not None and watermark.last_item_id:
+            params["minId"] = watermark.last_item_id
+
+        response = http_client.get(url, params=params, timeout=15)
         response.raise_for_status()
         data = response.json()
 
@@ -38,6 +49,7 @@ def fetch_finnhub_general_news():
                 continue
 
             crumbs.append({
+                "id": article.get("id"),
                 "title": title,
                 "summary": summary,
                 "url": url,
@@ -1,7 +1,10 @@
 import requests
+from functools import partial
 from django.conf import settings
 from datetime import datetime, timezone
 
+from pipeline import http_client, paging
+
 
 def fetch_spoonacular_random_recipes(limit=5):
     """
@@ -25,7 +28,7 @@ def fetch_spoonacular_random_recipes(limit=5):
         # Spoonacular's random endpoint supports a 'number' parameter
         url = f"{settings.SPOONACULAR_API_URL}&number={limit}"
 
-        response = requests.get(url, timeout=15)
+        response = http_client.get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
 
@@ -66,50 +69,36 @@ def fetch_spoonacular_random_recipes(limit=5):
         return []
 
 
-def fetch_newsdata_food_drink_news():
+def fetch_newsdata_food_drink_news(watermark=None):
     """
     Fetches food and drink news articles from NewsData.io API.
 
-    Returns:
-        list: A list of dictionaries containing article details.
+    Follows the ``nextPage`` tokens up to the paging budget (see
+    pipeline.paging).
+
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; paging
+            stops at the first page with nothing new.
+
+    Yields:
+        dict: Article details, one at a time.
     """
-    crumbs = []
     try:
         url = getattr(settings, 'NEWSDATA_FOOD_DRINK_URL', None)
         if not url:
             raise ValueError(
                 "NEWSDATA_FOOD_DRINK_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
-        for article in data.get("results", []):
-            title = article.get("title")
-            url = article.get("link")
-            summary = article.get("description")
-            source = article.get("source_id")
-            published_at_str = article.get("pubDate")
-
-            if not title or not url:
-                continue
-
-            crumbs.append({
-                "title": title,
-                "summary": summary,
-                "url": url,
-                "source": source if source else "NewsData.io Food & Drink",
-                "published_at": published_at_str,
-            })
-        return crumbs
+        yield from paging.iter_pages(
+            url, "results", paging.newsdata_next,
+            partial(paging.newsdata_item,
+                    default_source="NewsData.io Food & Drink"),
+            watermark=watermark,
+        )
     except requests.exceptions.RequestException as req_err:
         print(f"NewsData.io Food & Drink News fetch error: {req_err}")
-        return []
     except ValueError as val_err:
-        print(
-            f"Configuration error for NewsData.io Food & Drink News: {val_err}"
-            )
-        return []
+        print(f"Configuration error for NewsData.io Food & Drink News: "
+              f"{val_err}")
     except Exception as e:
         print(f"NewsData.io Food & Drink News unexpected error: {e}")
-        return []
\ No newline at end of file
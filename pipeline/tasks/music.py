@@ -1,13 +1,66 @@
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from django.conf import settings
-from datetime import datetime, timezone
+from django.utils import timezone
+from datetime import timedelta
+
+from pipeline import http_client, paging
+from pipeline.models import ArtistBioCache
+
+
+def artist_key(artist):
+    """
+    Returns the ArtistBioCache key of a Last.fm chart artist: its
+    MusicBrainz id, or its name when Last.fm has none.
+    """
+    mbid = artist.get("mbid")
+    if mbid:
+        return mbid
+    return f"name:{artist.get('name', '').lower()}"[:255]
+
+
+def fetch_artist_bio(artist_name):
+    """
+    Returns the bio summary of one artist from Last.fm ``artist.getInfo``,
+    without the trailing "Read more" link.
+    """
+    artist_info_url = (
+        f"{settings.LASTFM_BASE_URL}?"
+        f"method=artist.getInfo&artist="
+        f"{requests.utils.quote(artist_name)}"
+        f"&api_key={settings.LASTFM_API_KEY}&format=json"
+    )
+    info_response = http_client.get(artist_info_url, timeout=10)
+    info_response.raise_for_status()
+    artist_detail_data = info_response.json()
+
+    bio_summary = (
+        artist_detail_data.get("artist", {}).get("bio", {}).get("summary")
+    )
+    if not bio_summary:
+        return ""
+    # Last.fm bios often have a trailing "Read more" link, remove it
+    return bio_summary.split('<a href="https://www.last.fm/music/')[0].strip()
+
+
+def _lookup_bio(artist):
+    try:
+        return fetch_artist_bio(artist["name"])
+    except requests.exceptions.RequestException as req_err:
+        print(f"Last.fm bio fetch error for {artist['name']}: {req_err}")
+        return None
 
 
 def fetch_lastfm_top_artists_bios(limit=10):
     """
     Fetches top artists from Last.fm and then retrieves their biographies.
 
+    Bios are kept in ArtistBioCache for LASTFM_BIO_TTL seconds, so only
+    artists new to the chart (or with an old entry) are looked up. Those
+    ``artist.getInfo`` calls run on LASTFM_WORKERS threads; http_client
+    keeps them within the 'lastfm' rate limit (see pipeline.quota).
+
     Args:
         limit (int): The maximum number of top artists to fetch.
 
@@ -15,7 +68,6 @@ def fetch_lastfm_top_artists_bios(limit=10):
         list: A list of dictionaries containing artist details
               (title, summary, url, source, published_at).
     """
-    crumbs = []
     try:
         if not settings.LASTFM_API_KEY:
             raise ValueError("LASTFM_API_KEY is not set in Django settings.")
@@ -28,48 +80,63 @@ def fetch_lastfm_top_artists_bios(limit=10):
             f"method=chart.gettopartists&api_key={settings.LASTFM_API_KEY}"
             f"&format=json&limit={limit}"
         )
-        response = requests.get(top_artists_url, timeout=10)
+        response = http_client.get(top_artists_url, timeout=10)
         response.raise_for_status()
         top_artists_data = response.json()
 
-        artists = top_artists_data.get("artists", {}).get("artist", [])
+        artists = [
+            artist for artist in
+            top_artists_data.get("artists", {}).get("artist", [])
+            if artist.get("name")
+        ]
+
+        # 2. Take the bios still fresh in the cache...
+        now = timezone.now()
+        ttl = getattr(settings, 'LASTFM_BIO_TTL', 7 * 24 * 3600)
+        cached = {
+            entry.key: entry.summary
+            for entry in ArtistBioCache.objects.filter(
+                key__in=[artist_key(artist) for artist in artists],
+                fetched_at__gte=now - timedelta(seconds=ttl),
+            )
+        }
+
+        # 3. ...and look up the rest concurrently.
+        missing = {
+            artist_key(artist): artist for artist in artists
+            if artist_key(artist) not in cached
+        }
+        if missing:
+            workers = getattr(settings, 'LASTFM_WORKERS', 5)
+            with ThreadPoolExecutor(
+                    max_workers=max(1, min(workers, len(missing))),
+                    thread_name_prefix="lastfm") as pool:
+                looked_up = dict(zip(
+                    missing, pool.map(_lookup_bio, missing.values())))
+            fresh = [
+                ArtistBioCache(
+                    key=key, name=missing[key]["name"][:255], summary=bio,
+                    url=missing[key].get("url") or "", fetched_at=now)
+                for key, bio in looked_up.items() if bio is not None
+            ]
+            ArtistBioCache.objects.bulk_create(
+                fresh, update_conflicts=True, unique_fields=['key'],
+                update_fields=['name', 'summary', 'url', 'fetched_at'],
+            )
+            cached.update((entry.key, entry.summary) for entry in fresh)
 
-        # 2. For each artist, get their detailed info (including bio)
+        crumbs = []
         for artist in artists:
-            artist_name = artist.get("name")
-            artist_url = artist.get("url")
-
-            if not artist_name:
+            bio_summary = cached.get(artist_key(artist))
+            if bio_summary is None:
                 continue
-
-            # Add a small delay to respect Last.fm rate limits (5 requests/second)
-            time.sleep(0.2)
-
-            artist_info_url = (
-                f"{settings.LASTFM_BASE_URL}?"
-                f"method=artist.getInfo&artist="
-                f"{requests.utils.quote(artist_name)}"
-                f"&api_key={settings.LASTFM_API_KEY}&format=json"
-            )
-            info_response = requests.get(artist_info_url, timeout=10)
-            info_response.raise_for_status()
-            artist_detail_data = info_response.json()
-
-            bio_summary = ""
-            if artist_detail_data.get("artist", {}).get("bio", {}).get("summary"):
-                # Last.fm bios often have a trailing "Read more" link, remove it
-                bio_summary = artist_detail_data["artist"]["bio"]["summary"].split(
-                    '<a href="https://www.last.fm/music/')[0].strip()
-
-            # Last.fm doesn't provide a direct published_at for artist bios.
-            published_at = None
-
             crumbs.append({
-                "title": f"Artist Profile: {artist_name}",
+                "title": f"Artist Profile: {artist['name']}",
                 "summary": bio_summary,
-                "url": artist_url,
+                "url": artist.get("url"),
                 "source": "Last.fm",
-                "published_at": published_at,
+                # Last.fm doesn't provide a published_at for artist bios.
+                "published_at": None,
             })
         return crumbs
     except requests.exceptions.RequestException as req_err:
@@ -83,48 +150,35 @@ def fetch_lastfm_top_artists_bios(limit=10):
         return []
 
 
-def fetch_newsdata_music_news():
+def fetch_newsdata_music_news(watermark=None):
     """
     Fetches music-related news articles from NewsData.io API.
 
-    Returns:
-        list: A list of dictionaries containing article details.
+    Follows the ``nextPage`` tokens up to the paging budget (see
+    pipeline.paging).
+
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; paging
+            stops at the first page with nothing new.
+
+    Yields:
+        dict: Article details, one at a time.
     """
-    crumbs = []
     try:
         url = getattr(settings, 'NEWSDATA_MUSIC_NEWS_URL', None)
         if not url:
             raise ValueError(
                 "NEWSDATA_MUSIC_NEWS_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
-        for article in data.get("results", []):
-            title = article.get("title")
-            url = article.get("link")
-            summary = article.get("description")
-            source = article.get("source_id")
-            published_at_str = article.get("pubDate")
-
-            if not title or not url:
-                continue
-
-            crumbs.append({
-                "title": title,
-                "summary": summary,
-                "url": url,
-                "source": source if source else "NewsData.io Music",
-                "published_at": published_at_str,
-            })
-        return crumbs
+        yield from paging.iter_pages(
+            url, "results", paging.newsdata_next,
+            partial(paging.newsdata_item,
+                    default_source="NewsData.io Music"),
+            watermark=watermark,
+        )
     except requests.exceptions.RequestException as req_err:
         print(f"NewsData.io Music News fetch error: {req_err}")
-        return []
     except ValueError as val_err:
         print(f"Configuration error for NewsData.io Music News: {val_err}")
-        return []
     except Exception as e:
         print(f"NewsData.io Music News unexpected error: {e}")
-        return []
\ No newline at end of file
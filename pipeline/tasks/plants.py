@@ -2,6 +2,8 @@ import requests
 from django.conf import settings
 from datetime import datetime, timezone
 
+from pipeline import http_client
+
 
 def fetch_perenual_guides():
     """
@@ -14,7 +16,7 @@ def fetch_perenual_guides():
             settings, 'PERENUAL_GUIDE_BASE_URL', 'https://perenual.com/guide/'
             )
 
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -54,7 +56,7 @@ def fetch_trefle_plants():
     """
     try:
         url = settings.TREFLE_API_URL
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -92,7 +94,7 @@ def fetch_permapeople_plants():
             "x-permapeople-key-secret": settings.PERMAPEOPLE_KEY_SECRET,
         }
         url = settings.PERMAPEOPLE_API_URL
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -1,12 +1,19 @@
 import requests
+from functools import partial
 from django.conf import settings
 from datetime import datetime, timezone # Ensure timezone is imported
 
+from pipeline import http_client, paging, watermarks
 
-def fetch_thenewsapi_sports():
+
+def fetch_thenewsapi_sports(watermark=None):
     """
     Fetches general sports news articles from TheNewsAPI.
 
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; only
+            newer items are requested when given.
+
     Returns:
         list: A list of dictionaries containing article details.
     """
@@ -16,7 +23,12 @@ def fetch_thenewsapi_sports():
             raise ValueError(
                 "THENEWSAPI_SPORTS_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
+        params = {}
+        start = watermarks.since(watermark)
+        if start:
+            params["published_after"] = start.strftime("%Y-%m-%dT%H:%M:%S")
+
+        response = http_client.get(url, params=params, timeout=15)
         response.raise_for_status()
         data = response.json()
 
@@ -50,13 +62,20 @@ def fetch_thenewsapi_sports():
         return []
 
 
-def fetch_newsdata_fitness():
+def fetch_newsdata_fitness(watermark=None):
     """
     Fetches fitness-related news articles from NewsData.io API
     using a broader set of keywords and categories.
 
-    Returns:
-        list: A list of dictionaries containing article details.
+    Follows the ``nextPage`` tokens up to the paging budget (see
+    pipeline.paging).
+
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; paging
+            stops at the first page with nothing new.
+
+    Yields:
+        dict: Article details, one at a time.
     """
     try:
         url = getattr(settings, 'NEWSDATA_FITNESS_URL', None)
@@ -64,35 +83,15 @@ def fetch_newsdata_fitness():
             raise ValueError(
                 "NEWSDATA_FITNESS_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
-        crumbs = []
-        for article in data.get("results", []):
-            title = article.get("title")
-            url = article.get("link") # NewsData.io uses 'link' for URL
-            summary = article.get("description")
-            source = article.get("source_id") # NewsData.io uses 'source_id'
-            published_at_str = article.get("pubDate") # NewsData.io uses 'pubDate'
-
-            if not title or not url:
-                continue
-
-            crumbs.append({
-                "title": title,
-                "summary": summary,
-                "url": url,
-                "source": source if source else "NewsData.io Fitness",
-                "published_at": published_at_str,
-            })
-        return crumbs
+        yield from paging.iter_pages(
+            url, "results", paging.newsdata_next,
+            partial(paging.newsdata_item,
+                    default_source="NewsData.io Fitness"),
+            watermark=watermark,
+        )
     except requests.exceptions.RequestException as req_err:
         print(f"NewsData.io Fitness fetch error: {req_err}")
-        return []
     except ValueError as val_err:
         print(f"Configuration error for NewsData.io Fitness: {val_err}")
-        return []
     except Exception as e:
         print(f"NewsData.io Fitness unexpected error: {e}")
-        return []
\ No newline at end of file
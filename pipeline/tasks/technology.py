@@ -2,12 +2,18 @@ import requests
 from django.conf import settings
 from datetime import datetime, timezone
 
+from pipeline import http_client, watermarks
 
-def fetch_mediastack_technology_news():
+
+def fetch_mediastack_technology_news(watermark=None):
     """
     Fetches technology news articles from Mediastack API,
     filtered to English language.
 
+    Args:
+        watermark (SourceWatermark): Where the last run stopped; only
+            newer items are requested when given.
+
     Returns:
         list: A list of dictionaries containing article details.
     """
@@ -18,7 +24,14 @@ def fetch_mediastack_technology_news():
             raise ValueError(
                 "MEDIASTACK_TECHNOLOGY_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
+        # Mediastack filters by day, as a 'from,to' date range
+        params = {}
+        start = watermarks.since(watermark)
+        if start:
+            params["date"] = (f"{start:%Y-%m-%d},"
+                              f"{datetime.now(timezone.utc):%Y-%m-%d}")
+
+        response = http_client.get(url, params=params, timeout=15)
         response.raise_for_status()
         data = response.json()
 
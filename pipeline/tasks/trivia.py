@@ -1,8 +1,11 @@
 import requests
 import html
+from urllib.parse import urlencode
 from django.conf import settings
 from datetime import datetime, timezone
 
+from pipeline import http_client
+
 
 def fetch_useless_facts():
     """
@@ -18,13 +21,15 @@ def fetch_useless_facts():
             raise ValueError(
                 "USELESS_FACTS_API_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
         fact_text = data.get("text")
         fact_source = data.get("source")
-        fact_source_url = data.get("source_url")
+        # The permalink is unique per fact, unlike source_url which is
+        # shared by every fact from the same site.
+        fact_source_url = data.get("permalink") or data.get("source_url")
 
         if fact_text:
             crumbs.append({
@@ -60,7 +65,7 @@ def fetch_chuck_norris_jokes():
             raise ValueError(
                 "CHUCKNORRIS_API_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -105,7 +110,7 @@ def fetch_open_trivia(amount=5):
             raise ValueError(
                 "OPEN_TRIVIA_API_URL is not set in Django settings.")
 
-        response = requests.get(url, timeout=15)
+        response = http_client.get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
 
@@ -126,10 +131,17 @@ def fetch_open_trivia(amount=5):
             title = f"{category} ({difficulty.capitalize()}) Trivia"
             summary = f"Question: {question}\nAnswer: {correct_answer}"
             
+            # Link to the question's own search result so each crumb has a
+            # distinct URL for deduplication.
+            question_url = (
+                "https://opentdb.com/browse.php?"
+                f"{urlencode({'query': question, 'type': 'Question'})}"
+            )
+
             crumbs.append({
                 "title": title[:255],
                 "summary": summary,
-                "url": "https://opentdb.com/",  # Generic link to the source
+                "url": question_url,
                 "source": "Open Trivia DB",
                 "published_at": None,
             })
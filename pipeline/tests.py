@@ -1,3 +1,1616 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+import time
+import zlib
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+import requests
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from crumbs.models import Crumb
+from crumbs.utils import hash_url
+from preferences.models import Topic
+
+from . import http_client, summary_cache
+from . import dedup, paging, providers, quota, watermarks
+from .classifier import TopicClassifier
+from .executor import SourceTimeout, stream_fetchers
+from .extractive import summarize_extractive
+from .handlers import environment_handler, news_handler
+from .ingest import ingest_crumbs
+from .models import (
+    ArtistBioCache, CrumbBand, CrumbSignature, ProviderQuota,
+    SourceWatermark, SummaryCache,
+)
+from .sources import SOURCES, Source, select_sources
+from .tagging import KeywordTagger, get_tagger
+from .summarization import Deadline, backoff_delay, run_batches
+from .tasks import fashion, music, news
+from .utils import (
+    HUGGINGFACE_MODEL_ID, clean_text, split_sentences, summarize_text,
+    summarize_texts,
+)
+
+
+class HttpClientTest(SimpleTestCase):
+    """
+    Tests for the pooled pipeline HTTP client.
+    """
+
+    def tearDown(self):
+        http_client.close_all()
+
+    def test_session_is_reused_per_host(self):
+        """
+        Requests to the same host share one session; other hosts get their own.
+        """
+        first = http_client.get_session("https://newsdata.io/api/1/news?q=a")
+        second = http_client.get_session("https://NewsData.io/api/1/latest")
+        other = http_client.get_session("https://newsapi.org/v2/everything")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+    @override_settings(PIPELINE_HTTP_POOL_MAXSIZE=3)
+    def test_session_uses_configured_pool_size(self):
+        """
+        The mounted adapter should use the configured pool size.
+        """
+        session = http_client.get_session("https://example.com/")
+        adapter = session.get_adapter("https://example.com/")
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    @override_settings(PIPELINE_HTTP_TIMEOUT=7)
+    def test_default_timeout_applied(self):
+        """
+        Calls without an explicit timeout get the configured default.
+        """
+        session = http_client.get_session("https://example.com/")
+        with mock.patch.object(session, "request") as request:
+            http_client.get("https://example.com/a")
+            http_client.get("https://example.com/b", timeout=2)
+
+        self.assertEqual(request.call_args_list[0].kwargs["timeout"], 7)
+        self.assertEqual(request.call_args_list[1].kwargs["timeout"], 2)
+
+
+class SourceRegistryTest(TestCase):
+    """
+    Tests for the declarative source registry and its CLI selection.
+    """
+
+    def test_source_names_are_unique(self):
+        """
+        Every registered source needs a distinct CLI name.
+        """
+        names = [source.name for source in SOURCES]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_select_by_name_topic_and_exclude(self):
+        """
+        Sources can be picked by name or topic and removed with exclude.
+        """
+        by_name = select_sources(names=["finnhub", "trefle"])
+        self.assertEqual({s.name for s in by_name}, {"finnhub", "trefle"})
+
+        by_topic = select_sources(topics=["plants-and-gardening"],
+                                  exclude=["trefle"])
+        self.assertEqual({s.name for s in by_topic},
+                         {"perenual", "permapeople"})
+
+    def test_select_orders_by_priority(self):
+        """
+        Higher priority sources come first.
+        """
+        priorities = [source.priority for source in select_sources()]
+        self.assertEqual(priorities, sorted(priorities, reverse=True))
+
+    def test_unknown_source_rejected(self):
+        """
+        An unknown source name raises ValueError (CommandError on the CLI).
+        """
+        with self.assertRaises(ValueError):
+            select_sources(names=["no-such-source"])
+        with self.assertRaises(CommandError):
+            call_command("fetch_crumbs", source=["no-such-source"],
+                         stdout=StringIO())
+
+    def test_command_runs_only_selected_sources(self):
+        """
+        fetch_crumbs should fetch and handle only the requested sources.
+        """
+        handled = []
+        items = [{"title": "a", "url": "https://example.com/a"},
+                 {"title": "b", "url": "https://example.com/b"}]
+        fake = Source(
+            name="fake", label="Fake", fetcher=lambda: items,
+            handler=lambda items: handled.append(items) or len(items),
+            topic="world-news", kind="fake",
+        )
+        other = Source(
+            name="other", label="Other", fetcher=mock.Mock(),
+            handler=mock.Mock(), topic="music", kind="other",
+        )
+        out = StringIO()
+        with mock.patch("pipeline.sources.SOURCES", [fake, other]), \
+                mock.patch.dict("pipeline.sources.SOURCES_BY_NAME",
+                                {"fake": fake, "other": other}, clear=True):
+            call_command("fetch_crumbs", source=["fake"], stdout=out)
+
+        self.assertEqual(handled, [items])
+        other.fetcher.assert_not_called()
+        self.assertIn("2 fake crumbs saved from Fake.", out.getvalue())
+
+
+@override_settings(PIPELINE_DEFER_SUMMARIES=False,
+                   TOPIC_CLASSIFIER_PATH=None)
+@mock.patch("pipeline.ingest.summarize_texts",
+            lambda texts, engine=None: [f"summary: {text}" if text else ""
+                                        for text in texts])
+class IngestCrumbsTest(TestCase):
+    """
+    Tests for the shared batched ingest engine.
+    """
+
+    def setUp(self):
+        self.topic = Topic.objects.create(name="world news", slug="world-news")
+        Topic.objects.create(name="music", slug="music")
+
+    def _items(self, count, prefix="Story"):
+        return [
+            {
+                "title": f"{prefix} {i}",
+                "summary": f"Details about {prefix.lower()} {i}.",
+                "url": f"https://example.com/{prefix.lower()}/{i}",
+                "source": "Example",
+                "published_at": "2025-01-0{}T10:00:00Z".format(i % 9 + 1),
+            }
+            for i in range(count)
+        ]
+
+    def _ingest(self, items):
+        return ingest_crumbs(items, topic_slug="world-news",
+                             topic_name="world news",
+                             default_source="Unknown", kind="world news")
+
+    def test_creates_crumbs_and_skips_existing(self):
+        """
+        Items already stored, repeated in the batch or missing a URL are
+        not inserted.
+        """
+        items = self._items(3)
+        Crumb.objects.create(
+            title=items[0]["title"], summary="old", url=items[0]["url"],
+            source="Example", topic=self.topic, published_at=timezone.now()
+        )
+        batch = items + [items[1], {"title": "No URL"}]
+
+        self.assertEqual(self._ingest(batch), 2)
+        self.assertEqual(Crumb.objects.count(), 3)
+        crumb = Crumb.objects.get(title="Story 2")
+        self.assertEqual(crumb.topic, self.topic)
+        self.assertEqual(crumb.summary, "summary: Details about story 2.")
+        self.assertTrue(timezone.is_aware(crumb.published_at))
+
+    def test_rows_stored_by_a_concurrent_run_are_not_counted(self):
+        """
+        A crumb another run inserts while this batch is being prepared is
+        left out of the created count and is not tagged again.
+        """
+        items = self._items(2)
+
+        def concurrent_insert(texts):
+            Crumb.objects.create(
+                title="Theirs", summary="", url=items[0]["url"],
+                source="Other", topic=self.topic,
+                published_at=timezone.now())
+            return [None for _ in texts]
+
+        with mock.patch("pipeline.ingest.classify_texts",
+                        side_effect=concurrent_insert), \
+                mock.patch("pipeline.ingest.timeline.push") as push:
+            self.assertEqual(self._ingest(items), 1)
+
+        self.assertEqual(Crumb.objects.count(), 2)
+        self.assertEqual(Crumb.objects.get(url=items[0]["url"]).title,
+                         "Theirs")
+        self.assertEqual([crumb.url for crumb in push.call_args.args[0]],
+                         [items[1]["url"]])
+
+    def test_tracking_params_and_trailing_slash_are_duplicates(self):
+        """
+        URLs differing only by utm_* params, fragment, host case or a
+        trailing slash map to the same crumb.
+        """
+        items = [{"title": "Story", "url": "https://example.com/a"}]
+        self.assertEqual(self._ingest(items), 1)
+
+        variants = [
+            {"title": "Story (updated)",
+             "url": "https://Example.com/a/?utm_source=feed#top"},
+            {"title": "Story", "url": "https://example.com/a/"},
+        ]
+        self.assertEqual(self._ingest(variants), 0)
+        self.assertEqual(Crumb.objects.count(), 1)
+
+    def test_applies_content_tags(self):
+        """
+        Crumbs whose text matches another topic are tagged with it.
+        """
+        items = [{
+            "title": "New album from a favourite artist",
+            "summary": "The band released a new song.",
+            "url": "https://example.com/album",
+        }]
+        self._ingest(items)
+        crumb = Crumb.objects.get()
+        self.assertEqual(list(crumb.tags.names()), ["music"])
+        self.assertEqual(crumb.source, "Unknown")
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        """
+        Ingesting a large batch should take as many queries as a small one.
+        """
+        with CaptureQueriesContext(connection) as small:
+            self._ingest(self._items(2, prefix="Small"))
+        with CaptureQueriesContext(connection) as large:
+            self._ingest(self._items(40, prefix="Large"))
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Crumb.objects.count(), 42)
+
+    def test_environment_handler_maps_newsdata_fields(self):
+        """
+        The environment handler accepts raw NewsData.io articles.
+        """
+        created = environment_handler.handle_environment_articles([{
+            "title": "Climate report",
+            "description": "Emissions fell.",
+            "link": "https://example.com/climate",
+            "source_id": "bbc",
+            "pubDate": "2025-01-01 08:00:00",
+        }])
+        self.assertEqual(created, 1)
+        crumb = Crumb.objects.get(url="https://example.com/climate")
+        self.assertEqual(crumb.source, "bbc")
+        self.assertEqual(crumb.topic.slug, "environment")
+
+
+@override_settings(HF_API_TOKEN="test-token", SUMMARIZER_FALLBACK="")
+class SummaryCacheTest(TestCase):
+    """
+    Tests for the content-hash cache in front of the summarization API.
+    """
+
+    def setUp(self):
+        summary_cache.clear_memory()
+        summary_cache.reset_stats()
+
+    def _response(self, summary):
+        response = mock.Mock()
+        response.json.return_value = [{"summary_text": summary}]
+        return response
+
+    def test_repeated_text_is_summarized_once(self):
+        """
+        The second call for the same text is served from the cache.
+        """
+        with mock.patch("pipeline.utils.http_client.post",
+                        return_value=self._response("Short.")) as post:
+            self.assertEqual(summarize_text("A long story."), "Short.")
+            self.assertEqual(summarize_text("A long story."), "Short.")
+
+        post.assert_called_once()
+        self.assertEqual(SummaryCache.objects.count(), 1)
+        self.assertEqual(summary_cache.stats["memory_hits"], 1)
+
+    def test_database_hit_after_memory_is_cleared(self):
+        """
+        Summaries survive the process: a cold LRU falls back to the table.
+        """
+        summary_cache.put("Some text.", HUGGINGFACE_MODEL_ID, "Text.")
+        summary_cache.clear_memory()
+
+        with mock.patch("pipeline.utils.http_client.post") as post:
+            self.assertEqual(summarize_text("Some text."), "Text.")
+
+        post.assert_not_called()
+        self.assertEqual(summary_cache.stats["db_hits"], 1)
+        self.assertEqual(SummaryCache.objects.get().hits, 1)
+
+    def test_failed_summaries_are_not_cached(self):
+        with mock.patch("pipeline.utils.http_client.post",
+                        return_value=self._response("")):
+            self.assertEqual(summarize_text("Nothing useful."), "")
+        self.assertFalse(SummaryCache.objects.exists())
+
+    def test_key_depends_on_model(self):
+        self.assertNotEqual(summary_cache.make_key("text", "model-a"),
+                            summary_cache.make_key("text", "model-b"))
+
+    def test_prune_by_age_and_size(self):
+        """
+        Old entries are evicted first, then the least recently used ones
+        beyond the size limit.
+        """
+        for i in range(4):
+            summary_cache.put(f"text {i}", "model", f"summary {i}")
+        now = timezone.now()
+        for i, row in enumerate(SummaryCache.objects.order_by("pk")):
+            SummaryCache.objects.filter(pk=row.pk).update(
+                last_used_at=now - timezone.timedelta(days=10 - i))
+
+        self.assertEqual(summary_cache.prune(max_age_days=9.5,
+                                             max_entries=10), 1)
+        self.assertEqual(summary_cache.prune(max_age_days=30,
+                                             max_entries=2), 1)
+        self.assertEqual(
+            sorted(SummaryCache.objects.values_list("summary", flat=True)),
+            ["summary 2", "summary 3"],
+        )
+
+
+@override_settings(HF_API_TOKEN="test-token", HF_BATCH_SIZE=2,
+                   SUMMARIZER_FALLBACK="")
+class SummarizeTextsTest(TestCase):
+    """
+    Tests for batched multi-input summarization.
+    """
+
+    def setUp(self):
+        summary_cache.clear_memory()
+
+    def _echo(self, url, json=None, **kwargs):
+        response = mock.Mock()
+        response.json.return_value = [
+            {"summary_text": f"short {text}"} for text in json["inputs"]
+        ]
+        return response
+
+    def test_unknown_engine_is_rejected(self):
+        """
+        A misspelled engine raises instead of calling the remote model.
+        """
+        with mock.patch("pipeline.utils.http_client.post") as post, \
+                self.settings(SUMMARIZER_ENGINE="extractve"):
+            with self.assertRaises(ImproperlyConfigured):
+                summarize_texts(["a"])
+        with self.assertRaises(ImproperlyConfigured):
+            summarize_texts(["a"], engine="bart")
+        post.assert_not_called()
+
+    def test_batches_and_keeps_order(self):
+        """
+        Texts are chunked by HF_BATCH_SIZE and mapped back in input order,
+        with empty and repeated texts not sent.
+        """
+        texts = ["a", "", "b", "c", "a", "d", "e"]
+        with mock.patch("pipeline.utils.http_client.post",
+                        side_effect=self._echo) as post:
+            summaries = summarize_texts(texts)
+
+        self.assertEqual(summaries, ["short a", "", "short b", "short c",
+                                     "short a", "short d", "short e"])
+        self.assertEqual(
+            [call.kwargs["json"]["inputs"] for call in post.call_args_list],
+            [["a", "b"], ["c", "d"], ["e"]],
+        )
+
+    def test_failed_batch_is_retried_per_item(self):
+        """
+        When a batch request fails, only the bad input ends up empty.
+        """
+        def post(url, json=None, **kwargs):
+            if "bad" in json["inputs"]:
+                raise requests.exceptions.HTTPError("400 Bad Request")
+            return self._echo(url, json=json)
+
+        with mock.patch("pipeline.utils.http_client.post", side_effect=post):
+            summaries = summarize_texts(["good", "bad", "fine"])
+
+        self.assertEqual(summaries, ["short good", "", "short fine"])
+        self.assertEqual(SummaryCache.objects.count(), 2)
+
+    def test_cached_texts_are_not_sent(self):
+        summary_cache.put("known", HUGGINGFACE_MODEL_ID, "cached")
+        with mock.patch("pipeline.utils.http_client.post",
+                        side_effect=self._echo) as post:
+            summaries = summarize_texts(["known", "new"])
+
+        self.assertEqual(summaries, ["cached", "short new"])
+        self.assertEqual(post.call_args.kwargs["json"]["inputs"], ["new"])
+
+
+@override_settings(HF_API_TOKEN="test-token", HF_BACKOFF_BASE=1,
+                   HF_BACKOFF_MAX=30, HF_MAX_RETRIES=3,
+                   SUMMARIZER_FALLBACK="")
+class SummarizationExecutorTest(TestCase):
+    """
+    Tests for bounded-concurrency summarization with backoff.
+    """
+
+    def setUp(self):
+        summary_cache.clear_memory()
+
+    def _loading(self, estimated_time):
+        response = mock.Mock(status_code=503)
+        response.json.return_value = {"error": "loading",
+                                      "estimated_time": estimated_time}
+        return response
+
+    def _ok(self, summary):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = [{"summary_text": summary}]
+        return response
+
+    def test_backoff_delay(self):
+        self.assertEqual(backoff_delay(0), 1)
+        self.assertEqual(backoff_delay(3), 8)
+        self.assertEqual(backoff_delay(0, estimated_time=12.5), 12.5)
+        self.assertEqual(backoff_delay(10), 30)
+
+    def test_retries_while_model_is_loading(self):
+        """
+        A 503 is retried after the model's estimated load time.
+        """
+        responses = [self._loading(20), self._ok("Done.")]
+        with mock.patch("pipeline.utils.http_client.post",
+                        side_effect=responses) as post, \
+                mock.patch("pipeline.summarization.time.sleep") as sleep:
+            self.assertEqual(summarize_text("Long text."), "Done.")
+
+        self.assertEqual(post.call_count, 2)
+        sleep.assert_called_once_with(20)
+
+    def test_gives_up_when_deadline_would_pass(self):
+        """
+        Backoff never sleeps past the deadline, and a loading model does
+        not trigger per-item retries.
+        """
+        with mock.patch("pipeline.utils.http_client.post",
+                        return_value=self._loading(60)) as post, \
+                mock.patch("pipeline.summarization.time.sleep") as sleep, \
+                mock.patch("pipeline.summarization.run_deadline",
+                           return_value=Deadline(10)):
+            self.assertEqual(summarize_texts(["one", "two"]), ["", ""])
+
+        post.assert_called_once()
+        sleep.assert_not_called()
+
+    def test_batches_run_concurrently_up_to_limit(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def request(batch, deadline):
+            with lock:
+                running.append(batch)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(batch)
+            return batch
+
+        batches = [[i] for i in range(6)]
+        self.assertEqual(run_batches(request, batches, concurrency=3),
+                         batches)
+        self.assertEqual(max(peak), 3)
+
+    def test_unfinished_batches_are_dropped_at_deadline(self):
+        def request(batch, deadline):
+            time.sleep(batch[0])
+            return batch
+
+        started = time.monotonic()
+        results = run_batches(request, [[0], [0.5]], concurrency=2,
+                              deadline=Deadline(0.1))
+        self.assertEqual(results, [[0], None])
+        self.assertLess(time.monotonic() - started, 0.4)
+
+
+class ExtractiveSummarizerTest(SimpleTestCase):
+    """
+    Tests for the local TextRank summarizer.
+    """
+
+    ARTICLE = (
+        "The city council approved a new budget for public transport. "
+        "The budget adds buses to the busiest transport routes. "
+        "Council members said transport demand had grown every year. "
+        "A local bakery won a prize for its bread. "
+        "The new buses will run on the busiest routes from next spring"
+    )
+
+    def test_split_sentences_matches_clean_text(self):
+        text = "One. Two. One. Three"
+        self.assertEqual(split_sentences(text), ["One", "Two", "One", "Three"])
+        self.assertEqual(clean_text(text), "One. Two. Three")
+
+    def test_keeps_central_sentences_in_order(self):
+        summary = summarize_extractive(self.ARTICLE, max_sentences=2)
+        self.assertNotIn("bakery", summary)
+        sentences = split_sentences(summary)
+        self.assertEqual(len(sentences), 2)
+        positions = [self.ARTICLE.index(sentence.rstrip("."))
+                     for sentence in sentences]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_short_and_empty_text(self):
+        self.assertEqual(summarize_extractive("Just one fact"),
+                         "Just one fact.")
+        self.assertEqual(summarize_extractive(""), "")
+
+    def test_summarizes_hundreds_of_articles_per_second(self):
+        started = time.monotonic()
+        for _ in range(300):
+            summarize_extractive(self.ARTICLE * 3)
+        self.assertLess(time.monotonic() - started, 3)
+
+    @override_settings(SUMMARIZER_ENGINE="extractive")
+    def test_engine_setting_skips_the_network(self):
+        with mock.patch("pipeline.utils.http_client.post") as post:
+            summary = summarize_text(self.ARTICLE)
+        post.assert_not_called()
+        self.assertTrue(summary)
+
+    @override_settings(HF_API_TOKEN=None, SUMMARIZER_FALLBACK="extractive")
+    def test_fallback_when_remote_fails(self):
+        with mock.patch("pipeline.utils._summarize_remote",
+                        return_value=["", "remote"]):
+            summaries = summarize_texts(["Short fact", "Other"])
+        self.assertEqual(summaries, ["Short fact.", "remote"])
+
+
+@override_settings(PIPELINE_DEFER_SUMMARIES=True,
+                   SUMMARIZER_ENGINE="huggingface")
+class DeferredSummaryTest(TestCase):
+    """
+    Tests for saving crumbs first and summarizing them afterwards.
+    """
+
+    def setUp(self):
+        Topic.objects.create(name="world news", slug="world-news")
+
+    def _ingest(self, count, summarizer=None):
+        items = [
+            {
+                "title": f"Story {i}",
+                "summary": f"Details about story {i}." if i else "",
+                "url": f"https://example.com/story/{i}",
+                "published_at": f"2025-01-0{i + 1}T10:00:00Z",
+            }
+            for i in range(count)
+        ]
+        return ingest_crumbs(items, topic_slug="world-news",
+                             topic_name="world news",
+                             default_source="Unknown", kind="world news",
+                             summarizer=summarizer)
+
+    def test_crumbs_are_saved_without_summarizing(self):
+        with mock.patch("pipeline.ingest.summarize_texts") as summarize:
+            self.assertEqual(self._ingest(3), 3)
+
+        summarize.assert_not_called()
+        crumb = Crumb.objects.get(title="Story 1")
+        self.assertEqual(crumb.summary_status, Crumb.SUMMARY_PENDING)
+        self.assertEqual(crumb.content, "Details about story 1.")
+        self.assertEqual(crumb.display_summary, "Details about story 1.")
+        # Nothing to summarize without content.
+        self.assertEqual(Crumb.objects.get(title="Story 0").summary_status,
+                         Crumb.SUMMARY_DONE)
+
+    def test_local_engine_still_runs_inline(self):
+        self._ingest(2, summarizer="extractive")
+        crumb = Crumb.objects.get(title="Story 1")
+        self.assertEqual(crumb.summary_status, Crumb.SUMMARY_DONE)
+        self.assertEqual(crumb.summary, "Details about story 1.")
+
+    def test_summarize_crumbs_drains_pending_newest_first(self):
+        self._ingest(4)
+        out = StringIO()
+        with mock.patch(
+                "pipeline.management.commands.summarize_crumbs."
+                "summarize_texts",
+                side_effect=lambda texts, concurrency: [
+                    "" if "2" in text else f"Short: {text}"
+                    for text in texts
+                ]) as summarize:
+            call_command("summarize_crumbs", batch_size=2, limit=2,
+                         stdout=out)
+            self.assertEqual(
+                summarize.call_args.args[0],
+                ["Details about story 3.", "Details about story 2."])
+
+            call_command("summarize_crumbs", stdout=out)
+
+        statuses = dict(Crumb.objects.values_list("title", "summary_status"))
+        self.assertEqual(statuses, {
+            "Story 0": Crumb.SUMMARY_DONE,
+            "Story 1": Crumb.SUMMARY_DONE,
+            "Story 2": Crumb.SUMMARY_FAILED,
+            "Story 3": Crumb.SUMMARY_DONE,
+        })
+        self.assertEqual(Crumb.objects.get(title="Story 1").summary,
+                         "Short: Details about story 1.")
+        self.assertIn("1 summaries saved, 0 failed", out.getvalue())
+
+
+class KeywordTaggerTest(TestCase):
+    """
+    Tests for the compiled keyword tagger.
+    """
+
+    def setUp(self):
+        self.music = Topic.objects.create(name="music", slug="music")
+        self.cars = Topic.objects.create(name="cars", slug="cars-transport")
+        self.tagger = KeywordTagger()
+
+    def test_matches_whole_words_only(self):
+        self.assertEqual(self.tagger.scores("A scar and a racetrack"), {})
+        self.assertEqual(self.tagger.scores("A Car on the road"),
+                         {"cars-transport": 2})
+
+    def test_matches_simple_plurals(self):
+        self.assertEqual(self.tagger.scores("Cars and buses on the roads"),
+                         {"cars-transport": 2})
+        self.assertEqual(self.tagger.scores("New songs and recipes"),
+                         {"music": 1, "food-and-drink": 1})
+        # "es" is only added after sibilants, so "car" is not in "cares".
+        self.assertEqual(self.tagger.scores("Nobody cares"), {})
+
+    def test_returns_every_topic_with_score(self):
+        matches = self.tagger.match(
+            "The artist drove her car to record a new album")
+        self.assertEqual(matches, [(self.music, 2), (self.cars, 1)])
+
+    def test_multi_word_keywords(self):
+        self.assertEqual(self.tagger.scores("Haute couture week"),
+                         {"fashion": 1})
+
+    def test_topics_are_cached(self):
+        self.tagger.match("song")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.tagger.best("album and engine and song"),
+                             self.music)
+        # Topics without a row are skipped.
+        self.assertEqual(self.tagger.match("a recipe"), [])
+
+    def test_topic_changes_clear_the_cache(self):
+        get_tagger().match("song")
+        food = Topic.objects.create(name="food", slug="food-and-drink")
+        self.assertEqual(get_tagger().best("a recipe"), food)
+
+
+class TopicClassifierTest(TestCase):
+    """
+    Tests for the TF-IDF topic classifier and its training command.
+    """
+
+    TRAINING = [
+        ("Stocks rally as markets price in rate cuts", "finance"),
+        ("Bond yields and stocks fall after inflation data", "finance"),
+        ("Investors move from stocks to bonds", "finance"),
+        ("Striker scores twice as the league leaders win", "sports"),
+        ("Coach praises striker after cup win", "sports"),
+        ("League title race tightens after derby win", "sports"),
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "model.npz")
+
+    def _fit(self):
+        texts, slugs = zip(*self.TRAINING)
+        return TopicClassifier.fit(list(texts), list(slugs), min_df=1)
+
+    def test_predicts_whole_batch(self):
+        predictions = self._fit().predict([
+            "Stocks and bonds slide",
+            "Striker seals the league win",
+            "Completely unrelated words",
+        ], threshold=0.1)
+
+        self.assertEqual([p and p[0] for p in predictions],
+                         ["finance", "sports", None])
+
+    def test_scores_match_dense_computation(self):
+        classifier = self._fit()
+        texts = ["stocks stocks win", "league"]
+        rows, cols, data = classifier._features(
+            [text.split() for text in texts])
+        dense = np.zeros((len(texts), len(classifier.vocabulary)))
+        dense[rows, cols] = data
+        np.testing.assert_allclose(classifier.scores(texts),
+                                   dense @ classifier.centroids.T)
+
+    def test_save_and_load(self):
+        classifier = self._fit()
+        classifier.save(self.path)
+        loaded = TopicClassifier.load(self.path)
+        self.assertEqual(loaded.slugs, classifier.slugs)
+        self.assertEqual(loaded.vocabulary, classifier.vocabulary)
+        np.testing.assert_allclose(loaded.centroids, classifier.centroids)
+
+    def test_save_creates_missing_directory(self):
+        path = os.path.join(self.directory.name, "data", "model.npz")
+        self._fit().save(path)
+        self.assertTrue(os.path.exists(path))
+
+    def test_training_command_and_ingest_tags(self):
+        """
+        The command trains on stored crumbs, and ingest tags new crumbs
+        with the predicted topic.
+        """
+        topics = {
+            slug: Topic.objects.create(name=slug, slug=slug)
+            for slug in ("finance", "sports")
+        }
+        for i, (title, slug) in enumerate(self.TRAINING):
+            Crumb.objects.create(
+                title=title, summary="", url=f"https://example.com/{i}",
+                source="Example", topic=topics[slug],
+                published_at=timezone.now(),
+            )
+
+        out = StringIO()
+        call_command("train_topic_classifier", output=self.path,
+                     min_df=1, stdout=out)
+        self.assertIn("Trained on 6 crumbs across 2 topics", out.getvalue())
+
+        with override_settings(TOPIC_CLASSIFIER_PATH=self.path,
+                               PIPELINE_DEFER_SUMMARIES=False,
+                               SUMMARIZER_ENGINE="extractive"):
+            ingest_crumbs(
+                [{"title": "Stocks slide as bond yields jump",
+                  "url": "https://example.com/new"}],
+                topic_slug="sports", topic_name="sports",
+                default_source="Example", kind="test",
+            )
+        crumb = Crumb.objects.get(url="https://example.com/new")
+        self.assertEqual(list(crumb.tags.names()), ["finance"])
+
+
+@override_settings(PIPELINE_NEAR_DUP_DETECTION=True, NEAR_DUP_THRESHOLD=0.8,
+                   PIPELINE_DEFER_SUMMARIES=True, TOPIC_CLASSIFIER_PATH=None)
+class NearDuplicateTest(TestCase):
+    """
+    Tests for MinHash/LSH near-duplicate detection during ingest.
+    """
+
+    STORY = ("Flooding forces thousands from their homes as heavy rain "
+             "continues across the region, officials said on Monday.")
+
+    def setUp(self):
+        Topic.objects.create(name="world news", slug="world-news")
+        Topic.objects.create(name="environment", slug="environment")
+
+    def _ingest(self, items, topic="world-news"):
+        return ingest_crumbs(items, topic_slug=topic, topic_name=topic,
+                             default_source="Example", kind="test")
+
+    def test_signature_similarity(self):
+        reworded = self.STORY.replace("Monday", "Tuesday")
+        other = ("A local bakery has won a national prize for its sourdough "
+                 "bread after a blind tasting.")
+        self.assertGreater(dedup.similarity(dedup.signature(self.STORY),
+                                            dedup.signature(reworded)), 0.8)
+        self.assertLess(dedup.similarity(dedup.signature(self.STORY),
+                                         dedup.signature(other)), 0.2)
+        self.assertIsNone(dedup.signature("Too short"))
+
+    def test_signature_matches_exact_arithmetic(self):
+        """
+        The vectorized (a * h + b) mod p agrees with Python's unbounded
+        integers, i.e. nothing overflows uint64.
+        """
+        hashes = {zlib.crc32(shingle.encode("utf-8"))
+                  for shingle in dedup.shingles(self.STORY)}
+        expected = [
+            min((int(a) * h + int(b)) % int(dedup._PRIME) for h in hashes)
+            for a, b in zip(dedup._A, dedup._B)
+        ]
+        self.assertEqual(dedup.signature(self.STORY).tolist(), expected)
+
+    def test_similarity_tracks_true_jaccard(self):
+        """
+        The estimate follows the real shingle overlap rather than jumping
+        between 0 and 1.
+        """
+        rng = np.random.RandomState(7)
+        vocabulary = [f"word{i}" for i in range(500)]
+
+        def text(words):
+            return " ".join(words)
+
+        base = list(rng.choice(vocabulary, size=80))
+        for replaced in (4, 40):
+            changed = list(base)
+            for index in rng.choice(len(base), size=replaced,
+                                    replace=False):
+                changed[index] = f"other{index}"
+            first, second = dedup.shingles(text(base)), \
+                dedup.shingles(text(changed))
+            jaccard = len(first & second) / len(first | second)
+            estimate = dedup.similarity(dedup.signature(text(base)),
+                                        dedup.signature(text(changed)))
+            self.assertAlmostEqual(estimate, jaccard, delta=0.15)
+
+    def test_indexing_twice_adds_no_bands(self):
+        sig = dedup.signature(self.STORY)
+        crumb = Crumb.objects.create(
+            title="Floods", summary=self.STORY, url="https://a.example.com/1",
+            source="Example", topic=Topic.objects.get(slug="world-news"),
+            published_at=timezone.now(),
+        )
+        dedup.index_signatures([crumb.pk], [sig])
+        dedup.index_signatures([crumb.pk], [sig])
+        self.assertEqual(CrumbBand.objects.count(), dedup.BANDS)
+
+    def test_story_from_another_provider_is_merged(self):
+        """
+        A reworded copy with a different URL is not stored again; the
+        stored crumb is tagged with the new topic instead.
+        """
+        self.assertEqual(self._ingest([{
+            "title": "Floods displace thousands", "summary": self.STORY,
+            "url": "https://wire.example.com/floods",
+        }]), 1)
+        self.assertEqual(CrumbSignature.objects.count(), 1)
+        self.assertEqual(CrumbBand.objects.count(), dedup.BANDS)
+
+        created = self._ingest([{
+            "title": "Floods displace thousands!",
+            "summary": self.STORY.replace("Monday", "Tuesday"),
+            "url": "https://other.example.org/news/123",
+        }], topic="environment")
+
+        self.assertEqual(created, 0)
+        crumb = Crumb.objects.get()
+        self.assertEqual(list(crumb.tags.names()), ["environment"])
+
+    def test_duplicates_within_a_batch(self):
+        created = self._ingest([
+            {"title": "Floods", "summary": self.STORY,
+             "url": "https://a.example.com/1"},
+            {"title": "Floods", "summary": self.STORY + " More soon",
+             "url": "https://b.example.com/2"},
+        ])
+        self.assertEqual(created, 1)
+
+    def test_prune_drops_old_entries(self):
+        self._ingest([{"title": "Floods", "summary": self.STORY,
+                       "url": "https://a.example.com/1"}])
+        CrumbSignature.objects.update(
+            created_at=timezone.now() - timezone.timedelta(days=10))
+
+        self.assertEqual(dedup.prune(window_days=3), 1)
+        self.assertFalse(CrumbBand.objects.exists())
+        self.assertEqual(Crumb.objects.count(), 1)
+
+
+class SourceWatermarkTest(TestCase):
+    """
+    Tests for incremental fetching with per-source watermarks.
+    """
+
+    def _item(self, index, minutes_ago):
+        published = timezone.now() - timezone.timedelta(minutes=minutes_ago)
+        return {"id": index, "title": f"Story {index}",
+                "url": f"https://example.com/{index}",
+                "published_at": published.isoformat()}
+
+    def _run(self, source, **options):
+        out = StringIO()
+        with mock.patch("pipeline.sources.SOURCES", [source]), \
+                mock.patch.dict("pipeline.sources.SOURCES_BY_NAME",
+                                {source.name: source}, clear=True):
+            call_command("fetch_crumbs", source=[source.name], stdout=out,
+                         **options)
+        return out.getvalue()
+
+    def test_later_runs_only_handle_new_items(self):
+        batches = [
+            [self._item(1, 30), self._item(2, 20)],
+            [self._item(2, 20), self._item(3, 5)],
+        ]
+        received = []
+        handled = []
+
+        def fetcher(watermark=None):
+            received.append((watermark.last_published_at,
+                             watermark.last_item_id))
+            return batches[len(received) - 1]
+
+        source = Source(
+            name="incremental", label="Incremental", fetcher=fetcher,
+            handler=lambda items: handled.append(items) or len(items),
+            topic="world-news", kind="test", incremental=True,
+        )
+        self._run(source)
+        out = self._run(source)
+
+        self.assertEqual(received[0], (None, None))
+        self.assertIsNotNone(received[1][0])
+        self.assertEqual(received[1][1], 2)
+        self.assertEqual([[item["id"] for item in items]
+                          for items in handled], [[1, 2], [3]])
+        self.assertIn("1 test items from Incremental were already fetched",
+                      out)
+
+        watermark = SourceWatermark.objects.get(source="incremental")
+        self.assertEqual(watermark.last_item_id, 3)
+        self.assertEqual(len(watermark.seen), 3)
+
+        batches.append([self._item(1, 30)])
+        self._run(source, full=True)
+        self.assertEqual(received[2], (None, None))
+        self.assertEqual(handled[-1][0]["id"], 1)
+
+    def _paged_source(self, items, handled):
+        def fetcher(watermark=None):
+            yield from items
+
+        return Source(
+            name="paged", label="Paged", fetcher=fetcher,
+            handler=lambda chunk: handled.extend(chunk) or len(chunk),
+            topic="world-news", kind="test", incremental=True,
+            time_ordered=True,
+        )
+
+    @override_settings(PIPELINE_STREAM_CHUNK=2, PIPELINE_WATERMARK_OVERLAP=0)
+    def test_chunks_smaller_than_a_page_are_all_handled(self):
+        """
+        Later chunks are checked against the watermark the run started
+        with, not the one an earlier chunk would have moved it to.
+        """
+        old = self._item(9, 60)
+        SourceWatermark.objects.create(
+            source="paged",
+            last_published_at=timezone.now() - timezone.timedelta(
+                minutes=60),
+            seen=[hash_url(old["url"])],
+        )
+        handled = []
+        self._run(self._paged_source([
+            self._item(1, 10), self._item(2, 20), self._item(3, 30),
+            self._item(4, 40), old,
+        ], handled))
+
+        self.assertEqual([item["id"] for item in handled], [1, 2, 3, 4])
+        watermark = SourceWatermark.objects.get(source="paged")
+        self.assertEqual(watermark.last_item_id, 4)
+        self.assertAlmostEqual(
+            (timezone.now() - watermark.last_published_at).total_seconds(),
+            600, delta=60)
+
+    @override_settings(PIPELINE_STREAM_CHUNK=2, PIPELINE_WATERMARK_OVERLAP=0)
+    def test_time_stays_until_the_fetch_reaches_the_last_run(self):
+        """
+        A fetch that stopped before the items of the last run only records
+        what it saw; its publish times would hide the items in between.
+        """
+        start = timezone.now() - timezone.timedelta(minutes=60)
+        SourceWatermark.objects.create(source="paged",
+                                       last_published_at=start)
+        handled = []
+        self._run(self._paged_source(
+            [self._item(1, 10), self._item(2, 20), self._item(3, 30)],
+            handled))
+
+        self.assertEqual(len(handled), 3)
+        watermark = SourceWatermark.objects.get(source="paged")
+        self.assertEqual(watermark.last_published_at, start)
+        self.assertIsNone(watermark.last_item_id)
+        self.assertEqual(len(watermark.seen), 3)
+
+    @override_settings(PIPELINE_STREAM_CHUNK=2)
+    def test_chunk_that_was_not_stored_is_not_marked_seen(self):
+        Topic.objects.create(name="world news", slug="world-news")
+        items = [self._item(1, 10), self._item(2, 20), self._item(3, 30)]
+        source = Source(
+            name="failing", label="Failing",
+            fetcher=lambda watermark=None: iter(items),
+            handler=news_handler.handle_world_news_crumbs,
+            topic="world-news", kind="test", incremental=True,
+            time_ordered=True,
+        )
+        original = Crumb.objects.bulk_create
+        calls = []
+
+        def bulk_create(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise DatabaseError("disk full")
+            return original(*args, **kwargs)
+
+        with mock.patch.object(Crumb.objects, "bulk_create",
+                               side_effect=bulk_create), \
+                self.settings(PIPELINE_DEFER_SUMMARIES=True):
+            out = self._run(source)
+
+        self.assertIn("handler failed: disk full", out)
+        self.assertEqual(Crumb.objects.count(), 2)
+        watermark = SourceWatermark.objects.get(source="failing")
+        self.assertEqual(len(watermark.seen), 2)
+        self.assertIsNone(watermark.last_published_at)
+        self.assertNotIn(hash_url(items[2]["url"]), watermark.seen)
+
+    def test_items_older_than_the_watermark_are_dropped(self):
+        watermark = SourceWatermark(
+            source="old", last_published_at=timezone.now())
+        with self.settings(PIPELINE_WATERMARK_OVERLAP=60):
+            fresh = watermarks.filter_new(
+                watermark, [self._item(1, 90), self._item(2, 30)])
+        self.assertEqual([item["id"] for item in fresh], [2])
+
+    def test_only_seen_urls_are_dropped_for_unordered_sources(self):
+        watermark = SourceWatermark(
+            source="old", last_published_at=timezone.now(),
+            seen=[hash_url("https://example.com/2")])
+        with self.settings(PIPELINE_WATERMARK_OVERLAP=60):
+            fresh = watermarks.filter_new(
+                watermark, [self._item(1, 90), self._item(2, 30)],
+                by_time=False)
+        self.assertEqual([item["id"] for item in fresh], [1])
+
+    def test_newsapi_fetchers_ask_for_items_since_the_watermark(self):
+        """
+        Only the merged /everything query, sorted by publish time, sends
+        'from'; top headlines and the relevancy-sorted queries do not.
+        """
+        watermark = SourceWatermark(
+            source="newsapi-fashion",
+            last_published_at=timezone.make_aware(
+                timezone.datetime(2025, 1, 2, 12, 0),
+                timezone.get_fixed_timezone(0)),
+        )
+        response = mock.Mock(content=b"{}",
+                             **{"json.return_value": {"articles": []}})
+        fashion_source = Source(
+            name="newsapi-fashion", label="NewsAPI.org", fetcher=list,
+            handler=len, topic="fashion", kind="fashion",
+            provider="newsapi", keywords=("fashion",),
+        )
+        with mock.patch("pipeline.paging.http_client.get",
+                        return_value=response) as get, \
+                self.settings(PIPELINE_WATERMARK_OVERLAP=60):
+            list(news.fetch_newsapi_world_news())
+            self.assertNotIn("from", get.call_args.kwargs["params"])
+            list(fashion.fetch_newsapi_fashion_news(watermark=watermark))
+            self.assertNotIn("from", get.call_args.kwargs["params"])
+            list(providers.fetch_newsapi([fashion_source],
+                                         watermark=watermark))
+            self.assertEqual(get.call_args.kwargs["params"]["from"],
+                             "2025-01-02T11:00:00")
+
+
+class StreamFetchersTest(SimpleTestCase):
+    """
+    Tests for the concurrent source executor.
+    """
+
+    def test_fetchers_run_in_parallel(self):
+        """
+        Wall-clock time should track the slowest fetcher, not the sum.
+        """
+        def slow_fetch():
+            time.sleep(0.3)
+            return ["item"]
+
+        jobs = [(f"source-{i}", slow_fetch) for i in range(5)]
+        started = time.monotonic()
+        events = list(stream_fetchers(jobs, workers=5, timeout=5))
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 1.0)
+        for i in range(5):
+            self.assertIn((f"source-{i}", ["item"], None, False), events)
+            self.assertIn((f"source-{i}", [], None, True), events)
+
+    def test_sources_are_yielded_as_each_fetch_finishes(self):
+        """
+        A fast source should be finished before a slow one submitted first.
+        """
+        def slow_fetch():
+            time.sleep(0.3)
+            return ["slow"]
+
+        jobs = [("slow", slow_fetch), ("fast", lambda: ["fast"])]
+        keys = [key for key, _, _, done in
+                stream_fetchers(jobs, workers=2) if done]
+        self.assertEqual(keys, ["fast", "slow"])
+
+    def test_per_job_timeout_overrides_default(self):
+        """
+        A job's own timeout takes precedence over the run-wide default.
+        """
+        def slow_fetch():
+            time.sleep(0.4)
+            return ["done"]
+
+        jobs = [("patient", slow_fetch, 5), ("strict", slow_fetch, 0.1)]
+        results = {key: error for key, _, error, done in
+                   stream_fetchers(jobs, workers=2, timeout=0.2) if done}
+
+        self.assertIsNone(results["patient"])
+        self.assertIsInstance(results["strict"], SourceTimeout)
+
+    def test_chunks_arrive_before_the_fetch_finishes(self):
+        """
+        The first chunk is yielded while the fetcher is still running.
+        """
+        first_chunk_seen = threading.Event()
+
+        def paged_fetch():
+            yield from range(3)
+            # Blocks until the caller has received the first chunk.
+            if not first_chunk_seen.wait(timeout=2):
+                raise AssertionError("first chunk was not yielded early")
+            yield from range(3, 5)
+
+        events = []
+        for key, items, error, done in stream_fetchers(
+                [("paged", paged_fetch)], workers=1, chunk_size=3):
+            events.append((items, error, done))
+            first_chunk_seen.set()
+
+        self.assertEqual(events, [
+            ([0, 1, 2], None, False),
+            ([3, 4], None, False),
+            ([], None, True),
+        ])
+
+    def test_lists_and_errors(self):
+        """
+        Plain lists are chunked too, and an error ends a source after the
+        items it produced.
+        """
+        def broken_fetch():
+            yield "a"
+            raise RuntimeError("boom")
+
+        results = {}
+        for key, items, error, done in stream_fetchers(
+                [("list", lambda: ["x", "y"]), ("broken", broken_fetch)],
+                workers=2, chunk_size=10):
+            results.setdefault(key, []).append((items, error))
+
+        self.assertEqual(results["list"], [(["x", "y"], None), ([], None)])
+        self.assertEqual(results["broken"][0], (["a"], None))
+        self.assertIsInstance(results["broken"][1][1], RuntimeError)
+
+    def test_fetcher_exceeding_timeout_is_skipped(self):
+        def hanging_fetch():
+            yield "first"
+            time.sleep(1)
+            yield "late"
+
+        started = time.monotonic()
+        events = list(stream_fetchers([("hanging", hanging_fetch)],
+                                      workers=1, timeout=0.2,
+                                      chunk_size=1))
+
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(events[0], ("hanging", ["first"], None, False))
+        self.assertIsInstance(events[-1][2], SourceTimeout)
+        self.assertTrue(events[-1][3])
+
+
+class PagingTest(SimpleTestCase):
+    """
+    Tests for following provider page tokens.
+    """
+
+    def _response(self, data):
+        return mock.Mock(content=b"x" * 100, **{"json.return_value": data})
+
+    def _article(self, index):
+        return {"title": f"Story {index}",
+                "link": f"https://example.com/{index}",
+                "pubDate": "2025-01-01 08:00:00"}
+
+    def _newsdata(self, **kwargs):
+        return paging.iter_pages(
+            "https://newsdata.example/api", "results", paging.newsdata_next,
+            lambda article: paging.newsdata_item(article, "NewsData.io"),
+            **kwargs)
+
+    def test_newsdata_pages_are_fetched_lazily(self):
+        pages = [
+            {"results": [self._article(1), self._article(2)],
+             "nextPage": "token-2"},
+            {"results": [self._article(3)], "nextPage": None},
+        ]
+        with mock.patch("pipeline.paging.http_client.get",
+                        side_effect=[self._response(p) for p in pages]
+                        ) as get:
+            items = self._newsdata()
+            first = next(items)
+            self.assertEqual(get.call_count, 1)
+            rest = list(items)
+
+        self.assertEqual([first["url"]] + [item["url"] for item in rest], [
+            "https://example.com/1", "https://example.com/2",
+            "https://example.com/3",
+        ])
+        self.assertEqual(first["source"], "NewsData.io")
+        self.assertEqual(get.call_args_list[1].kwargs["params"],
+                         {"page": "token-2"})
+
+    def test_item_and_byte_budgets_stop_paging(self):
+        page = {"results": [self._article(1), self._article(2)],
+                "nextPage": "more"}
+        with mock.patch("pipeline.paging.http_client.get",
+                        side_effect=lambda *a, **k: self._response(page)
+                        ) as get:
+            self.assertEqual(len(list(self._newsdata(
+                max_items=3, max_pages=10))), 3)
+            self.assertEqual(get.call_count, 2)
+
+            get.reset_mock()
+            list(self._newsdata(max_bytes=250, max_pages=10))
+            self.assertEqual(get.call_count, 3)
+
+    def test_newsapi_stops_at_total_results(self):
+        article = {"title": "t", "url": "https://example.com/a",
+                   "source": {"name": None}}
+        pages = [{"articles": [article], "totalResults": 2},
+                 {"articles": [article], "totalResults": 2}]
+        with mock.patch("pipeline.paging.http_client.get",
+                        side_effect=[self._response(p) for p in pages]
+                        ) as get:
+            items = list(paging.iter_pages(
+                "https://newsapi.example/v2", "articles",
+                paging.newsapi_next,
+                lambda a: paging.newsapi_item(a, "NewsAPI.org"),
+                params={"from": "2025-01-01T00:00:00"}))
+
+        self.assertEqual(len(items), 2)
+        self.assertEqual(items[0]["source"], "NewsAPI.org")
+        self.assertEqual(get.call_args_list[1].kwargs["params"],
+                         {"from": "2025-01-01T00:00:00", "page": 2})
+
+    def test_newsapi_stops_at_the_plan_result_limit(self):
+        page = {"articles": [
+            {"title": "t", "url": f"https://example.com/{index}"}
+            for index in range(2)
+        ], "totalResults": 500}
+        with mock.patch("pipeline.paging.http_client.get",
+                        side_effect=lambda *a, **k: self._response(page)
+                        ) as get, \
+                self.settings(NEWSAPI_MAX_RESULTS=4):
+            items = list(paging.iter_pages(
+                "https://newsapi.example/v2", "articles",
+                paging.newsapi_next,
+                lambda a: paging.newsapi_item(a, "NewsAPI.org"),
+                max_pages=10))
+
+        self.assertEqual(len(items), 4)
+        self.assertEqual(get.call_count, 2)
+
+    def test_paging_stops_at_a_page_seen_before(self):
+        watermark = SourceWatermark(source="newsdata-world", seen=[
+            hash_url("https://example.com/3"),
+            hash_url("https://example.com/4"),
+        ])
+        pages = [
+            {"results": [self._article(1), self._article(2)],
+             "nextPage": "token-2"},
+            {"results": [self._article(3), self._article(4)],
+             "nextPage": "token-3"},
+        ]
+        with mock.patch("pipeline.paging.http_client.get",
+                        side_effect=[self._response(p) for p in pages]
+                        ) as get:
+            items = list(self._newsdata(watermark=watermark))
+
+        self.assertEqual(len(items), 4)
+        self.assertEqual(get.call_count, 2)
+
+
+class ProviderQueryTest(TestCase):
+    """
+    Tests for fetching several sources of one provider with merged queries.
+    """
+
+    def _response(self, data):
+        return mock.Mock(content=b"{}", **{"json.return_value": data})
+
+    def _newsdata_sources(self):
+        return [source for source in SOURCES
+                if source.provider == "newsdata" and source.keywords]
+
+    def test_newsdata_sources_with_keywords_are_grouped_apart(self):
+        groups = providers.group_sources(
+            [source for source in SOURCES if source.provider == "newsdata"])
+        self.assertEqual(list(groups), ["newsdata (merged)"])
+        self.assertNotIn("newsdata-environment", [
+            source.name for source in groups["newsdata (merged)"]])
+
+    def test_newsdata_categories_are_merged_and_routed(self):
+        articles = [
+            {"title": "Breaking news from the summit",
+             "link": "https://example.com/1", "category": ["top", "world"]},
+            {"title": "Election", "link": "https://example.com/2",
+             "category": ["politics"]},
+            {"title": "New album out", "link": "https://example.com/3",
+             "category": ["music", "top"]},
+            {"title": "Nutrition tips", "link": "https://example.com/4",
+             "category": ["food"]},
+            {"title": "Breaking news again", "link": "https://example.com/1",
+             "category": ["world"]},
+        ]
+        with mock.patch("pipeline.paging.http_client.get",
+                        return_value=self._response(
+                            {"results": articles})) as get:
+            items = list(providers.fetch_newsdata(self._newsdata_sources()))
+
+        self.assertEqual(get.call_count, 2)
+        params = [call.kwargs["params"] for call in get.call_args_list]
+        categories = [p["category"].split(",") for p in params]
+        self.assertTrue(all(len(group) <= 5 for group in categories))
+        self.assertEqual(sorted(sum(categories, [])), sorted(
+            category for source in self._newsdata_sources()
+            for category in source.categories))
+        # Every source's keyword filter is still sent.
+        query = " OR ".join(p["q"] for p in params)
+        for source in self._newsdata_sources():
+            self.assertIn(providers.query_terms(source), query)
+        self.assertEqual([(item["url"], item["route"]) for item in items], [
+            ("https://example.com/1", "newsdata-world"),
+            ("https://example.com/3", "newsdata-music"),
+            ("https://example.com/4", "newsdata-food"),
+        ])
+
+    def test_merged_queries_read_no_more_pages_than_sources(self):
+        article = {"title": "New album", "link": "https://example.com/a",
+                   "category": ["music"]}
+        sources = self._newsdata_sources()
+        with mock.patch("pipeline.paging.http_client.get",
+                        side_effect=lambda *a, **k: self._response(
+                            {"results": [article], "nextPage": "more"})
+                        ) as get, \
+                self.settings(PIPELINE_PAGE_MAX_PAGES=10):
+            list(providers.fetch_newsdata(sources))
+        self.assertEqual(get.call_count, len(sources))
+
+    def test_newsapi_keywords_are_merged_and_routed(self):
+        sources = [source for source in SOURCES
+                   if source.provider == "newsapi"]
+        articles = [
+            {"title": "New electric vehicle", "url": "https://example.com/1",
+             "description": "A car for the road"},
+            {"title": "Runway looks", "url": "https://example.com/2",
+             "description": "Designer fashion"},
+            {"title": "Unrelated", "url": "https://example.com/3"},
+        ]
+        with mock.patch("pipeline.paging.http_client.get",
+                        return_value=self._response(
+                            {"articles": articles, "totalResults": 3})
+                        ) as get, \
+                self.settings(NEWSAPI_MAX_QUERY_LENGTH=500):
+            items = list(providers.fetch_newsapi(sources))
+
+        queries = [call.kwargs["params"]["q"] for call in get.call_args_list]
+        self.assertLess(len(queries), len(sources))
+        self.assertTrue(all(len(query) <= 500 for query in queries))
+        self.assertIn('"haute couture"', queries[0])
+        self.assertEqual([(item["url"], item["route"]) for item in items], [
+            ("https://example.com/1", "newsapi-cars-transport"),
+            ("https://example.com/2", "newsapi-fashion"),
+        ])
+
+    def test_command_fetches_grouped_sources_once(self):
+        handled = {}
+
+        def handler(name):
+            return lambda items: handled.setdefault(name, []).extend(
+                items) or len(items)
+
+        fake = [
+            Source(name=name, label="Fake", fetcher=mock.Mock(),
+                   handler=handler(name), topic="world-news", kind="fake",
+                   provider="fake", keywords=(name,))
+            for name in ("fake-a", "fake-b")
+        ]
+        merged = mock.Mock(return_value=iter([
+            {"title": "a", "url": "https://example.com/a",
+             "route": "fake-a"},
+            {"title": "b", "url": "https://example.com/b",
+             "route": "fake-b"},
+        ]))
+        out = StringIO()
+        with mock.patch("pipeline.sources.SOURCES", fake), \
+                mock.patch.dict("pipeline.sources.SOURCES_BY_NAME",
+                                {source.name: source for source in fake},
+                                clear=True), \
+                mock.patch.dict("pipeline.providers.PROVIDERS",
+                                {"fake": merged}):
+            call_command("fetch_crumbs", source=["fake-a", "fake-b"],
+                         stdout=out)
+
+        merged.assert_called_once()
+        for source in fake:
+            source.fetcher.assert_not_called()
+        self.assertEqual(handled, {
+            "fake-a": [{"title": "a", "url": "https://example.com/a"}],
+            "fake-b": [{"title": "b", "url": "https://example.com/b"}],
+        })
+        self.assertEqual(out.getvalue().count("1 fake crumbs saved"), 2)
+
+
+@override_settings(PIPELINE_PROVIDER_LIMITS={
+    "newsapi": {"rate": 100, "burst": 10, "daily": 100},
+})
+class ProviderQuotaTest(TestCase):
+    """
+    Tests for per-provider rate limits and the daily quota ledger.
+    """
+
+    def setUp(self):
+        quota._buckets.clear()
+        self.source = Source(
+            name="quota-test", label="Quota", fetcher=mock.Mock(
+                return_value=[]),
+            handler=lambda items: len(items), topic="world-news",
+            kind="test", provider="newsapi",
+        )
+
+    def tearDown(self):
+        quota.finish_run()
+
+    def _use(self, count):
+        ProviderQuota.objects.create(
+            provider="newsapi", day=timezone.localdate(), used=count)
+
+    def test_token_bucket_spaces_out_requests(self):
+        bucket = quota.TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertIsNone(bucket.reserve(max_wait=0.01))
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+
+    def test_allowance_is_recorded_in_the_ledger(self):
+        self._use(99)
+        self.assertEqual(quota.start_run([self.source]), set())
+
+        quota.acquire("https://newsapi.org/v2/everything")
+        with self.assertRaises(quota.QuotaExhausted):
+            quota.acquire("https://newsapi.org/v2/everything")
+        # Hosts of other providers are not affected.
+        quota.acquire("https://example.com/")
+
+        self.assertEqual(quota.finish_run(), {"newsapi": 1})
+        self.assertEqual(ProviderQuota.objects.get(provider="newsapi").used,
+                         100)
+        self.assertEqual(quota.start_run([self.source]), {"newsapi"})
+
+    def test_http_client_asks_for_permission(self):
+        self._use(100)
+        quota.start_run([self.source])
+        session = mock.Mock()
+        with mock.patch("pipeline.http_client.get_session",
+                        return_value=session):
+            with self.assertRaises(quota.QuotaExhausted):
+                http_client.get("https://newsapi.org/v2/top-headlines")
+        session.request.assert_not_called()
+
+    def test_too_many_requests_holds_the_provider_back(self):
+        session = mock.Mock(**{"request.return_value": mock.Mock(
+            status_code=429, headers={"Retry-After": "30"})})
+        with mock.patch("pipeline.http_client.get_session",
+                        return_value=session):
+            http_client.get("https://newsapi.org/v2/top-headlines")
+            with self.assertRaises(quota.QuotaExhausted):
+                http_client.get("https://newsapi.org/v2/top-headlines")
+        self.assertEqual(session.request.call_count, 1)
+
+    def test_command_skips_sources_without_quota(self):
+        self._use(100)
+        out = StringIO()
+        with mock.patch("pipeline.sources.SOURCES", [self.source]), \
+                mock.patch.dict("pipeline.sources.SOURCES_BY_NAME",
+                                {self.source.name: self.source},
+                                clear=True):
+            call_command("fetch_crumbs", source=[self.source.name],
+                         stdout=out)
+
+        self.source.fetcher.assert_not_called()
+        self.assertIn("newsapi quota for today is used up", out.getvalue())
+
+    def test_requests_are_recorded_when_the_run_fails(self):
+        def fetcher():
+            quota.acquire("https://newsapi.org/v2/everything")
+            return [{"title": "t", "url": "https://example.com/t"}]
+
+        source = Source(
+            name="quota-test", label="Quota", fetcher=fetcher,
+            handler=lambda items: len(items), topic="world-news",
+            kind="test", provider="newsapi",
+        )
+        with mock.patch("pipeline.sources.SOURCES", [source]), \
+                mock.patch.dict("pipeline.sources.SOURCES_BY_NAME",
+                                {source.name: source}, clear=True), \
+                mock.patch("pipeline.watermarks.advance",
+                           side_effect=RuntimeError("boom")), \
+                self.assertRaises(RuntimeError):
+            call_command("fetch_crumbs", source=[source.name],
+                         stdout=StringIO())
+
+        self.assertEqual(ProviderQuota.objects.get(provider="newsapi").used,
+                         1)
+
+
+@override_settings(LASTFM_API_KEY="key",
+                   LASTFM_BASE_URL="https://lastfm.example/2.0/",
+                   LASTFM_WORKERS=5)
+class LastfmBioCacheTest(TestCase):
+    """
+    Tests for the concurrent, cached Last.fm artist bio lookups.
+    """
+
+    artists = [
+        {"name": "Alpha", "mbid": "mbid-alpha",
+         "url": "https://www.last.fm/music/Alpha"},
+        {"name": "Beta", "mbid": "", "url": "https://www.last.fm/music/Beta"},
+        {"name": "Gamma", "url": "https://www.last.fm/music/Gamma"},
+    ]
+
+    def _get(self, url, **kwargs):
+        if "chart.gettopartists" in url:
+            data = {"artists": {"artist": self.artists}}
+        else:
+            time.sleep(0.2)
+            name = url.split("artist=")[1].split("&")[0]
+            data = {"artist": {"bio": {"summary": (
+                f"{name} bio. <a href=\"https://www.last.fm/music/{name}\">"
+                f"Read more on Last.fm</a>")}}}
+        return mock.Mock(**{"json.return_value": data})
+
+    def _fetch(self):
+        with mock.patch("pipeline.tasks.music.http_client.get",
+                        side_effect=self._get) as get:
+            crumbs = music.fetch_lastfm_top_artists_bios(limit=3)
+        return crumbs, get.call_count
+
+    def test_bios_are_looked_up_concurrently_and_cached(self):
+        started = time.monotonic()
+        crumbs, calls = self._fetch()
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(calls, 4)
+        self.assertEqual([crumb["summary"] for crumb in crumbs],
+                         ["Alpha bio.", "Beta bio.", "Gamma bio."])
+        self.assertEqual(
+            sorted(ArtistBioCache.objects.values_list('key', flat=True)),
+            ["mbid-alpha", "name:beta", "name:gamma"])
+
+        # The chart is unchanged, so only the chart itself is requested.
+        again, calls = self._fetch()
+        self.assertEqual(calls, 1)
+        self.assertEqual(again, crumbs)
+
+    def test_expired_bios_are_looked_up_again(self):
+        self._fetch()
+        ArtistBioCache.objects.filter(key="mbid-alpha").update(
+            fetched_at=timezone.now() - timezone.timedelta(days=30))
+
+        with self.settings(LASTFM_BIO_TTL=24 * 3600):
+            crumbs, calls = self._fetch()
+
+        self.assertEqual(calls, 2)
+        self.assertEqual(len(crumbs), 3)
+        self.assertGreater(
+            ArtistBioCache.objects.get(key="mbid-alpha").fetched_at,
+            timezone.now() - timezone.timedelta(minutes=1))
 
-# Create your tests here.
@@ -2,64 +2,230 @@
 
 import requests
 import json
+from functools import partial
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from pipeline import http_client, summarization, summary_cache
 
 # Define constants for Hugging Face API
 HUGGINGFACE_API_URL = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
+# Model id used to key cached summaries
+HUGGINGFACE_MODEL_ID = HUGGINGFACE_API_URL.rsplit("/models/", 1)[-1]
 # Max characters to send for summarization. Adjust as needed.
 MAX_SUMMARY_INPUT_LENGTH = 1000
 # Timeout for the API request in seconds
 HF_API_TIMEOUT = 30
+# Values accepted for SUMMARIZER_ENGINE and a source's summarizer
+SUMMARIZER_ENGINES = ("huggingface", "extractive")
+
+
+def get_engine(engine=None):
+    """
+    Returns ``engine``, or the SUMMARIZER_ENGINE setting when it is None.
+
+    Raises:
+        ImproperlyConfigured: The engine is not one of SUMMARIZER_ENGINES,
+            so a typo does not silently fall through to the remote model.
+    """
+    if engine is None:
+        engine = getattr(settings, 'SUMMARIZER_ENGINE', 'huggingface')
+    if engine not in SUMMARIZER_ENGINES:
+        raise ImproperlyConfigured(
+            f"Unknown summarizer engine {engine!r}; expected one of "
+            f"{', '.join(SUMMARIZER_ENGINES)}.")
+    return engine
 
 
-def summarize_text(text):
+def summarize_text(text, engine=None):
     """
-    Sends text to Hugging Face API for summarization.
+    Sends text to Hugging Face API for summarization, or to another
+    summarizer engine (see summarize_texts).
     Truncates text to MAX_SUMMARY_INPUT_LENGTH before sending.
+    Summaries are cached by input and model, so repeated text is only sent
+    once.
     Returns an empty string if summarization fails or times out.
     """
-    if not text:
-        return ""
+    return summarize_texts([text], engine=engine)[0]
 
-    # Ensure API key is set
-    api_key = getattr(settings, 'HF_API_TOKEN', None)
-    if not api_key:
-        print("HuggingFace API key is not set in Django settings.")
-        return ""
 
-    headers = {"Authorization": f"Bearer {api_key}"}
+def summarize_texts(texts, batch_size=None, engine=None, concurrency=None):
+    """
+    Summarizes several texts with the configured summarizer engine.
+
+    ``"huggingface"`` uses the remote model (see _summarize_remote) and
+    ``"extractive"`` the local TextRank summarizer in
+    ``pipeline.extractive``. When the remote model fails for a text, the
+    SUMMARIZER_FALLBACK engine (if any) is used for it instead.
+
+    Args:
+        texts (list): Cleaned texts to summarize.
+        batch_size (int): Inputs per remote request. Defaults to the
+            HF_BATCH_SIZE setting.
+        engine (str): Summarizer engine. Defaults to the SUMMARIZER_ENGINE
+            setting.
+        concurrency (int): Remote requests in flight at once. Defaults to
+            the HF_MAX_CONCURRENCY setting.
+
+    Returns:
+        list: One summary per input text, in the same order. Texts that
+        could not be summarized get an empty string.
+    """
+    from pipeline import extractive  # Import here to avoid circular imports
+
+    engine = get_engine(engine)
+    if engine == 'extractive':
+        return extractive.summarize_extractive_many(texts)
 
-    # Truncate text to avoid excessively long inputs
-    truncated_text = text[:MAX_SUMMARY_INPUT_LENGTH]
+    summaries = _summarize_remote(texts, batch_size, concurrency)
+    if getattr(settings, 'SUMMARIZER_FALLBACK', None) == 'extractive':
+        summaries = [
+            summary or (extractive.summarize_extractive(text) if text else "")
+            for text, summary in zip(texts, summaries)
+        ]
+    return summaries
 
-    payload = {"inputs": truncated_text}
+
+def _summarize_remote(texts, batch_size=None, concurrency=None):
+    """
+    Summarizes several texts with as few Hugging Face requests as possible.
+
+    Empty and repeated texts are skipped, cached summaries are reused, and
+    the rest are sent as multi-input requests of up to ``batch_size`` texts,
+    several at a time (see ``pipeline.summarization``). If a batch request
+    fails, its texts are retried one by one so a single bad input does not
+    cost the whole batch. Texts still missing when the run deadline passes
+    are left empty.
+
+    Args:
+        texts (list): Cleaned texts to summarize.
+        batch_size (int): Inputs per request. Defaults to the HF_BATCH_SIZE
+            setting.
+        concurrency (int): Requests in flight at once.
+
+    Returns:
+        list: One summary per input text, in the same order. Texts that
+        could not be summarized get an empty string.
+    """
+    truncated = [(text or "")[:MAX_SUMMARY_INPUT_LENGTH] for text in texts]
+    unique = list(dict.fromkeys(text for text in truncated if text))
+    if not unique:
+        return ["" for _ in texts]
+
+    summaries = summary_cache.get_many(unique, HUGGINGFACE_MODEL_ID)
+    missing = [text for text in unique if text not in summaries]
+
+    if missing:
+        # Ensure API key is set
+        api_key = getattr(settings, 'HF_API_TOKEN', None)
+        if not api_key:
+            print("HuggingFace API key is not set in Django settings.")
+        else:
+            headers = {"Authorization": f"Bearer {api_key}"}
+            if batch_size is None:
+                batch_size = getattr(settings, 'HF_BATCH_SIZE', 8)
+            batch_size = max(1, batch_size)
+
+            request = partial(_request_summaries, headers=headers)
+            chunks = [
+                missing[i:i + batch_size]
+                for i in range(0, len(missing), batch_size)
+            ]
+            results = summarization.run_batches(request, chunks,
+                                                concurrency)
+
+            # Retry the texts of failed batches individually so only the
+            # bad input fails.
+            retry = [
+                [text] for chunk, result in zip(chunks, results)
+                if result is None and len(chunk) > 1 for text in chunk
+            ]
+            retried = summarization.run_batches(request, retry, concurrency)
+
+            fresh = {}
+            for chunk, result in zip(chunks + retry, results + retried):
+                for text, summary in zip(chunk, result or []):
+                    fresh[text] = summary
+            summary_cache.put_many(fresh, HUGGINGFACE_MODEL_ID)
+            summaries.update(fresh)
+
+    return [summaries.get(text, "") for text in truncated]
+
+
+def _request_summaries(inputs, deadline, headers):
+    """
+    Posts one multi-input request to the summarization API.
+
+    While the model is loading the API answers 503 with an
+    ``estimated_time``; the request is retried with backoff until the model
+    is up, the retries run out, or the deadline would pass.
+
+    Returns:
+        list: One summary (possibly empty) per input, or None if the request
+        failed or the response did not match the inputs.
+    """
+    payload = {"inputs": inputs}
 
     try:
-        response = requests.post(
-            HUGGINGFACE_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=HF_API_TIMEOUT  # Use the defined timeout
-        )
+        attempt = 0
+        while True:
+            response = http_client.post(
+                HUGGINGFACE_API_URL,
+                headers=headers,
+                json=payload,
+                timeout=HF_API_TIMEOUT  # Use the defined timeout
+            )
+            if response.status_code != 503:
+                break
+            estimated_time = _estimated_time(response)
+            if not summarization.sleep_before_retry(
+                    attempt, deadline, estimated_time):
+                print(f"HuggingFace model still loading after "
+                      f"{attempt + 1} attempt(s); giving up on "
+                      f"{len(inputs)} input(s).")
+                # Not specific to these inputs, so don't retry them.
+                return ["" for _ in inputs]
+            attempt += 1
         response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
         result = response.json()
-
-        if result and isinstance(result, list) and result[0].get("summary_text"):
-            return result[0]["summary_text"]
-        return ""  # Return empty if no summary text found
     except requests.exceptions.Timeout:
         print(f"HuggingFace summarization error: Read timed out. "
               f"(timeout={HF_API_TIMEOUT}s)")
-        return ""  # Return empty string on timeout
+        return None
     except requests.exceptions.RequestException as e:
         print(f"HuggingFace summarization API request error: {e}")
-        return ""  # Return empty string on other request errors
+        return None
     except json.JSONDecodeError as e:
         print(f"HuggingFace summarization JSON decoding error: {e}")
-        return ""
+        return None
     except Exception as e:
         print(f"Unexpected HuggingFace summarization error: {e}")
-        return ""
+        return None
+
+    if not isinstance(result, list) or len(result) != len(inputs):
+        print(f"HuggingFace summarization returned {type(result).__name__} "
+              f"for {len(inputs)} inputs.")
+        return None
+
+    summaries = []
+    for entry in result:
+        # Each input maps to a dict, or to a one-item list of dicts.
+        if isinstance(entry, list):
+            entry = entry[0] if entry else {}
+        summary = entry.get("summary_text") if isinstance(entry, dict) \
+            else None
+        summaries.append(summary or "")
+    return summaries
+
+
+def _estimated_time(response):
+    """
+    Returns the ``estimated_time`` from a 503 "model loading" body, if any.
+    """
+    try:
+        return float(response.json().get("estimated_time") or 0) or None
+    except (ValueError, TypeError, AttributeError):
+        return None
 
 
 def clean_text(text):
@@ -70,68 +236,31 @@ def clean_text(text):
     if not text:
         return ""
     # Simple split and dedup by sentences. Consider more robust NLP for production.
-    parts = text.strip().split('. ')
     seen = set()
     deduped = []
-    for sentence in parts:
-        if sentence and sentence not in seen:
+    for sentence in split_sentences(text):
+        if sentence not in seen:
             seen.add(sentence)
             deduped.append(sentence)
     return '. '.join(deduped).strip()
 
 
+def split_sentences(text):
+    """
+    Splits text into sentences on '. ', dropping empty pieces. Shared by
+    clean_text and the extractive summarizer.
+    """
+    if not text:
+        return []
+    return [sentence for sentence in text.strip().split('. ') if sentence]
+
+
 def tag_crumb_text(text):
     """
     Attempt to match crumb text to a topic by checking for keywords.
-    Returns the first matching Topic object, or None if no match is found.
+    Returns the best matching Topic object, or None if no match is found.
+    See pipeline.tagging for the matcher itself.
     """
-    from preferences.models import Topic # Import here to avoid circular dependencies
-
-    if not text:
-        return None
+    from pipeline.tagging import get_tagger # Import here to avoid circular dependencies
 
-    keywords_map = {
-        "world-news": [
-            "breaking", "headline", "report", "journalist"
-            ],
-        "music": [
-            "song", "album", "artist", "track"
-            ],
-        "sports-and-fitness": [
-            "game", "match", "team", "fitness", "athlete"
-            ],
-        "stock-crypto-finance": [
-            "market", "stock", "crypto", "investment", "economy"
-            ],
-        "food-and-drink": [
-            "recipe", "meal", "ingredient", "cooking"
-            ],
-        "technology": [
-            "AI", "tech", "gadget", "software", "hardware"
-            ],
-        "plants-and-gardening": [
-            "plant", "soil", "water", "grow", "harvest"
-            ],
-        "environment": [
-            "climate", "recycle", "sustainability", "biodiversity"
-            ],
-        "trivia-and-fun": [
-            "fact", "joke", "trivia", "laugh", "weird"
-            ],
-        "fashion": [
-            "fashion", "style", "trend", "designer", "runway",
-            "apparel", "luxury fashion", "haute couture"
-            ],
-        "cars-transport": [
-            "car", "vehicle", "transport", "automotive", "driving",
-            "traffic", "road", "engine", "fuel"
-            ],
-    }
-
-    text_lower = text.lower()
-    for slug, keywords in keywords_map.items():
-        if any(keyword in text_lower for keyword in keywords):
-            # Return the Topic object directly
-            return Topic.objects.filter(slug=slug).first()
-
-    return None
\ No newline at end of file
+    return get_tagger().best(text)
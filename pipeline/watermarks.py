@@ -0,0 +1,132 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from crumbs.utils import hash_url
+from pipeline.ingest import parse_published_at
+from pipeline.models import SourceWatermark
+
+
+def load(names, reset=False):
+    """
+    Returns {source name: SourceWatermark} for ``names`` with one query.
+    Sources fetched for the first time get a new, unsaved watermark.
+
+    Args:
+        names (list): Source names.
+        reset (bool): Start every source from scratch; the watermarks are
+            cleared in memory and saved again by advance().
+    """
+    found = {
+        watermark.source: watermark
+        for watermark in SourceWatermark.objects.filter(source__in=names)
+    }
+    marks = {}
+    for name in names:
+        watermark = found.get(name) or SourceWatermark(source=name)
+        if reset:
+            watermark.last_published_at = None
+            watermark.last_item_id = None
+            watermark.page_token = ""
+            watermark.seen = []
+        marks[name] = watermark
+    return marks
+
+
+def combine(marks):
+    """
+    Returns an unsaved watermark for several sources fetched with one
+    query: the oldest of their publish times and all of their seen URLs,
+    so nothing any of them still needs is skipped.
+    """
+    times = [watermark.last_published_at for watermark in marks]
+    return SourceWatermark(
+        source="+".join(watermark.source for watermark in marks),
+        last_published_at=None if None in times else min(times),
+        seen=list(dict.fromkeys(
+            url_hash for watermark in marks for url_hash in watermark.seen
+        )),
+    )
+
+def since(watermark):
+    """
+    Returns the UTC datetime a fetcher should ask its API for items from,
+    or None to fetch everything. It is a little before the newest item
+    seen (PIPELINE_WATERMARK_OVERLAP minutes) so late-indexed items are
+    not missed; the repeats are dropped by filter_new().
+    """
+    if watermark is None or watermark.last_published_at is None:
+        return None
+    overlap = getattr(settings, 'PIPELINE_WATERMARK_OVERLAP', 60)
+    return (watermark.last_published_at - timedelta(minutes=overlap)
+            ).astimezone(dt_timezone.utc)
+
+
+def filter_new(watermark, items, by_time=True):
+    """
+    Drops items the source has already handed on: those whose URL is among
+    the recently seen ones and, with ``by_time``, those published before
+    since().
+
+    Args:
+        watermark (SourceWatermark): The source's watermark.
+        items (iterable): Items returned by the source's fetcher.
+        by_time (bool): The source's API filters or sorts by publish time
+            (Source.time_ordered). Otherwise an older item may simply not
+            have been returned before, so only seen URLs are dropped.
+
+    Returns:
+        list: The items not seen before, in their original order.
+    """
+    seen = set(watermark.seen)
+    cutoff = since(watermark) if by_time else None
+    return [item for item in items if is_new(item, seen, cutoff)]
+
+
+def is_new(item, seen, cutoff):
+    """
+    Returns False if the item's URL hash is in ``seen`` or it was published
+    before ``cutoff`` (see since()).
+    """
+    url = item.get("url")
+    if url and hash_url(url) in seen:
+        return False
+    if cutoff is not None and item.get("published_at") and \
+            parse_published_at(item["published_at"]) < cutoff:
+        return False
+    return True
+
+
+def advance(watermark, items, move_time=True):
+    """
+    Moves the watermark past ``items`` and saves it.
+
+    The URL hashes of the items are added to the most recent
+    PIPELINE_WATERMARK_SEEN ones. With ``move_time``, the newest publish
+    time and highest integer ``id`` are kept too; leave it off when the
+    fetch stopped before reaching where the last run did, or the items in
+    between would count as old next time.
+    """
+    hashes = [hash_url(item["url"]) for item in items if item.get("url")]
+    limit = getattr(settings, 'PIPELINE_WATERMARK_SEEN', 500)
+    watermark.seen = list(dict.fromkeys(hashes + watermark.seen))[:limit]
+    if not move_time:
+        watermark.save()
+        return
+
+    published = [
+        parse_published_at(item["published_at"])
+        for item in items if item.get("published_at")
+    ]
+    if published:
+        # Never past now, so a misdated item cannot hide the next ones.
+        newest = min(max(published), timezone.now())
+        if watermark.last_published_at is None or \
+                newest > watermark.last_published_at:
+            watermark.last_published_at = newest
+
+    ids = [item["id"] for item in items if isinstance(item.get("id"), int)]
+    if ids:
+        watermark.last_item_id = max(ids + [watermark.last_item_id or 0])
+    watermark.save()
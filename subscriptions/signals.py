@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SubscriptionFrequency, SubscriptionPlan
+from .utils import clear_price_matrix
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+@receiver(post_save, sender=SubscriptionFrequency)
+@receiver(post_delete, sender=SubscriptionFrequency)
+def clear_prices(sender, **kwargs):
+    clear_price_matrix()
@@ -1,3 +1,52 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import isolated_caches
+from .models import SubscriptionFrequency, SubscriptionPlan
+from .utils import calculate_subscription_price, clear_price_matrix
+
+
+class PriceMatrixTest(TestCase):
+    """
+    Tests for the cached plan/frequency price matrix.
+    """
+
+    def setUp(self):
+        # Never touch the configured cache.
+        self.enterContext(
+            override_settings(CACHES=isolated_caches(self.id())))
+        clear_price_matrix()
+        self.basic = SubscriptionPlan.objects.create(
+            name='basic', price=10.00, topic_limit=2)
+        self.premium = SubscriptionPlan.objects.create(
+            name='premium', price=20.00, topic_limit=12)
+        SubscriptionFrequency.objects.create(
+            name='Monthly', duration_days=30, discount_percent=0)
+        self.yearly = SubscriptionFrequency.objects.create(
+            name='Yearly', duration_days=360, discount_percent=10)
+
+    def test_prices(self):
+        self.assertEqual(calculate_subscription_price('basic', 30), 10.0)
+        self.assertEqual(calculate_subscription_price('premium', 360), 216.0)
+        # Unknown durations are charged without a discount.
+        self.assertEqual(calculate_subscription_price('basic', 60), 20.0)
+        self.assertIsNone(calculate_subscription_price('gold', 30))
+
+    def test_pricing_page_is_served_from_the_cache(self):
+        self.client.get(reverse('choose_plan'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('choose_plan'))
+        plans = response.context['plans']
+        self.assertEqual([plan['name'] for plan in plans],
+                         ['Basic', 'Premium'])
+        self.assertEqual([freq['price'] for freq in plans[1]['frequencies']],
+                         [20.0, 216.0])
+
+    def test_changes_rebuild_the_matrix(self):
+        calculate_subscription_price('basic', 360)
+        self.yearly.discount_percent = 50
+        self.yearly.save()
+        self.assertEqual(calculate_subscription_price('basic', 360), 60.0)
+
+        self.premium.delete()
+        self.assertIsNone(calculate_subscription_price('premium', 30))
@@ -1,30 +1,133 @@
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
 from .models import SubscriptionPlan, SubscriptionFrequency
 
-def calculate_subscription_price(plan_name, duration_days):
-    """
-    Calculates the subscription price based on plan name and duration.
-    Assumes SubscriptionPlan has a 'price' field
-    representing its base cost (e.g., monthly).
-    """
-    try:
-        plan = SubscriptionPlan.objects.get(name=plan_name)
-    except SubscriptionPlan.DoesNotExist:
-        return None
+MONTH_DAYS = 30
+MATRIX_KEY = "subscriptions:price_matrix"
+VERSION_KEY = "subscriptions:price_matrix_version"
+
+_matrix = None
+_matrix_version = None
+_lock = threading.Lock()
 
-    try:
-        frequency = SubscriptionFrequency.objects.get(
-            duration_days=duration_days
-            )
-        discount_percent = frequency.discount_percent
-    except SubscriptionFrequency.DoesNotExist:
-        discount_percent = 0 # No discount if frequency not found
 
-    MONTH_DAYS = 30
+def _price(base_price, duration_days, discount_percent):
+    """
+    Returns the price of ``duration_days`` at a monthly ``base_price``
+    with ``discount_percent`` off, rounded to cents.
+    """
     number_of_billing_units = duration_days / MONTH_DAYS
 
-    raw_total_price = float(plan.price) * number_of_billing_units
+    raw_total_price = float(base_price) * number_of_billing_units
 
     discount_amount = raw_total_price * (discount_percent / 100)
     final_price = raw_total_price - discount_amount
 
-    return round(final_price, 2)
\ No newline at end of file
+    return round(final_price, 2)
+
+
+def build_price_matrix():
+    """
+    Reads every plan and frequency (two queries) and prices each pair.
+
+    Returns:
+        dict: ``plans`` and ``frequencies`` as lists of dicts in database
+        order, and ``prices`` mapping (plan name, duration days) to the
+        final price.
+    """
+    plans = [
+        {
+            'id': plan.id,
+            'name': plan.name,
+            'display_name': plan.get_name_display(),
+            'topic_limit': plan.topic_limit,
+            'price': plan.price,
+        }
+        for plan in SubscriptionPlan.objects.all()
+    ]
+    frequencies = [
+        {
+            'id': freq.id,
+            'name': freq.name,
+            'duration_days': freq.duration_days,
+            'discount_percent': freq.discount_percent,
+        }
+        for freq in SubscriptionFrequency.objects.all()
+    ]
+
+    discounts = {}
+    for freq in frequencies:
+        discounts.setdefault(freq['duration_days'], freq['discount_percent'])
+    prices = {
+        (plan['name'], duration_days): _price(
+            plan['price'], duration_days, discount_percent)
+        for plan in plans
+        for duration_days, discount_percent in discounts.items()
+    }
+    return {'plans': plans, 'frequencies': frequencies, 'prices': prices}
+
+
+def get_price_matrix():
+    """
+    Returns the price matrix, building it at most once until a plan or
+    frequency changes.
+
+    A copy is kept in this process and one in the shared cache. The
+    in-process copy is used while its version matches the one in the
+    shared cache, so a change made in another process is picked up on the
+    next call.
+    """
+    global _matrix, _matrix_version
+    version = cache.get(VERSION_KEY)
+    if _matrix is not None and version is not None \
+            and version == _matrix_version:
+        return _matrix
+
+    with _lock:
+        matrix = cache.get(MATRIX_KEY) if version is not None else None
+        if matrix is None:
+            matrix = build_price_matrix()
+            version = uuid.uuid4().hex
+            timeout = getattr(settings, 'PRICE_MATRIX_TIMEOUT', 86400)
+            cache.set_many({MATRIX_KEY: matrix, VERSION_KEY: version},
+                           timeout)
+        _matrix, _matrix_version = matrix, version
+    return matrix
+
+
+def clear_price_matrix():
+    """
+    Drops the cached matrix in this process and in the shared cache.
+    """
+    global _matrix, _matrix_version
+    with _lock:
+        _matrix = _matrix_version = None
+        cache.delete_many([MATRIX_KEY, VERSION_KEY])
+
+
+def calculate_subscription_price(plan_name, duration_days):
+    """
+    Calculates the subscription price based on plan name and duration.
+    Assumes SubscriptionPlan has a 'price' field
+    representing its base cost (e.g., monthly).
+
+    Prices come from the cached price matrix (see get_price_matrix()), so
+    this does not query the database once the matrix is built.
+    """
+    matrix = get_price_matrix()
+    price = matrix['prices'].get((plan_name, duration_days))
+    if price is not None:
+        return price
+
+    plan = next(
+        (plan for plan in matrix['plans'] if plan['name'] == plan_name),
+        None,
+    )
+    if plan is None:
+        return None
+    # No discount if frequency not found
+    return _price(plan['price'], duration_days, 0)
@@ -5,35 +5,36 @@ from django.utils.timezone import now
 from datetime import timedelta
 
 from .models import SubscriptionPlan, UserSubscription, SubscriptionFrequency
-from .utils import calculate_subscription_price
+from .utils import calculate_subscription_price, get_price_matrix
 
 def choose_plan(request):
-    plans = SubscriptionPlan.objects.all()
-    frequencies = SubscriptionFrequency.objects.all()
+    # Plans, frequencies and prices all come from the cached matrix.
+    matrix = get_price_matrix()
 
     plan_options = []
 
-    for plan in plans:
+    for plan in matrix['plans']:
         frequency_options = []
 
-        for freq in frequencies:
-            price = calculate_subscription_price(plan.name, freq.duration_days)
+        for freq in matrix['frequencies']:
+            price = matrix['prices'].get(
+                (plan['name'], freq['duration_days']))
 
             if price is not None:
                 frequency_options.append({
-                    'id': freq.id,
-                    'name': freq.name,
-                    'discount': freq.discount_percent,
+                    'id': freq['id'],
+                    'name': freq['name'],
+                    'discount': freq['discount_percent'],
                     'price': price,
                 })
             else:
-                print(f"Warning: Could not calculate price for plan '{plan.name}' and duration '{freq.duration_days}'")
+                print(f"Warning: Could not calculate price for plan '{plan['name']}' and duration '{freq['duration_days']}'")
 
 
         plan_options.append({
-            'id': plan.id,
-            'name': plan.get_name_display(),
-            'topic_limit': plan.topic_limit,
+            'id': plan['id'],
+            'name': plan['display_name'],
+            'topic_limit': plan['topic_limit'],
             'frequencies': frequency_options
         })
 